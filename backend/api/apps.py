@@ -1,5 +1,24 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_index(sender, using, **kwargs):
+    """
+    Re-create the search triggers, which SQLite drops when a migration rebuilds a table.
+    """
+    from django.db import connections
+    from django.db.migrations.recorder import MigrationRecorder
+    from api.search import SEARCH_MIGRATION, install_search_index
+
+    connection = connections[using]
+    if SEARCH_MIGRATION in MigrationRecorder(connection).applied_migrations():
+        install_search_index(connection)
+
 
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self):
+        import api.signals  # noqa: F401
+        post_migrate.connect(ensure_search_index, sender=self)
@@ -0,0 +1,246 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import parse_etags, quote_etag
+
+FEED_VERSION_KEY = 'event_feed:version'
+FEED_KEY_PREFIX = 'event_feed'
+EVENT_VERSION_PREFIX = 'event_feed:event'
+LIKES_VERSION_KEY = 'event_feed:likes:version'
+MAP_VERSION_KEY = 'map_clusters:version'
+MAP_KEY_PREFIX = 'map_clusters'
+MAX_MAP_ZOOM = 20
+LOCK_POLL_INTERVAL = 0.05
+
+
+def _version(key: str) -> int:
+    """
+    Get the current value of the version counter stored under `key`.
+    """
+    cache.add(key, 1, timeout=None)
+    return cache.get(key, 1)
+
+
+def _bump_version(key: str) -> None:
+    """
+    Increment the version counter stored under `key`.
+    """
+    cache.add(key, 1, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The version was evicted between add() and incr(); any new value works.
+        cache.set(key, int(time.time()), timeout=None)
+
+
+def feed_version() -> int:
+    """
+    Get the current version of the cached event feed.
+
+    Every cached feed page is stored under the version it was built for, so bumping
+    the version invalidates all pages at once without having to know their keys.
+
+    Returns:
+        int: The current feed version.
+    """
+    return _version(FEED_VERSION_KEY)
+
+
+def bump_feed_version() -> None:
+    """
+    Invalidate every cached event feed page.
+    """
+    _bump_version(FEED_VERSION_KEY)
+
+
+def _event_version_key(event_id: int) -> str:
+    return f'{EVENT_VERSION_PREFIX}:{event_id}'
+
+
+def event_versions(event_ids, create: bool = False) -> dict:
+    """
+    Get the version counters of events, as recorded with the feed pages that render them.
+
+    Args:
+        event_ids (iterable): The IDs of the events.
+        create (bool, optional): Start a counter for the events that have none, when
+            building a page. A counter is started at the current time, so a counter
+            that was evicted and started again does not repeat an older value.
+
+    Returns:
+        dict: The version of every event that has one, keyed by event ID.
+    """
+    keys = {_event_version_key(event_id): event_id for event_id in event_ids}
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if create and missing:
+        for key in missing:
+            cache.add(key, time.time_ns(), timeout=None)
+        versions.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_event_version(event_id: int) -> None:
+    """
+    Invalidate the cached feed pages that render an event, after its counters changed.
+    """
+    _bump_version(_event_version_key(event_id))
+
+
+def likes_version() -> int:
+    """
+    Get the version of the like counts, which order the 'most_liked' feed pages.
+    """
+    return _version(LIKES_VERSION_KEY)
+
+
+def bump_likes_version() -> None:
+    """
+    Invalidate the cached feed pages ordered by like count.
+    """
+    _bump_version(LIKES_VERSION_KEY)
+
+
+def feed_cache_key(**params) -> str:
+    """
+    Build the cache key of a feed page for the current feed version.
+
+    Args:
+        **params: The query parameters that select the page (cursor, limit, status, ...).
+
+    Returns:
+        str: The versioned cache key.
+    """
+    digest = hashlib.md5(
+        '&'.join(f'{name}={params[name]}' for name in sorted(params)).encode()
+    ).hexdigest()
+    return f'{FEED_KEY_PREFIX}:v{feed_version()}:{digest}'
+
+
+def get_or_build(key: str, build, timeout: int = None, lock_timeout: int = None, is_fresh=None):
+    """
+    Return the cached value of `key`, building and caching it on a miss.
+
+    Only one worker rebuilds a missing entry at a time: the first one to take the
+    lock builds the value while the others poll the cache for up to `lock_timeout`
+    seconds, after which they build the value themselves without caching it.
+
+    Args:
+        key (str): The cache key.
+        build (callable): Builds the value on a miss. It returns a `(value, cacheable)` tuple.
+        timeout (int, optional): Lifetime of the cached value in seconds.
+        lock_timeout (int, optional): Lifetime of the rebuild lock in seconds.
+        is_fresh (callable, optional): Checks a cached value, which is rebuilt like a miss
+            when it returns False.
+
+    Returns:
+        The cached or freshly built value.
+    """
+    timeout = timeout if timeout is not None else settings.EVENT_FEED_CACHE_TIMEOUT
+    lock_timeout = lock_timeout if lock_timeout is not None else settings.EVENT_FEED_CACHE_LOCK_TIMEOUT
+    is_fresh = is_fresh or (lambda value: True)
+
+    value = cache.get(key)
+    if value is not None and is_fresh(value):
+        return value
+
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, timeout=lock_timeout):
+        try:
+            value, cacheable = build()
+            if cacheable:
+                cache.set(key, value, timeout=timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None and is_fresh(value):
+            return value
+    value, _ = build()
+    return value
+
+
+def make_etag(*parts) -> str:
+    """
+    Build a strong ETag from the parts a response depends on.
+
+    Args:
+        *parts: Values whose repr() identifies the version of the response.
+
+    Returns:
+        str: The quoted ETag.
+    """
+    return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+
+def etag_matches(request, etag: str) -> bool:
+    """
+    Check whether the client's If-None-Match header matches `etag`.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        etag (str): The current ETag of the requested resource.
+
+    Returns:
+        bool: True if the client's copy is current.
+    """
+    header = request.headers.get('If-None-Match')
+    if not header or not etag:
+        return False
+    etags = [value.removeprefix('W/') for value in parse_etags(header)]
+    return '*' in etags or etag in etags
+
+
+def map_tile(lat: float, lng: float, zoom: int) -> tuple:
+    """
+    Get the map tile containing a point.
+
+    At zoom level `zoom` the world is split into 2^zoom x 2^zoom equirectangular tiles.
+
+    Args:
+        lat (float): Latitude in degrees.
+        lng (float): Longitude in degrees.
+        zoom (int): The zoom level.
+
+    Returns:
+        tuple: The (x, y) position of the tile.
+    """
+    tiles = 2 ** zoom
+    x = int((float(lng) + 180) / 360 * tiles)
+    y = int((float(lat) + 90) / 180 * tiles)
+    return min(max(x, 0), tiles - 1), min(max(y, 0), tiles - 1)
+
+
+def map_tile_key(zoom: int, x: int, y: int) -> str:
+    """
+    Build the cache key of the clusters of one map tile.
+    """
+    return f'{MAP_KEY_PREFIX}:v{_version(MAP_VERSION_KEY)}:{zoom}:{x}:{y}'
+
+
+def invalidate_map_tiles(*points) -> None:
+    """
+    Invalidate the cached clusters of the tiles containing `points`, at every zoom level.
+
+    Args:
+        *points: (latitude, longitude) pairs, for example the old and new location of an event.
+            Pairs with a missing coordinate are ignored.
+    """
+    keys = [
+        map_tile_key(zoom, *map_tile(lat, lng, zoom))
+        for lat, lng in points if lat is not None and lng is not None
+        for zoom in range(MAX_MAP_ZOOM + 1)
+    ]
+    cache.delete_many(keys)
+
+
+def bump_map_version() -> None:
+    """
+    Invalidate the cached clusters of every map tile.
+    """
+    _bump_version(MAP_VERSION_KEY)
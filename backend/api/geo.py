@@ -0,0 +1,149 @@
+"""
+Distance and clustering queries over the latitude/longitude columns of events.
+
+For distance queries, candidates are prefiltered in the database with a
+bounding box around the search point, served by the (latitude, longitude)
+index, and the exact great-circle distances are then computed for all
+candidates at once with NumPy. Map clusters are aggregated per tile in SQL.
+"""
+import math
+import numpy as np
+from django.db.models import Avg, Count, FloatField, Min, Q
+from django.db.models.functions import Cast, Floor
+
+EARTH_RADIUS_KM = 6371.0088
+CLUSTER_CELLS_PER_TILE = 8
+
+
+def bounding_box(lat: float, lng: float, radius_km: float) -> Q:
+    """
+    Build a filter for the points within a box that contains the circle of
+    `radius_km` around (`lat`, `lng`).
+
+    Boxes crossing the antimeridian are split in two longitude ranges, and
+    boxes reaching a pole span every longitude.
+
+    Args:
+        lat (float): Latitude of the center in degrees.
+        lng (float): Longitude of the center in degrees.
+        radius_km (float): Radius of the circle in kilometers.
+
+    Returns:
+        Q: Filter on the `latitude` and `longitude` fields.
+    """
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - delta_lat, lat + delta_lat
+    box = Q(latitude__gte=max(min_lat, -90), latitude__lte=min(max_lat, 90))
+    if min_lat <= -90 or max_lat >= 90:
+        return box
+
+    delta_lng = math.degrees(math.asin(min(math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat)), 1)))
+    min_lng, max_lng = lng - delta_lng, lng + delta_lng
+    if min_lng < -180:
+        return box & (Q(longitude__gte=min_lng + 360) | Q(longitude__lte=max_lng))
+    if max_lng > 180:
+        return box & (Q(longitude__gte=min_lng) | Q(longitude__lte=max_lng - 360))
+    return box & Q(longitude__gte=min_lng, longitude__lte=max_lng)
+
+
+def haversine_km(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """
+    Compute the great-circle distances between one point and arrays of points.
+
+    Args:
+        lat (float): Latitude of the point in degrees.
+        lng (float): Longitude of the point in degrees.
+        lats (np.ndarray): Latitudes of the other points in degrees.
+        lngs (np.ndarray): Longitudes of the other points in degrees.
+
+    Returns:
+        np.ndarray: The distances in kilometers.
+    """
+    lat, lng = math.radians(lat), math.radians(lng)
+    lats, lngs = np.radians(lats), np.radians(lngs)
+    a = (np.sin((lats - lat) / 2) ** 2
+         + math.cos(lat) * np.cos(lats) * np.sin((lngs - lng) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def nearest(queryset, lat: float, lng: float, radius_km: float, limit: int) -> list:
+    """
+    Find the events of `queryset` within `radius_km` of (`lat`, `lng`), closest first.
+
+    Events still at the default (0, 0) location have no location and are skipped.
+
+    Args:
+        queryset (QuerySet): The events to search.
+        lat (float): Latitude of the center in degrees.
+        lng (float): Longitude of the center in degrees.
+        radius_km (float): Search radius in kilometers.
+        limit (int): Maximum number of events to return.
+
+    Returns:
+        list: (event ID, distance in kilometers) pairs, closest first.
+    """
+    candidates = list(
+        queryset.filter(bounding_box(lat, lng, radius_km))
+        .exclude(latitude=0, longitude=0)
+        .order_by()
+        .values_list('id', 'latitude', 'longitude')
+    )
+    if not candidates:
+        return []
+
+    ids = np.fromiter((row[0] for row in candidates), dtype=np.int64, count=len(candidates))
+    lats = np.fromiter((row[1] for row in candidates), dtype=np.float64, count=len(candidates))
+    lngs = np.fromiter((row[2] for row in candidates), dtype=np.float64, count=len(candidates))
+    distances = haversine_km(lat, lng, lats, lngs)
+
+    inside = np.flatnonzero(distances <= radius_km)
+    if len(inside) > limit:
+        inside = inside[np.argpartition(distances[inside], limit - 1)[:limit]]
+    order = inside[np.lexsort((ids[inside], distances[inside]))]
+    return [(int(ids[index]), float(distances[index])) for index in order]
+
+
+def cluster_tile(queryset, zoom: int, x: int, y: int) -> list:
+    """
+    Aggregate the events of one map tile into clusters.
+
+    The tile is split into a CLUSTER_CELLS_PER_TILE x CLUSTER_CELLS_PER_TILE grid,
+    and the events of every non-empty cell are counted and averaged in a single
+    GROUP BY query.
+
+    Args:
+        queryset (QuerySet): The events to cluster.
+        zoom (int): The zoom level, see `api.cache.map_tile`.
+        x (int): The column of the tile.
+        y (int): The row of the tile.
+
+    Returns:
+        list: One dict per cluster with its centroid `latitude` and `longitude`,
+        its event `count`, and the `event_id` of clusters holding a single event.
+    """
+    tiles = 2 ** zoom
+    tile_lng, tile_lat = 360 / tiles, 180 / tiles
+    west, south = -180 + x * tile_lng, -90 + y * tile_lat
+    cell_lng, cell_lat = tile_lng / CLUSTER_CELLS_PER_TILE, tile_lat / CLUSTER_CELLS_PER_TILE
+
+    # The last row and column of tiles also include the 90 and 180 degree edges.
+    in_tile = Q(longitude__gte=west, latitude__gte=south)
+    in_tile &= Q(longitude__lte=180) if x == tiles - 1 else Q(longitude__lt=west + tile_lng)
+    in_tile &= Q(latitude__lte=90) if y == tiles - 1 else Q(latitude__lt=south + tile_lat)
+
+    latitude, longitude = Cast('latitude', FloatField()), Cast('longitude', FloatField())
+    cells = (queryset.filter(in_tile)
+             .exclude(latitude=0, longitude=0)
+             .annotate(cell_x=Floor(longitude / cell_lng), cell_y=Floor(latitude / cell_lat))
+             .order_by()
+             .values('cell_x', 'cell_y')
+             .annotate(total=Count('id'), center_lat=Avg(latitude), center_lng=Avg(longitude), first_id=Min('id')))
+    return [
+        {
+            'latitude': round(cell['center_lat'], 6),
+            'longitude': round(cell['center_lng'], 6),
+            'count': cell['total'],
+            'event_id': cell['first_id'] if cell['total'] == 1 else None,
+        }
+        for cell in cells
+    ]
@@ -0,0 +1,56 @@
+"""
+Replay of requests sent with an Idempotency-Key.
+
+Clients retry a request after a timeout with the same Idempotency-Key header.
+The first request stores its response in an IdempotencyRecord, and its retries
+get that response back without running the request again. The records are in
+the database, so a retry is replayed whichever worker or process it reaches.
+"""
+from django.http import HttpResponse, JsonResponse
+from api.models.idempotency import IdempotencyRecord
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+
+def idempotent(request, handler) -> HttpResponse:
+    """
+    Run `handler` once per Idempotency-Key and replay its response to retries.
+
+    The status and body of the first response are stored under the user, the
+    method, the path and the key. A retry that arrives while the first request is
+    still running gets a 409. Server errors are not stored, so they can be
+    retried. Requests without the header always run the handler.
+
+    Args:
+        request (HttpRequest): The HTTP request object, with an authenticated user.
+        handler (callable): Handles the request and returns its response.
+
+    Returns:
+        HttpResponse: The response of the handler, or the stored response of the key.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if not key:
+        return handler()
+    if len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        return JsonResponse({'error': f'{IDEMPOTENCY_HEADER} is too long.'}, status=400)
+
+    record, claimed = IdempotencyRecord.objects.claim(request.user, request.method, request.path, key)
+    if not claimed:
+        if record.status_code is not None:
+            return record.replay()
+        return JsonResponse({'error': f'A request with this {IDEMPOTENCY_HEADER} is still in progress.'}, status=409)
+
+    try:
+        response = handler()
+    except Exception:
+        record.delete()
+        raise
+    if response.status_code >= 500:
+        record.delete()
+        return response
+    record.status_code = response.status_code
+    record.content_type = response.get('Content-Type', '')
+    record.content = response.content
+    record.save(update_fields=['status_code', 'content_type', 'content'])
+    return response
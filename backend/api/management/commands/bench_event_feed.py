@@ -0,0 +1,97 @@
+import json
+import time
+from datetime import timedelta
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from api.models import AttendeeUser, Event, Organizer
+from api.views.strategy.event_strategy import EventListStrategy
+
+
+class _Rollback(Exception):
+    """Raised to discard the benchmark fixtures."""
+
+
+class Command(BaseCommand):
+    """
+    Compare the query count and latency of the full event feed dump against
+    keyset-cursor pagination.
+
+    All fixtures are created inside a transaction that is rolled back at the end,
+    so the command can safely be pointed at a development database.
+    """
+    help = "Benchmark /events/events: full dump versus cursor pagination."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=2000, help='Number of events to seed.')
+        parser.add_argument('--limit', type=int, default=EventListStrategy.DEFAULT_PAGE_SIZE, help='Page size in cursor mode.')
+        parser.add_argument('--pages', type=int, default=5, help='Number of cursor pages to walk.')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.seed(options['events'])
+                self.run(options['limit'], options['pages'])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+    def seed(self, count):
+        """
+        Insert `count` events owned by a throwaway organizer.
+        """
+        user = AttendeeUser.objects.create_user(
+            username='bench-feed', email='bench-feed@example.com', password='bench-feed',
+            first_name='Bench', last_name='Feed',
+        )
+        organizer = Organizer.objects.create(user=user, organizer_name='bench-feed', email=user.email)
+        now = timezone.now()
+        Event.objects.bulk_create([
+            Event(
+                event_name=f'Bench event {index}',
+                organizer=organizer,
+                event_create_date=now - timedelta(minutes=index),
+                start_date_event=now + timedelta(days=2),
+                end_date_event=now + timedelta(days=3),
+                start_date_register=now - timedelta(days=1),
+                end_date_register=now + timedelta(days=1),
+                description='Benchmark event',
+            )
+            for index in range(count)
+        ], batch_size=1000)
+
+    def measure(self, label, call):
+        """
+        Run `call` once and report its query count and wall-clock latency.
+        """
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = call()
+            elapsed = (time.perf_counter() - start) * 1000
+        count = f"{len(queries)}+" if len(queries) >= connection.queries_log.maxlen else str(len(queries))
+        self.stdout.write(f"{label:<24} {count:>8} queries {elapsed:>10.1f} ms {len(response.content):>12} bytes")
+        return response
+
+    def run(self, limit, pages):
+        request = RequestFactory().get('/api/events/events')
+        request.user = AnonymousUser()
+
+        self.stdout.write(f"{'mode':<24} {'queries':>16} {'latency':>13} {'payload':>18}")
+        self.measure('full dump', lambda: EventListStrategy(request).build_feed())
+        self.measure('full dump (cold cache)', lambda: EventListStrategy(request).execute())
+        self.measure('full dump (warm cache)', lambda: EventListStrategy(request).execute())
+        self.measure('full dump (normalized)', lambda: EventListStrategy(request).build_feed(normalize=True))
+
+        cursor = None
+        for page in range(1, pages + 1):
+            response = self.measure(
+                f'cursor page {page}',
+                lambda: EventListStrategy(request).build_feed(cursor, limit),
+            )
+            cursor = json.loads(response.content).get('next_cursor')
+            if cursor is None:
+                break
@@ -0,0 +1,112 @@
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from threading import Barrier
+from unittest import mock
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.client import RequestFactory
+from django.utils import timezone
+from api.models import AttendeeUser, Event, Organizer, Ticket
+from api.utils import send_registration_confirmation_email
+from api.views.strategy.ticket_strategy import TicketRegisterStrategy
+
+
+class Command(BaseCommand):
+    """
+    Register many attendees for one limited event in parallel and check that the
+    event is never oversold.
+
+    Every registration runs in its own thread and database connection, so the
+    fixtures have to be committed. They are deleted at the end, even when the
+    benchmark fails. Confirmation emails are not queued, so the benchmark does not
+    need a Celery broker. Run it with the `backend.settings_bench` settings to use
+    a scratch database. Since it commits to the configured database, it refuses to
+    run without DEBUG unless --yes is given.
+    """
+    help = "Benchmark concurrent ticket registrations against an event's max_attendee."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attendees', type=int, default=300, help='Number of parallel registrations.')
+        parser.add_argument('--capacity', type=int, default=50, help='max_attendee of the event.')
+        parser.add_argument('--threads', type=int, default=100, help='Number of worker threads.')
+        parser.add_argument('--yes', action='store_true',
+                            help='Write the fixtures to the configured database even when DEBUG is off.')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['yes']:
+            raise CommandError(
+                f"This benchmark commits fixtures to the database {connection.settings_dict['NAME']}, pass --yes "
+                "to confirm. Use DJANGO_SETTINGS_MODULE=backend.settings_bench to run it on a scratch database."
+            )
+        organizer_user, event, attendees = self.seed(options['attendees'], options['capacity'])
+        try:
+            with mock.patch.object(send_registration_confirmation_email, 'delay'):
+                self.run(event, attendees, options['threads'])
+        finally:
+            event.delete()
+            AttendeeUser.objects.filter(pk__in=[organizer_user.pk, *(attendee.pk for attendee in attendees)]).delete()
+
+    def seed(self, count, capacity):
+        """
+        Create an open event limited to `capacity` attendees and `count` attendees.
+        """
+        now = timezone.now()
+        organizer_user = AttendeeUser.objects.create_user(
+            username='bench-tickets', email='bench-tickets@example.com', password='bench-tickets',
+            first_name='Bench', last_name='Tickets',
+        )
+        organizer = Organizer.objects.create(user=organizer_user, organizer_name='bench-tickets', email=organizer_user.email)
+        event = Event.objects.create(
+            event_name='Bench flash sale',
+            organizer=organizer,
+            start_date_event=now + timedelta(days=2),
+            end_date_event=now + timedelta(days=3),
+            start_date_register=now - timedelta(days=1),
+            end_date_register=now + timedelta(days=1),
+            max_attendee=capacity,
+            description='Benchmark event',
+        )
+        usernames = [f'bench-attendee-{index}' for index in range(count)]
+        AttendeeUser.objects.bulk_create([
+            AttendeeUser(
+                username=username, email=f'{username}@example.com',
+                first_name='Bench', last_name='Attendee', birth_date='1990-01-01',
+            )
+            for username in usernames
+        ])
+        attendees = list(AttendeeUser.objects.filter(username__in=usernames))
+        return organizer_user, event, attendees
+
+    def run(self, event, attendees, threads):
+        # The first wave of registrations is released at once to maximize contention.
+        barrier = Barrier(min(threads, len(attendees)))
+        factory = RequestFactory()
+
+        def register(index):
+            request = factory.post(f'/api/tickets/event/{event.id}/register')
+            request.user = attendees[index]
+            if index < barrier.parties:
+                barrier.wait()
+            try:
+                return TicketRegisterStrategy().execute(request, event.id).status_code
+            finally:
+                connection.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            statuses = Counter(executor.map(register, range(len(attendees))))
+        elapsed = time.perf_counter() - start
+
+        event.refresh_from_db()
+        sold = Ticket.objects.filter(event=event, status='ACTIVE').count()
+        self.stdout.write(
+            f"{len(attendees)} registrations on {threads} threads in {elapsed:.2f}s, "
+            f"responses {dict(sorted(statuses.items()))}"
+        )
+        self.stdout.write(f"capacity {event.max_attendee}, active tickets {sold}, attendee_count {event.attendee_count}")
+        if sold > event.max_attendee or sold != event.attendee_count:
+            raise CommandError(f"Oversold: {sold} active tickets for {event.max_attendee} spots.")
+        self.stdout.write(self.style.SUCCESS("No oversell."))
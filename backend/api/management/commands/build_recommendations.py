@@ -0,0 +1,26 @@
+import time
+from django.core.management.base import BaseCommand
+from api.recommendations import refresh_recommendations
+
+
+class Command(BaseCommand):
+    """
+    Recompute the similar events and user recommendations from the like, bookmark
+    and ticket tables.
+
+    Without --full, only the events and users with new engagements since the
+    previous run are refreshed.
+    """
+    help = "Build the similar events and per-user event recommendations."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Recompute every event and user.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counts = refresh_recommendations(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {counts['events']} event(s) with {counts['similar_events']} similar events and "
+            f"{counts['users']} user(s) with {counts['recommendations']} recommendations "
+            f"in {time.perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from api.models import Event
+
+
+class Command(BaseCommand):
+    """
+    Recompute the trending score of every event from the like, bookmark and ticket tables.
+
+    The scores are normally maintained incrementally, this repairs them after the
+    decay task stopped running or the half-life setting changed.
+    """
+    help = "Rebuild Event.trending_score from the recent likes, bookmarks and ticket registrations."
+
+    def handle(self, *args, **options):
+        scored = Event.objects.rebuild_trending_scores()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt trending scores, {scored} event(s) are trending."))
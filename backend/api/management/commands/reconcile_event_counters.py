@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from api.cache import bump_feed_version
+from api.models import Event
+
+
+class Command(BaseCommand):
+    """
+    Recompute the stored attendee, like and bookmark counters of every event
+    that drifted from the ticket, like and bookmark tables.
+
+    The correction runs as one bulk UPDATE, so it is safe to schedule regularly.
+    """
+    help = "Reconcile Event.attendee_count, like_count and bookmark_count with the engagement tables."
+
+    def handle(self, *args, **options):
+        corrected = Event.objects.reconcile_counters()
+        if corrected:
+            bump_feed_version()
+        self.stdout.write(self.style.SUCCESS(f"Reconciled counters of {corrected} event(s)."))
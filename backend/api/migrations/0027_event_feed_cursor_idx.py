@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 07:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_event_other_url'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['-event_create_date', '-id'], name='event_feed_cursor_idx'),
+        ),
+    ]
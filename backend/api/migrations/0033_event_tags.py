@@ -0,0 +1,46 @@
+# Generated by Django 4.2.16 on 2026-10-18 08:11
+
+from django.db import migrations, models
+
+
+def backfill_tags(apps, schema_editor):
+    Event = apps.get_model('api', 'Event')
+    Tag = apps.get_model('api', 'Tag')
+    EventTags = Event.normalized_tags.through
+
+    event_tags = {}
+    for event_id, tags in Event.objects.exclude(tags='').values_list('id', 'tags').iterator():
+        names = (name.strip().lower()[:50] for name in tags.split(','))
+        event_tags[event_id] = list(dict.fromkeys(name for name in names if name))
+
+    names = {name for tag_names in event_tags.values() for name in tag_names}
+    Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    tag_ids = dict(Tag.objects.filter(name__in=names).values_list('name', 'id'))
+    EventTags.objects.bulk_create([
+        EventTags(event_id=event_id, tag_id=tag_ids[name])
+        for event_id, tag_names in event_tags.items()
+        for name in tag_names
+    ], batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0032_event_location_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='normalized_tags',
+            field=models.ManyToManyField(blank=True, related_name='events', to='api.tag'),
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.16 on 2026-10-18 08:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_allowed_domains(apps, schema_editor):
+    Event = apps.get_model('api', 'Event')
+    EventAllowedDomain = apps.get_model('api', 'EventAllowedDomain')
+
+    rows = []
+    events = Event.objects.exclude(allowed_email_domains__isnull=True).exclude(allowed_email_domains='')
+    for event_id, domains in events.values_list('id', 'allowed_email_domains').iterator():
+        names = (domain.strip().lower() for domain in domains.split(','))
+        rows += [EventAllowedDomain(event_id=event_id, domain=name) for name in dict.fromkeys(names) if name]
+    EventAllowedDomain.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0033_event_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventAllowedDomain',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(max_length=253)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='allowed_domains', to='api.event')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='eventalloweddomain',
+            constraint=models.UniqueConstraint(fields=('event', 'domain'), name='event_allowed_domain_unique'),
+        ),
+        migrations.RunPython(backfill_allowed_domains, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.16 on 2026-10-18 08:47
+
+from django.db import migrations, models
+from api.search import install_search_index, rebuild_search_index, uninstall_search_index
+from api.trending import rebuild_scores
+
+
+# SQLite adds the column by rebuilding api_event, which its full-text search
+# triggers cannot survive, so the search index is dropped and rebuilt around it.
+def drop_sqlite_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        uninstall_search_index(schema_editor.connection)
+
+
+def restore_sqlite_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        install_search_index(schema_editor.connection)
+        rebuild_search_index(schema_editor.connection)
+
+
+def backfill_trending_scores(apps, schema_editor):
+    rebuild_scores(apps.get_model('api', 'Event'), [
+        (apps.get_model('api', 'Like').objects.filter(status='like'), 'liked_at', 'like'),
+        (apps.get_model('api', 'Bookmarks').objects.all(), 'bookmark_at', 'bookmark'),
+        (apps.get_model('api', 'Ticket').objects.filter(status='ACTIVE'), 'register_date', 'ticket'),
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0034_event_allowed_domains'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_sqlite_search_index, restore_sqlite_search_index),
+        migrations.AddField(
+            model_name='event',
+            name='trending_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['-trending_score', '-id'], name='event_trending_idx'),
+        ),
+        migrations.RunPython(restore_sqlite_search_index, drop_sqlite_search_index),
+        migrations.RunPython(backfill_trending_scores, migrations.RunPython.noop),
+    ]
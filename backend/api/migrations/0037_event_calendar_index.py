@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 08:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0036_event_recommendations'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start_date_event', 'end_date_event'], name='event_calendar_idx'),
+        ),
+    ]
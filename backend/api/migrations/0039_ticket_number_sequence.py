@@ -0,0 +1,20 @@
+# Generated by Django 4.2.16 on 2026-10-18 09:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0038_event_waitlist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketNumberSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
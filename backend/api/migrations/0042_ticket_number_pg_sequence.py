@@ -0,0 +1,41 @@
+from django.db import migrations
+
+SEQUENCE_NAME = 'api_ticket_number_seq'
+
+
+def create_sequence(apps, schema_editor):
+    """
+    Create the PostgreSQL sequence of ticket numbers, continuing after the counter row.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    TicketNumberSequence = apps.get_model('api', 'TicketNumberSequence')
+    counter = TicketNumberSequence.objects.filter(pk=1).values_list('value', flat=True).first() or 0
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {SEQUENCE_NAME} AS bigint MINVALUE 1")
+        cursor.execute("SELECT setval(%s, %s, %s)", [SEQUENCE_NAME, max(counter, 1), counter > 0])
+
+
+def drop_sequence(apps, schema_editor):
+    """
+    Copy the position of the sequence back into the counter row and drop the sequence.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    TicketNumberSequence = apps.get_model('api', 'TicketNumberSequence')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT last_value, is_called FROM {SEQUENCE_NAME}")
+        last_value, is_called = cursor.fetchone()
+        TicketNumberSequence.objects.update_or_create(pk=1, defaults={'value': last_value if is_called else last_value - 1})
+        cursor.execute(f"DROP SEQUENCE IF EXISTS {SEQUENCE_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0041_idempotency_record'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_sequence, drop_sequence),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 10:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0042_ticket_number_pg_sequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['end_date_register', 'start_date_register'], name='event_reg_window_idx'),
+        ),
+    ]
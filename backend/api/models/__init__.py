@@ -1,11 +1,19 @@
 from api.models.user import AttendeeUser
 from api.models.event import Event
 from api.models.organizer import Organizer
-from api.models.ticket import Ticket
+from api.models.ticket import Ticket, TicketNumberSequence
 from api.models.bookmarks import Bookmarks
 from api.models.like import Like
 from api.models.comment import Comment, CommentReaction
+from api.models.tag import Tag
+from api.models.allowed_domain import EventAllowedDomain
+from api.models.recommendation import SimilarEvent, UserRecommendation
+from api.models.waitlist import WaitlistEntry
+from api.models.checkpoint import JobCheckpoint
+from api.models.idempotency import IdempotencyRecord
 
 __all__ = ['AttendeeUser', 'Event', 'Organizer',
            'Session', 'Ticket', 'Bookmarks', 'Like',
-           'Comment', 'CommentReaction']
\ No newline at end of file
+           'Comment', 'CommentReaction', 'Tag', 'EventAllowedDomain',
+           'SimilarEvent', 'UserRecommendation', 'WaitlistEntry', 'TicketNumberSequence', 'JobCheckpoint',
+           'IdempotencyRecord']
\ No newline at end of file
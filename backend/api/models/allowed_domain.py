@@ -0,0 +1,42 @@
+from django.db import models
+
+
+class EventAllowedDomain(models.Model):
+    """
+    Email domain allowed to register for a private event.
+
+    The rows mirror the comma-separated `Event.allowed_email_domains` and are kept in
+    sync by `Event.save`, so visibility and registration checks are indexed lookups.
+    """
+    event = models.ForeignKey('api.Event', on_delete=models.CASCADE, related_name='allowed_domains')
+    domain = models.CharField(max_length=253)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'domain'], name='event_allowed_domain_unique'),
+        ]
+
+    @staticmethod
+    def parse(domains: str) -> list:
+        """
+        Split a comma-separated domain string into normalized domains.
+
+        Args:
+            domains (str): Comma-separated domains, as stored in `Event.allowed_email_domains`.
+
+        Returns:
+            list: The unique, lowercased and stripped domains, in order of appearance.
+        """
+        names = (domain.strip().lower() for domain in (domains or '').split(','))
+        return list(dict.fromkeys(name for name in names if name))
+
+    @staticmethod
+    def email_domain(email: str) -> str:
+        """
+        Get the lowercased domain of an email address, or '' if it has none.
+        """
+        parts = (email or '').split('@')
+        return parts[1].lower() if len(parts) > 1 else ''
+
+    def __str__(self):
+        return f"{self.domain} for event {self.event_id}"
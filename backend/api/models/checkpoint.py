@@ -0,0 +1,16 @@
+from django.db import models
+
+
+class JobCheckpoint(models.Model):
+    """
+    Time up to which a periodic job has processed the data.
+
+    There is one row per job. It is read with a row lock and moved forward in the
+    transaction of the job's writes, so every worker process sees the same
+    checkpoint, and concurrent runs do not process the same interval twice.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} at {self.at}"
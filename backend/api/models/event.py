@@ -1,10 +1,325 @@
 import re
 from django.db import models
+from django.db.models import Case, Count, Exists, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
 from django.core.files.storage import default_storage
 from django.core.validators import MaxValueValidator, FileExtensionValidator
 from django.core.exceptions import ValidationError
 from api.models.organizer import Organizer
+from api.trending import decay_scores, rebuild_scores
+
+
+def visible_to_everyone(prefix: str = '') -> Q:
+    """
+    Condition on the events that every user, including anonymous ones, can see.
+
+    Used for results shared by all users, such as the cached map tiles and tag counts.
+
+    Args:
+        prefix (str): The lookup path to the event, for example 'events__' from a Tag.
+
+    Returns:
+        Q: Public events and private events without domain restrictions.
+    """
+    from api.models.allowed_domain import EventAllowedDomain
+    restrictions = EventAllowedDomain.objects.filter(event=OuterRef(f'{prefix}pk'))
+    return Q(**{f'{prefix}visibility': 'PUBLIC'}) | ~Exists(restrictions)
+
+
+class EventQuerySet(models.QuerySet):
+    """
+    QuerySet for events with helpers shared by the event list endpoints.
+    """
+
+    @staticmethod
+    def _count_per_event(queryset):
+        """
+        Build a correlated COUNT(*) subquery of `queryset` rows for the outer event.
+        """
+        totals = (queryset.filter(event=OuterRef('pk'))
+                  .order_by()
+                  .values('event')
+                  .annotate(total=Count('pk'))
+                  .values('total'))
+        return Coalesce(Subquery(totals, output_field=models.IntegerField()), 0)
+
+    @classmethod
+    def _engagement_counts(cls) -> dict:
+        """
+        Build the active ticket, like and bookmark COUNT subqueries, keyed by counter name.
+        """
+        from api.models.like import Like
+        from api.models.bookmarks import Bookmarks
+        from api.models.ticket import Ticket
+
+        return {
+            'attendee_count': cls._count_per_event(Ticket.objects.filter(status='ACTIVE')),
+            'like_count': cls._count_per_event(Like.objects.filter(status='like')),
+            'bookmark_count': cls._count_per_event(Bookmarks.objects.all()),
+        }
+
+    def with_engagement_counts(self):
+        """
+        Annotate every event with its like, bookmark and active ticket counts
+        computed from the engagement tables.
+
+        The stored counters are what the API serves; these annotations are the
+        source of truth they are reconciled against.
+
+        Returns:
+            EventQuerySet: Events annotated with `total_likes`, `total_bookmarks`
+            and `total_attendees`.
+        """
+        counts = self._engagement_counts()
+        return self.annotate(
+            total_attendees=counts['attendee_count'],
+            total_likes=counts['like_count'],
+            total_bookmarks=counts['bookmark_count'],
+        )
+
+    def adjust_counters(self, event_id: int, **deltas) -> int:
+        """
+        Atomically add `deltas` to the stored counters of one event.
+
+        The increment happens in the database with F() expressions, so concurrent
+        requests never overwrite each other's updates. Counters are clamped at zero.
+
+        Args:
+            event_id (int): The ID of the event to update.
+            **deltas: Counter name to increment, e.g. `attendee_count=1` or `like_count=-1`.
+
+        Returns:
+            int: The number of updated rows.
+        """
+        return self.filter(pk=event_id).update(**{
+            field: Greatest(F(field) + delta, 0) for field, delta in deltas.items()
+        })
+
+    def reserve_spot(self, event_id: int, count: int = 1, **deltas) -> bool:
+        """
+        Atomically take `count` attendee spots of an event, unless it does not have that many left.
+
+        The capacity check and the increment are a single conditional UPDATE, so
+        concurrent registrations cannot oversell the event: the database locks the
+        row, and a request that finds the event full updates nothing. Must run in the
+        same transaction as the ticket insert, so a failed insert releases the spot.
+
+        Args:
+            event_id (int): The ID of the event to reserve a spot of.
+            count (int): The number of spots to reserve.
+            **deltas: Other counters to increment in the same UPDATE, see `adjust_counters`.
+
+        Returns:
+            bool: True if the spots were reserved, False if the event is too full.
+        """
+        has_room = (Q(max_attendee__isnull=True) | Q(max_attendee=0)
+                    | Q(attendee_count__lte=F('max_attendee') - count))
+        return self.filter(has_room, pk=event_id).update(
+            attendee_count=F('attendee_count') + count,
+            **{field: Greatest(F(field) + delta, 0) for field, delta in deltas.items()},
+        ) == 1
+
+    def reconcile_counters(self) -> int:
+        """
+        Recompute the stored counters of every event whose counters drifted
+        from the engagement tables, in a single bulk UPDATE.
+
+        Returns:
+            int: The number of events whose counters were corrected.
+        """
+        drifted = self.with_engagement_counts().filter(
+            ~Q(attendee_count=F('total_attendees'))
+            | ~Q(like_count=F('total_likes'))
+            | ~Q(bookmark_count=F('total_bookmarks'))
+        ).values('pk')
+        return self.model.objects.filter(pk__in=drifted).update(**self._engagement_counts())
+
+    def decay_trending_scores(self, now=None) -> int:
+        """
+        Decay the trending scores by the time elapsed since the previous run,
+        see `api.trending.decay_scores`.
+
+        Args:
+            now (datetime, optional): The reference time, defaults to the current time.
+
+        Returns:
+            int: The number of decayed events.
+        """
+        from api.models.checkpoint import JobCheckpoint
+
+        return decay_scores(self, JobCheckpoint, now)
+
+    def rebuild_trending_scores(self, now=None) -> int:
+        """
+        Recompute every trending score from the like, bookmark and active ticket tables.
+
+        Args:
+            now (datetime, optional): The reference time, defaults to the current time.
+
+        Returns:
+            int: The number of events with a positive score.
+        """
+        from api.models.like import Like
+        from api.models.bookmarks import Bookmarks
+        from api.models.ticket import Ticket
+        from api.models.checkpoint import JobCheckpoint
+
+        return rebuild_scores(self.model, [
+            (Like.objects.filter(status='like'), 'liked_at', 'like'),
+            (Bookmarks.objects.all(), 'bookmark_at', 'bookmark'),
+            (Ticket.objects.filter(status='ACTIVE'), 'register_date', 'ticket'),
+        ], now, JobCheckpoint)
+
+    def version_tags(self, limit: int = None, now=None) -> list:
+        """
+        Get the version tag of every event, see `Event.version_tag`.
+
+        Only the handful of columns the tags depend on are loaded, so this is much
+        cheaper than fetching and serializing the events themselves.
+
+        Args:
+            limit (int, optional): Only tag the first `limit` events.
+            now (datetime, optional): The reference time, defaults to the current time.
+
+        Returns:
+            list: One version tag per event, in queryset order.
+        """
+        now = now or timezone.now()
+        events = self.select_related('organizer').only(*Event.VERSION_FIELDS, 'organizer__updated_at')
+        if limit is not None:
+            events = events[:limit]
+        return [event.version_tag(now) for event in events]
+
+    @staticmethod
+    def _status_predicates(now):
+        """
+        Map every event status to the date predicate that holds while the event is in it.
+        """
+        return {
+            'UPCOMING': Q(start_date_event__gt=now),
+            'ONGOING': Q(start_date_event__lte=now, end_date_event__gt=now),
+            'COMPLETED': Q(end_date_event__lte=now),
+        }
+
+    def with_status(self, status: str, now=None):
+        """
+        Filter events by their derived status directly in SQL.
+
+        The status is derived from the event dates rather than the stored column,
+        so the filter is always current and can use the date indexes.
+
+        Args:
+            status (str): 'UPCOMING', 'ONGOING' or 'COMPLETED'.
+            now (datetime, optional): The reference time, defaults to the current time.
+
+        Returns:
+            EventQuerySet: The events currently in the given status.
+
+        Raises:
+            ValueError: If the status is unknown.
+        """
+        predicates = self._status_predicates(now or timezone.now())
+        if status not in predicates:
+            raise ValueError(f"Unknown event status: {status}")
+        return self.filter(predicates[status])
+
+    def with_computed_status(self, now=None):
+        """
+        Annotate events with their derived status as `computed_status`, computed in SQL.
+
+        Args:
+            now (datetime, optional): The reference time, defaults to the current time.
+
+        Returns:
+            EventQuerySet: The events with a `computed_status` annotation.
+        """
+        predicates = self._status_predicates(now or timezone.now())
+        return self.annotate(computed_status=Case(
+            *(When(predicate, then=Value(status)) for status, predicate in predicates.items()),
+            output_field=models.CharField(),
+        ))
+
+    def overlapping(self, start, end):
+        """
+        Filter the events that take place at some point between `start` and `end`.
+
+        An event overlaps the window when it starts before the window ends and ends
+        after the window starts, which the (start_date_event, end_date_event) index serves.
+
+        Args:
+            start (datetime): The start of the window.
+            end (datetime): The end of the window.
+
+        Returns:
+            EventQuerySet: The events overlapping the window.
+        """
+        return self.filter(start_date_event__lt=end, end_date_event__gt=start)
+
+    def visible_to(self, user):
+        """
+        Filter out the private events that `user` is not allowed to register for.
+
+        Public events and private events without domain restrictions are visible to
+        everyone. Restricted private events are visible to their organizer and to users
+        whose email domain is allowed, which is checked against the indexed
+        `EventAllowedDomain` rows instead of parsing the domain lists in Python.
+
+        Args:
+            user (User): The requesting user, possibly anonymous.
+
+        Returns:
+            EventQuerySet: The events visible to the user.
+        """
+        from api.models.allowed_domain import EventAllowedDomain
+        restrictions = EventAllowedDomain.objects.filter(event=OuterRef('pk'))
+        visible = visible_to_everyone()
+        if user is not None and user.is_authenticated:
+            domain = EventAllowedDomain.email_domain(user.email)
+            if domain:
+                visible |= Exists(restrictions.filter(domain=domain))
+            visible |= Q(organizer__user=user)
+        return self.filter(visible)
+
+    def sync_statuses(self, now=None) -> dict:
+        """
+        Persist `status` and `status_registeration` for the events whose next
+        transition time has passed.
+
+        Each transition is a single bulk UPDATE that only selects the rows that
+        have to move, through the (status, date) indexes, so the cost of a run
+        depends on the number of transitions rather than on the number of events.
+        `updated_at` is left untouched since the events themselves were not edited.
+
+        Args:
+            now (datetime, optional): The reference time, defaults to the current time.
+
+        Returns:
+            dict: The number of events moved by each transition.
+        """
+        now = now or timezone.now()
+        stored_statuses = ['', *Event.EVENT_STATUSES]
+        transitions = {}
+        for status, predicate in self._status_predicates(now).items():
+            previous = [value for value in stored_statuses if value != status]
+            transitions[status] = self.filter(predicate, status__in=previous).update(status=status)
+
+        is_full = Q(max_attendee__gt=0, attendee_count__gte=F('max_attendee'))
+        # Only events open for registration fill up, so the counters are compared on the
+        # rows of the registration window index, plus the events that closed since the
+        # last run without being marked full.
+        can_fill = (Q(end_date_register__gte=now, start_date_register__lte=now)
+                    | Q(end_date_register__lt=now, status_registeration='OPEN'))
+        transitions['FULL'] = (self.filter(can_fill, is_full)
+                               .exclude(status_registeration='FULL')
+                               .update(status_registeration='FULL'))
+        transitions['CLOSED'] = (self.filter(end_date_register__lt=now, status_registeration__in=['OPEN', 'FULL'])
+                                 .exclude(is_full)
+                                 .update(status_registeration='CLOSED'))
+        transitions['OPEN'] = (self.filter(end_date_register__gte=now, status_registeration__in=['CLOSED', 'FULL'])
+                               .exclude(is_full)
+                               .update(status_registeration='OPEN'))
+        return transitions
 
 
 class Event(models.Model):
@@ -53,6 +368,11 @@ class Event(models.Model):
         ('VERIFIED', 'Verified'),
         ('REJECTED', 'Rejected'),
     ]
+    EVENT_STATUSES = ['UPCOMING', 'ONGOING', 'COMPLETED']
+    VERSION_FIELDS = [
+        'id', 'updated_at', 'organizer', 'attendee_count', 'like_count', 'bookmark_count',
+        'max_attendee', 'start_date_event', 'end_date_event', 'end_date_register',
+    ]
     # Existing fields
     event_name = models.CharField(max_length=100)
     organizer = models.ForeignKey(Organizer, on_delete=models.CASCADE, related_name='events')
@@ -88,6 +408,7 @@ class Event(models.Model):
     # Categorization
     category = models.CharField(max_length=50, choices=EVENT_CATEGORIES, default='OTHER')
     tags = models.CharField(max_length=200, blank=True, help_text="Comma-separated tags")
+    normalized_tags = models.ManyToManyField('api.Tag', related_name='events', blank=True)
     
     # Privacy settings
     visibility = models.CharField(
@@ -135,28 +456,42 @@ class Event(models.Model):
     
     terms_and_conditions = models.TextField(null=True, blank=True)
 
-        
+    # Engagement counters, kept in step with the engagement tables by the
+    # strategies that write them (see EventQuerySet.adjust_counters).
+    attendee_count = models.PositiveIntegerField(default=0)
+    like_count = models.PositiveIntegerField(default=0)
+    bookmark_count = models.PositiveIntegerField(default=0)
+    # Time-decayed engagement score, updated with the counters and decayed
+    # periodically (see api.trending).
+    trending_score = models.FloatField(default=0)
+
+    objects = EventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-event_create_date', '-id'], name='event_feed_cursor_idx'),
+            models.Index(fields=['status', 'start_date_event'], name='event_status_start_idx'),
+            models.Index(fields=['status', 'end_date_event'], name='event_status_end_idx'),
+            models.Index(fields=['status_registeration', 'end_date_register'], name='event_reg_status_end_idx'),
+            models.Index(fields=['end_date_register', 'start_date_register'], name='event_reg_window_idx'),
+            models.Index(fields=['start_date_event', 'id'], name='event_soonest_idx'),
+            models.Index(fields=['-like_count', '-id'], name='event_most_liked_idx'),
+            models.Index(fields=['ticket_price', 'id'], name='event_cheapest_idx'),
+            models.Index(fields=['category', 'start_date_event'], name='event_category_start_idx'),
+            models.Index(fields=['visibility', 'event_create_date'], name='event_visibility_created_idx'),
+            models.Index(fields=['is_free', 'start_date_event'], name='event_free_start_idx'),
+            models.Index(fields=['is_online', 'start_date_event'], name='event_online_start_idx'),
+            models.Index(fields=['latitude', 'longitude'], name='event_location_idx'),
+            models.Index(fields=['-trending_score', '-id'], name='event_trending_idx'),
+            models.Index(fields=['start_date_event', 'end_date_event'], name='event_calendar_idx'),
+        ]
+
     @property
     def current_number_attendee(self):
         """
-        Get the total Event's ticket number.
-        """
-        return self.ticket_set.count()
-    
-    @property
-    def like_count(self):
-        """
-        Get the total Event's likes.
-        """
-        return self.likes.filter(status='like').count()
-    
-    @property
-    def bookmark_count(self):
+        Get the total Event's active ticket number.
         """
-        Get the total Event's bookmarks.
-        """
-        return self.bookmarks_set.count() 
-    
+        return self.attendee_count
 
     def available_spot(self) -> int:
         """
@@ -176,11 +511,9 @@ class Event(models.Model):
         Return:
             bool: True if event is full on slots, False if event is not full
         """
-        if self.max_attendee == 0:
+        if not self.max_attendee:
             return False
-        if self.current_number_attendee == self.max_attendee:
-            return True
-        return False  
+        return self.current_number_attendee >= self.max_attendee
     
     def is_valid_date(self) -> bool:
         return self.start_date_register <= self.end_date_register <= self.start_date_event <= self.end_date_event
@@ -199,22 +532,111 @@ class Event(models.Model):
         """Check if the registration status is allowed to register."""
         return self.status_registeration not in ('CLOSED', 'FULL')
     
+    def compute_status(self, now=None) -> str:
+        """
+        Compute the status of the event without modifying the event.
+
+        Args:
+            now (datetime, optional): The reference time, defaults to the current time.
+
+        Returns:
+            str: 'UPCOMING', 'ONGOING', or 'COMPLETED' depending on whether the
+            reference time is before the event start, during the event, or after
+            the event has ended.
+        """
+        now = now or timezone.now()
+        if now < self.start_date_event:
+            return 'UPCOMING'
+        if now < self.end_date_event:
+            return 'ONGOING'
+        return 'COMPLETED'
+
+    def compute_registeration_status(self, now=None) -> str:
+        """
+        Compute the registration status of the event without modifying the event.
+
+        Args:
+            now (datetime, optional): The reference time, defaults to the current time.
+
+        Returns:
+            str: 'FULL' if the maximum number of attendee has been reached, 'CLOSED'
+            if the reference time is after the registration end date, 'OPEN' otherwise.
+        """
+        if not self.end_date_register:
+            raise ValueError("End date of registration cannot be null")
+        now = now or timezone.now()
+        if self.max_attendee and self.current_number_attendee >= self.max_attendee:
+            return "FULL"
+        if now > self.end_date_register:
+            return "CLOSED"
+        return "OPEN"
+
+    def sync_tags(self) -> None:
+        """
+        Link the event to the Tag rows named in its comma-separated `tags`.
+        """
+        from api.models.tag import Tag
+        self.normalized_tags.set(Tag.objects.ensure(Tag.parse(self.tags)))
+
+    def sync_allowed_domains(self) -> None:
+        """
+        Mirror the comma-separated `allowed_email_domains` into EventAllowedDomain rows.
+
+        Only the domains that were added or removed are written.
+        """
+        from api.models.allowed_domain import EventAllowedDomain
+        domains = set(EventAllowedDomain.parse(self.allowed_email_domains))
+        current = set(self.allowed_domains.values_list('domain', flat=True))
+        if current - domains:
+            self.allowed_domains.filter(domain__in=current - domains).delete()
+        if domains - current:
+            EventAllowedDomain.objects.bulk_create(
+                [EventAllowedDomain(event=self, domain=domain) for domain in domains - current],
+                ignore_conflicts=True,
+            )
+
+    def save(self, *args, **kwargs):
+        """
+        Save the event and keep its EventAllowedDomain rows in sync.
+        """
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            if 'allowed_email_domains' not in self.get_deferred_fields():
+                self.sync_allowed_domains()
+        elif 'allowed_email_domains' in update_fields:
+            self.sync_allowed_domains()
+
+    def version_tag(self, now=None) -> tuple:
+        """
+        Get a tuple that changes whenever the serialized event changes.
+
+        It combines the edit timestamps of the event and its organizer, the
+        engagement counters, which are updated without touching `updated_at`,
+        and the statuses derived from the reference time.
+
+        Args:
+            now (datetime, optional): The reference time, defaults to the current time.
+
+        Returns:
+            tuple: The version tag of the event.
+        """
+        now = now or timezone.now()
+        return (
+            self.id, self.updated_at.isoformat(), self.organizer.updated_at.isoformat(),
+            self.attendee_count, self.like_count, self.bookmark_count,
+            self.compute_status(now), self.compute_registeration_status(now),
+        )
+
     def set_status_event(self):
         """
         Set the status of the event based on the current date and time.
 
         The status can be 'UPCOMING', 'ONGOING', or 'COMPLETED' depending on
         whether the current time is before the event start, during the event,
-        or after the event has ended.
+        or after the event has ended. The event is not saved.
         """
-        now = timezone.now()  
-        
-        if now < self.start_date_event:
-            self.status = 'UPCOMING'  
-        elif now < self.end_date_event:
-            self.status = 'ONGOING'  
-        else:
-            self.status = 'COMPLETED'
+        self.status = self.compute_status()
             
     def set_registeration_status(self):
         """
@@ -222,46 +644,30 @@ class Event(models.Model):
 
         The status can be 'CLOSED', 'FULL', or 'OPEN' depending on whether the current time is
         after the event registration end date, whether the maximum number of attendee has been
-        reached, or neither of the above has occurred.
-
-        The function will save the event object after setting the status.
+        reached, or neither of the above has occurred. The event is not saved, persisting the
+        status is left to the `advance_event_lifecycle` task.
         """
-        if not self.end_date_register:
-            raise ValueError("End date of registration cannot be null")
-        now = timezone.now()
-        if self.max_attendee:
-            if self.current_number_attendee >= self.max_attendee:
-                self.status_registeration = "FULL"
-        elif now > self.end_date_register:
-            self.status_registeration = "CLOSED"
-        else:
-            self.status_registeration = "OPEN"
-        self.save()
+        self.status_registeration = self.compute_registeration_status()
  
     def is_email_allowed(self, email: str) -> bool:
         """
         Check if an email address is allowed to register for this event
         based on the domain restrictions.
 
+        The check is a single lookup on the (event, domain) index of
+        EventAllowedDomain.
+
         Args:
             email (str): Email address to check
 
         Returns:
             bool: True if email is allowed, False otherwise
         """
-        if self.visibility == 'PUBLIC' or not self.allowed_email_domains:
+        from api.models.allowed_domain import EventAllowedDomain
+        if self.visibility == 'PUBLIC' or not EventAllowedDomain.parse(self.allowed_email_domains):
             return True
-        try:
-            domain = email.split('@')[1].lower()
-        except IndexError:
-            return False
-        allowed_domains = [
-            d.strip().lower()
-            for d in self.allowed_email_domains.split(',')
-            if d.strip()
-        ]
-
-        return domain in allowed_domains
+        domain = EventAllowedDomain.email_domain(email)
+        return bool(domain) and self.allowed_domains.filter(domain=domain).exists()
 
     def clean(self):
         """
@@ -0,0 +1,96 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import models
+from django.http import HttpResponse
+from django.utils import timezone
+from api.models.user import AttendeeUser
+
+
+class IdempotencyRecordManager(models.Manager):
+    def claim(self, user, method: str, path: str, key: str, now=None):
+        """
+        Get the stored response of an Idempotency-Key, or claim the key to handle the request.
+
+        A new key is claimed by inserting its row, so concurrent requests with the
+        same key cannot both claim it, whichever worker they reach. A key whose
+        response expired after IDEMPOTENCY_KEY_TIMEOUT, or whose request did not
+        finish within IDEMPOTENCY_LOCK_TIMEOUT, is claimed again with a conditional
+        UPDATE.
+
+        Args:
+            user (AttendeeUser): The user sending the request.
+            method (str): The HTTP method of the request.
+            path (str): The path of the request.
+            key (str): The Idempotency-Key header.
+            now (datetime, optional): The reference time, defaults to the current time.
+
+        Returns:
+            tuple: The record, and whether it was claimed. An unclaimed record either
+            holds a response to replay or belongs to a request still in progress.
+        """
+        now = now or timezone.now()
+        record, created = self.get_or_create(user=user, method=method, path=path, key=key,
+                                             defaults={'created_at': now})
+        if created:
+            return record, True
+        if record.status_code is not None:
+            expired = record.created_at <= now - timedelta(seconds=settings.IDEMPOTENCY_KEY_TIMEOUT)
+        else:
+            expired = record.created_at <= now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+        if not expired:
+            return record, False
+        claimed = self.filter(pk=record.pk, created_at=record.created_at).update(
+            created_at=now, status_code=None, content_type='', content=b'',
+        ) == 1
+        if claimed:
+            record.created_at, record.status_code, record.content_type, record.content = now, None, '', b''
+        return record, claimed
+
+    def purge(self, now=None) -> int:
+        """
+        Delete the records whose response can no longer be replayed.
+
+        Args:
+            now (datetime, optional): The reference time, defaults to the current time.
+
+        Returns:
+            int: The number of deleted records.
+        """
+        now = now or timezone.now()
+        timeout = max(settings.IDEMPOTENCY_KEY_TIMEOUT, settings.IDEMPOTENCY_LOCK_TIMEOUT)
+        deleted, _ = self.filter(created_at__lte=now - timedelta(seconds=timeout)).delete()
+        return deleted
+
+
+class IdempotencyRecord(models.Model):
+    """
+    Response of a request sent with an Idempotency-Key, replayed to its retries.
+
+    The status is null while the first request is still being handled.
+    """
+    user = models.ForeignKey(AttendeeUser, on_delete=models.CASCADE, related_name='idempotency_records')
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=255)
+    key = models.CharField(max_length=255)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    content_type = models.CharField(max_length=100, blank=True, default='')
+    content = models.BinaryField(default=b'')
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    objects = IdempotencyRecordManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'method', 'path', 'key'], name='idempotency_record_unique'),
+        ]
+
+    def replay(self) -> HttpResponse:
+        """
+        Build the stored response again, marked with an Idempotent-Replayed header.
+        """
+        response = HttpResponse(bytes(self.content), status=self.status_code, content_type=self.content_type)
+        response['Idempotent-Replayed'] = 'true'
+        return response
+
+    def __str__(self):
+        return f"{self.method} {self.path} with key {self.key} of user {self.user_id}"
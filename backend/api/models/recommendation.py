@@ -0,0 +1,41 @@
+from django.db import models
+
+
+class SimilarEvent(models.Model):
+    """
+    Event that the users who engaged with `event` also engaged with.
+
+    The rows are computed offline by `api.recommendations.refresh_recommendations`
+    and read best first through the (event, -score) index.
+    """
+    event = models.ForeignKey('api.Event', on_delete=models.CASCADE, related_name='similar_events')
+    similar_event = models.ForeignKey('api.Event', on_delete=models.CASCADE, related_name='similar_to')
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['event', '-score'], name='similar_event_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"Event {self.similar_event_id} is similar to event {self.event_id} ({self.score:.3f})"
+
+
+class UserRecommendation(models.Model):
+    """
+    Event recommended to a user from the events similar to the ones they engaged with.
+
+    The rows are computed offline by `api.recommendations.refresh_recommendations`
+    and read best first through the (user, -score) index.
+    """
+    user = models.ForeignKey('api.AttendeeUser', on_delete=models.CASCADE, related_name='recommendations')
+    event = models.ForeignKey('api.Event', on_delete=models.CASCADE, related_name='recommended_to')
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-score'], name='user_recommendation_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"Event {self.event_id} recommended to user {self.user_id} ({self.score:.3f})"
@@ -0,0 +1,42 @@
+from django.db import models
+
+
+class TagManager(models.Manager):
+    def ensure(self, names):
+        """
+        Get the tags with the given names, creating the missing ones.
+
+        Args:
+            names (list): Normalized tag names, see `Tag.parse`.
+
+        Returns:
+            QuerySet: The tags with the given names.
+        """
+        self.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+        return self.filter(name__in=names)
+
+
+class Tag(models.Model):
+    """Normalized event tag, linked to the events that use it."""
+    MAX_LENGTH = 50
+
+    name = models.CharField(max_length=MAX_LENGTH, unique=True)
+
+    objects = TagManager()
+
+    @classmethod
+    def parse(cls, tags: str) -> list:
+        """
+        Split a comma-separated tag string into normalized tag names.
+
+        Args:
+            tags (str): Comma-separated tags, as stored in `Event.tags`.
+
+        Returns:
+            list: The unique, lowercased and stripped tag names, in order of appearance.
+        """
+        names = (name.strip().lower()[:cls.MAX_LENGTH] for name in (tags or '').split(','))
+        return list(dict.fromkeys(name for name in names if name))
+
+    def __str__(self):
+        return self.name
@@ -1,13 +1,89 @@
 from typing import Optional, Dict
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import F
 from django.utils import timezone
-import random
-import string
 from django.core.exceptions import ValidationError, PermissionDenied
 from api.models.organizer import Organizer
 from api.models.event import Event
 from api.models.user import AttendeeUser
 from api.utils import TicketNotificationManager
+from api.trending import engagement_weight
+from api.ticket_numbers import format_ticket_number
+
+
+class TicketNumberSequenceManager(models.Manager):
+    # PostgreSQL sequence the values are taken from, created by migration 0042.
+    SEQUENCE_NAME = 'api_ticket_number_seq'
+
+    def allocate(self, count: int = 1) -> list:
+        """
+        Take `count` unused values of the ticket number sequence.
+
+        On PostgreSQL the values come from a database sequence. nextval() is not
+        transactional, so concurrent registrations of any event never wait on each
+        other, and a rolled back transaction only leaves a gap in the numbers.
+        Other backends increment the counter row, which is locked until the calling
+        transaction ends; SQLite serializes writing transactions anyway.
+
+        Args:
+            count (int): The number of values to take.
+
+        Returns:
+            list: The allocated values, in increasing order.
+        """
+        connection = connections[self.db]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT nextval(%s) FROM generate_series(1, %s)", [self.SEQUENCE_NAME, count])
+                return sorted(value for value, in cursor.fetchall())
+        with transaction.atomic(using=self.db):
+            sequence, _ = self.select_for_update().get_or_create(pk=1)
+            self.filter(pk=1).update(value=F('value') + count)
+            return list(range(sequence.value + 1, sequence.value + count + 1))
+
+
+class TicketNumberSequence(models.Model):
+    """
+    Single row counter the ticket numbers are allocated from, on backends without sequences.
+    """
+    value = models.PositiveBigIntegerField(default=0)
+
+    objects = TicketNumberSequenceManager()
+
+    def __str__(self):
+        return f"Ticket number sequence at {self.value}"
+
+
+class TicketManager(models.Manager):
+    def bulk_issue(self, event: Event, attendees) -> list:
+        """
+        Insert one active ticket per attendee, with batched INSERTs.
+
+        The ticket numbers of all the tickets are allocated with one query. Does not
+        check or update the capacity and counters of the event.
+
+        Args:
+            event (Event): The event of the tickets.
+            attendees (list): The AttendeeUser holders of the tickets.
+
+        Returns:
+            list: The created tickets, with their IDs.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            numbers = TicketNumberSequence.objects.allocate(len(attendees))
+            return self.bulk_create([
+                Ticket(
+                    event=event,
+                    attendee=attendee,
+                    register_date=now,
+                    status='ACTIVE',
+                    ticket_number=format_ticket_number(number),
+                    user_email=attendee.email,
+                    created_at=now,
+                )
+                for attendee, number in zip(attendees, numbers)
+            ], batch_size=1000)
 
 
 class Ticket(models.Model):
@@ -45,6 +121,7 @@ class Ticket(models.Model):
     created_at = models.DateTimeField('Created At', default=timezone.now)
     updated_at = models.DateTimeField('Updated At', auto_now=True)
 
+    objects = TicketManager()
 
     class Meta:
         ordering = ['-created_at']
@@ -56,9 +133,10 @@ class Ticket(models.Model):
         ]
 
     def save(self, *args, **kwargs):
-        """Override save method to handle ticket number generation and validation."""
-        self.ticket_number = self.generate_ticket_number()
-        
+        """Override save method to give a new ticket its ticket number, once."""
+        if not self.ticket_number:
+            self.ticket_number = self.generate_ticket_number()
+
         super().save(*args, **kwargs)
             
     def send_event_reminder(self) -> bool:
@@ -99,9 +177,16 @@ class Ticket(models.Model):
         if self.status == 'CANCELLED':
             raise ValidationError("Ticket is already cancelled.")
             
-        self.status = 'CANCELLED'
-        self.cancellation_date = timezone.now()
-        self.save()
+        from api.models.waitlist import WaitlistEntry
+        # The freed spot is given to the waitlist in the same transaction, so a failure
+        # cannot leave a cancelled ticket with its spot still counted.
+        with transaction.atomic():
+            self.status = 'CANCELLED'
+            self.cancellation_date = timezone.now()
+            self.save()
+            Event.objects.adjust_counters(self.event_id, attendee_count=-1,
+                                          trending_score=-engagement_weight('ticket', self.register_date))
+            WaitlistEntry.objects.promote_next(self.event_id)
         
     def is_valid_min_age_requirement(self):
         if self.event.min_age_requirement <= self.attendee.age:
@@ -118,7 +203,7 @@ class Ticket(models.Model):
         return {
             "id": self.id,
             "ticket_number": self.ticket_number,
-            "event_id": self.event.id,
+            "event_id": self.event_id,
             "fullname": self.attendee.full_name,
             "register_date": self.register_date,
             "status": self.status,
@@ -129,20 +214,13 @@ class Ticket(models.Model):
         
     def generate_ticket_number(self) -> str:
         """
-        Generate a random, unique ticket number.
+        Generate a unique ticket number from the next value of the ticket number sequence.
 
         Returns:
             str: Generated ticket number
         """
-        while True:
-            prefix = "TICKET"
-            random_string = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-            ticket_number = f"{prefix}-{random_string}"
-            
-            # Check if ticket number already exists
-            return ticket_number
-        
-        
+        return format_ticket_number(TicketNumberSequence.objects.allocate()[0])
+
     def is_organizer_join_own_event(self, user) -> bool:
         """
         Check if an organizer is trying to join their own event.
@@ -0,0 +1,98 @@
+from django.db import models, transaction
+from django.utils import timezone
+from api.models.event import Event
+from api.models.ticket import Ticket
+from api.models.user import AttendeeUser
+from api.trending import engagement_weight
+from api.utils import delay_on_commit, send_waitlist_promotion_email
+
+
+class WaitlistManager(models.Manager):
+    def join(self, event: Event, attendee: AttendeeUser) -> 'WaitlistEntry':
+        """
+        Append an attendee to the waitlist of an event.
+
+        The event row is locked while the next position is taken from the end of
+        the (event, position) index, so concurrent joins get distinct positions
+        without reading the list.
+
+        Args:
+            event (Event): The full event.
+            attendee (AttendeeUser): The user waiting for a spot.
+
+        Returns:
+            WaitlistEntry: The new entry, at the end of the waitlist.
+        """
+        with transaction.atomic():
+            Event.objects.select_for_update().filter(pk=event.pk).values_list('pk').first()
+            last = self.filter(event=event).order_by('-position').values_list('position', flat=True).first()
+            return self.create(event=event, attendee=attendee, position=(last or 0) + 1)
+
+    def promote_next(self, event_id: int):
+        """
+        Turn the head of the waitlist into an active ticket, if the event has a free spot.
+
+        The spot is reserved with the same conditional UPDATE as a registration, and
+        the head entry is read from the (event, position) index, so a promotion does
+        not depend on the length of the waitlist. Entries of users who got a ticket
+        in the meantime are dropped. Once registration has closed, nobody is
+        promoted and the waitlist is dropped. The promotion email is queued once
+        the transaction commits.
+
+        Args:
+            event_id (int): The ID of the event whose spot was freed.
+
+        Returns:
+            Ticket: The ticket of the promoted user, or None if nobody was promoted.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            if not Event.objects.filter(pk=event_id, end_date_register__gt=now, start_date_event__gt=now).exists():
+                self.filter(event_id=event_id).delete()
+                return None
+            if not Event.objects.reserve_spot(event_id, trending_score=engagement_weight('ticket')):
+                return None
+            while entry := self.select_for_update().filter(event_id=event_id).order_by('position').first():
+                entry.delete()
+                if Ticket.objects.filter(event_id=event_id, attendee_id=entry.attendee_id).exists():
+                    continue
+                ticket = Ticket.objects.create(
+                    event_id=event_id,
+                    attendee_id=entry.attendee_id,
+                    register_date=timezone.now(),
+                    status='ACTIVE',
+                )
+                delay_on_commit(send_waitlist_promotion_email, ticket.id)
+                return ticket
+            Event.objects.adjust_counters(event_id, attendee_count=-1, trending_score=-engagement_weight('ticket'))
+            return None
+
+
+class WaitlistEntry(models.Model):
+    """
+    User waiting for a spot of a full event.
+
+    Positions only grow within an event, so the head of the waitlist is the
+    lowest position and is found through the (event, position) constraint index.
+    """
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='waitlist')
+    attendee = models.ForeignKey(AttendeeUser, on_delete=models.CASCADE, related_name='waitlist_entries')
+    position = models.PositiveBigIntegerField()
+    joined_at = models.DateTimeField(default=timezone.now)
+
+    objects = WaitlistManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'position'], name='waitlist_event_position_unique'),
+            models.UniqueConstraint(fields=['event', 'attendee'], name='waitlist_event_attendee_unique'),
+        ]
+
+    def rank(self) -> int:
+        """
+        Get the 1-based place of the entry in its waitlist.
+        """
+        return WaitlistEntry.objects.filter(event_id=self.event_id, position__lt=self.position).count() + 1
+
+    def __str__(self):
+        return f"{self.attendee_id} waiting for event {self.event_id} at position {self.position}"
@@ -0,0 +1,349 @@
+"""
+Offline "you may also like" recommendations.
+
+Likes, bookmarks and active tickets form a sparse user x event matrix whose
+values are the engagement weights of `api.trending`. The item-to-item
+co-occurrence of that matrix is built with NumPy by expanding the events of
+every user into (event, event) pairs and summing them per pair, then normalized
+into cosine similarities. The best similar events of every event and the best
+recommendations of every user are stored, so the endpoints serving them are a
+single indexed read.
+
+A full run recomputes everything. An incremental run only loads and recomputes
+the events and users touched by the engagements since the previous run, and
+relies on the nightly full run to account for removed engagements. The time of
+the previous run is a JobCheckpoint row, moved forward once the rows are stored.
+"""
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+from api.models import Bookmarks, Event, JobCheckpoint, Like, SimilarEvent, Ticket, UserRecommendation
+from api.streaming import iter_chunks
+from api.trending import ENGAGEMENT_WEIGHTS
+
+SIMILAR_EVENTS_LIMIT = 20
+USER_RECOMMENDATIONS_LIMIT = 50
+# Only the most recent engagements of a user are paired, so a few very active
+# users cannot dominate the run time, which grows with the square of their events.
+MAX_EVENTS_PER_USER = 200
+# Number of pairs expanded at a time, which bounds the memory used by a run.
+PAIR_BATCH_SIZE = 5_000_000
+CHUNK_SIZE = 50_000
+# Number of events or users whose stored rows are replaced in one transaction.
+WRITE_BATCH_SIZE = 1_000
+REFRESH_CHECKPOINT = 'recommendations:refresh'
+
+
+def _group_bounds(keys: np.ndarray) -> tuple:
+    """
+    Get the start index and size of every run of equal values in sorted `keys`.
+    """
+    if not len(keys):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return starts, np.diff(np.r_[starts, len(keys)])
+
+
+def _ranges(starts: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    """
+    Concatenate `np.arange(start, start + size)` for every start and size.
+    """
+    offsets = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    return np.repeat(starts, sizes) + np.arange(sizes.sum()) - offsets
+
+
+def _batches(keys: np.ndarray, sizes: np.ndarray, limit: int):
+    """
+    Split sorted `keys` into consecutive slices whose `sizes` add up to about
+    `limit`, without separating equal keys.
+    """
+    starts, _ = _group_bounds(keys)
+    totals = np.cumsum(sizes)
+    start = 0
+    while start < len(keys):
+        stop = int(np.searchsorted(totals, (totals[start - 1] if start else 0) + limit, side='right'))
+        if stop < len(keys):
+            stop = int(starts[np.searchsorted(starts, stop, side='right') - 1])
+        if stop <= start:
+            following = np.searchsorted(starts, start, side='right')
+            stop = int(starts[following]) if following < len(starts) else len(keys)
+        yield slice(start, stop)
+        start = stop
+
+
+def _top_per_group(groups: np.ndarray, scores: np.ndarray, limit: int) -> np.ndarray:
+    """
+    Get the indices of the `limit` best scores of every group, by group then best first.
+    """
+    order = np.lexsort((-scores, groups))
+    starts, sizes = _group_bounds(groups[order])
+    ranks = np.arange(len(order)) - np.repeat(starts, sizes)
+    return order[ranks < limit]
+
+
+def _sources() -> list:
+    """
+    Get the (queryset, user field, timestamp field, kind) of every engagement table.
+    """
+    return [
+        (Like.objects.filter(status='like'), 'user_id', 'liked_at', 'like'),
+        (Bookmarks.objects.all(), 'attendee_id', 'bookmark_at', 'bookmark'),
+        (Ticket.objects.filter(status='ACTIVE'), 'attendee_id', 'register_date', 'ticket'),
+    ]
+
+
+def _restrict(queryset, field: str, ids):
+    """
+    Yield `queryset` filtered on `field` by chunks of `ids`, or unfiltered when `ids` is None.
+    """
+    if ids is None:
+        yield queryset
+        return
+    for chunk in iter_chunks(ids.tolist(), CHUNK_SIZE):
+        yield queryset.filter(**{f'{field}__in': chunk})
+
+
+def engaged_ids(column: str, users=None, events=None, since=None) -> np.ndarray:
+    """
+    Get the distinct users or events of the engagements matching the filters.
+
+    Args:
+        column (str): 'user' or 'event', the IDs to return.
+        users (np.ndarray, optional): Only the engagements of these users.
+        events (np.ndarray, optional): Only the engagements with these events, when `users` is not given.
+        since (datetime, optional): Only the engagements at or after this time.
+
+    Returns:
+        np.ndarray: The sorted IDs.
+    """
+    ids = [np.zeros(0, dtype=np.int64)]
+    for queryset, user_field, time_field, _ in _sources():
+        if since is not None:
+            queryset = queryset.filter(**{f'{time_field}__gte': since})
+        parts = _restrict(queryset, user_field, users) if users is not None else _restrict(queryset, 'event_id', events)
+        for part in parts:
+            values = part.order_by().values_list(user_field if column == 'user' else 'event_id', flat=True).distinct()
+            ids.append(np.fromiter(values, dtype=np.int64))
+    return np.unique(np.concatenate(ids))
+
+
+def load_engagements(events=None) -> tuple:
+    """
+    Load the weighted engagements, one row per user and event.
+
+    A user who engaged with an event in several ways keeps the highest weight.
+
+    Args:
+        events (np.ndarray, optional): Only load the engagements with these events.
+
+    Returns:
+        tuple: The user IDs, event IDs, weights and engagement timestamps, as
+        arrays sorted by user, keeping the MAX_EVENTS_PER_USER most recent events
+        of every user.
+    """
+    columns = ([], [], [], [])
+    for queryset, user_field, time_field, kind in _sources():
+        for part in _restrict(queryset, 'event_id', events):
+            rows = part.order_by().values_list(user_field, 'event_id', time_field).iterator(chunk_size=CHUNK_SIZE)
+            for chunk in iter_chunks(rows, CHUNK_SIZE):
+                columns[0].append(np.fromiter((row[0] for row in chunk), dtype=np.int64, count=len(chunk)))
+                columns[1].append(np.fromiter((row[1] for row in chunk), dtype=np.int64, count=len(chunk)))
+                columns[2].append(np.full(len(chunk), ENGAGEMENT_WEIGHTS[kind]))
+                columns[3].append(np.fromiter((row[2].timestamp() for row in chunk), dtype=np.float64, count=len(chunk)))
+    if not columns[0]:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0)
+    users, events, weights, stamps = (np.concatenate(column) for column in columns)
+
+    order = np.lexsort((-weights, events, users))
+    users, events, weights, stamps = users[order], events[order], weights[order], stamps[order]
+    starts, _ = _group_bounds(users * (events.max() + 1) + events)
+    users, events, weights, stamps = users[starts], events[starts], weights[starts], np.maximum.reduceat(stamps, starts)
+
+    order = np.lexsort((-stamps, users))
+    starts, sizes = _group_bounds(users[order])
+    order = order[np.arange(len(order)) - np.repeat(starts, sizes) < MAX_EVENTS_PER_USER]
+    return users[order], events[order], weights[order], stamps[order]
+
+
+def similar_events(users, events, weights, targets, candidates, limit: int = SIMILAR_EVENTS_LIMIT) -> tuple:
+    """
+    Compute the most similar candidate events of every target event.
+
+    The similarity of two events is the cosine of their weighted engagement
+    vectors, so it is 1 when the same users engaged with both in the same way.
+
+    Args:
+        users (np.ndarray): The user of every engagement, sorted, see `load_engagements`.
+        events (np.ndarray): The event of every engagement.
+        weights (np.ndarray): The weight of every engagement.
+        targets (np.ndarray): The IDs of the events to compute the similar events of.
+        candidates (np.ndarray): The IDs of the events that may be returned as similar.
+        limit (int): Maximum number of similar events per target event.
+
+    Returns:
+        tuple: The event IDs, similar event IDs and scores, as arrays sorted by
+        event then best first.
+    """
+    results = ([np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)], [np.zeros(0)])
+    if not len(users):
+        return tuple(np.concatenate(result) for result in results)
+    event_ids, event_index = np.unique(events, return_inverse=True)
+    norms = np.sqrt(np.bincount(event_index, weights=weights ** 2))
+    is_candidate = np.isin(event_ids, candidates)
+    user_starts, user_sizes = _group_bounds(users)
+    user_group = np.repeat(np.arange(len(user_starts)), user_sizes)
+
+    # Pairs are expanded grouped by target event, so every batch holds all the
+    # pairs of its events and their best similar events can be kept right away.
+    rows = np.flatnonzero(np.isin(events, targets))
+    rows = rows[np.argsort(event_index[rows], kind='stable')]
+    sizes = user_sizes[user_group[rows]]
+    for batch in _batches(event_index[rows], sizes, PAIR_BATCH_SIZE):
+        left = np.repeat(rows[batch], sizes[batch])
+        right = _ranges(user_starts[user_group[rows[batch]]], sizes[batch])
+        keep = (left != right) & is_candidate[event_index[right]]
+        left, right = left[keep], right[keep]
+        if not len(left):
+            continue
+
+        pairs, inverse = np.unique(event_index[left] * len(event_ids) + event_index[right], return_inverse=True)
+        scores = np.bincount(inverse, weights=weights[left] * weights[right])
+        first, second = pairs // len(event_ids), pairs % len(event_ids)
+        scores /= norms[first] * norms[second]
+        top = _top_per_group(first, scores, limit)
+        results[0].append(event_ids[first[top]])
+        results[1].append(event_ids[second[top]])
+        results[2].append(scores[top])
+    return tuple(np.concatenate(result) for result in results)
+
+
+def recommend(users, events, weights, targets, similar, limit: int = USER_RECOMMENDATIONS_LIMIT) -> tuple:
+    """
+    Compute the recommended events of every target user.
+
+    An event scores the sum of its similarities to the events the user engaged
+    with, weighted by those engagements. Events the user already engaged with
+    are not recommended.
+
+    Args:
+        users (np.ndarray): The user of every engagement, sorted, see `load_engagements`.
+        events (np.ndarray): The event of every engagement.
+        weights (np.ndarray): The weight of every engagement.
+        targets (np.ndarray): The IDs of the users to compute the recommendations of.
+        similar (tuple): The similar events as returned by `similar_events`.
+        limit (int): Maximum number of recommendations per user.
+
+    Returns:
+        tuple: The user IDs, event IDs and scores, as arrays sorted by user then best first.
+    """
+    results = ([np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)], [np.zeros(0)])
+    similar_from, similar_to, similar_scores = similar
+    if not len(users) or not len(similar_from):
+        return tuple(np.concatenate(result) for result in results)
+    stride = int(max(events.max(), similar_to.max())) + 1
+    engaged = users * stride + events
+    similar_starts, similar_sizes = _group_bounds(similar_from)
+    similar_keys = similar_from[similar_starts]
+
+    rows = np.flatnonzero(np.isin(users, targets))
+    positions = np.minimum(np.searchsorted(similar_keys, events[rows]), len(similar_keys) - 1)
+    found = similar_keys[positions] == events[rows]
+    rows, positions = rows[found], positions[found]
+    sizes = similar_sizes[positions]
+    for batch in _batches(users[rows], sizes, PAIR_BATCH_SIZE):
+        source = np.repeat(rows[batch], sizes[batch])
+        neighbor = _ranges(similar_starts[positions[batch]], sizes[batch])
+
+        pairs, inverse = np.unique(users[source] * stride + similar_to[neighbor], return_inverse=True)
+        scores = np.bincount(inverse, weights=weights[source] * similar_scores[neighbor])
+        keep = ~np.isin(pairs, engaged)
+        pairs, scores = pairs[keep], scores[keep]
+        top = _top_per_group(pairs // stride, scores, limit)
+        results[0].append(pairs[top] // stride)
+        results[1].append(pairs[top] % stride)
+        results[2].append(scores[top])
+    return tuple(np.concatenate(result) for result in results)
+
+
+def _replace(model, owner_field: str, owners, rows, full: bool) -> int:
+    """
+    Replace the stored rows of `owners` with `rows`, sorted by owner, and drop the
+    rows of every other owner when `full`.
+
+    Every batch of owners is replaced in its own short transaction, so the table is
+    never locked for the whole run, and readers see either all the old or all the
+    new rows of an owner.
+    """
+    other_field = 'event_id' if owner_field == 'user_id' else 'similar_event_id'
+    for batch in iter_chunks(owners.tolist(), WRITE_BATCH_SIZE):
+        start, stop = np.searchsorted(rows[0], batch[0]), np.searchsorted(rows[0], batch[-1], side='right')
+        with transaction.atomic():
+            model.objects.filter(**{f'{owner_field}__in': batch}).delete()
+            for chunk in iter_chunks(zip(*(column[start:stop] for column in rows)), CHUNK_SIZE):
+                model.objects.bulk_create([
+                    model(**{owner_field: int(owner), other_field: int(other), 'score': float(score)})
+                    for owner, other, score in chunk
+                ])
+    if full:
+        stored = np.fromiter(model.objects.order_by().values_list(owner_field, flat=True).distinct(), dtype=np.int64)
+        for batch in iter_chunks(np.setdiff1d(stored, owners).tolist(), WRITE_BATCH_SIZE):
+            model.objects.filter(**{f'{owner_field}__in': batch}).delete()
+    return len(rows[0])
+
+
+def refresh_recommendations(full: bool = False, now=None) -> dict:
+    """
+    Recompute the stored similar events and user recommendations.
+
+    Only published events that have not ended yet are recommended. An incremental
+    run, the default, recomputes the similar events of the events engaged with by
+    the users active since the previous run, and the recommendations of those
+    users. It only loads the engagements with the events of the users who share
+    an event with them, which is all the similarities of those events depend on.
+    The first run is a full run.
+
+    The stored rows are replaced in short transactions, see `_replace`. The
+    checkpoint only moves forward once they are all written, and only if no other
+    run moved it meanwhile, so an interrupted or overlapping run never skips
+    engagements.
+
+    Args:
+        full (bool): Recompute everything.
+        now (datetime, optional): The reference time, defaults to the current time.
+
+    Returns:
+        dict: The number of refreshed events and users, and of stored rows.
+    """
+    now = now or timezone.now()
+    checkpoints = JobCheckpoint.objects.filter(name=REFRESH_CHECKPOINT)
+    since = None if full else checkpoints.values_list('at', flat=True).first()
+    if since is None:
+        users, events, weights, _ = load_engagements()
+        target_users, target_events = np.unique(users), np.unique(events)
+    else:
+        target_users = engaged_ids('user', since=since)
+        target_events = engaged_ids('event', users=target_users)
+        neighbors = engaged_ids('user', events=target_events)
+        users, events, weights, _ = load_engagements(engaged_ids('event', users=neighbors))
+    candidates = np.fromiter(
+        Event.objects.filter(event_create_date__lte=now, end_date_event__gte=now).values_list('id', flat=True),
+        dtype=np.int64,
+    )
+
+    # The target users only engaged with target events, whose similar events were
+    # all just computed, so the stored ones never have to be read back.
+    similar = similar_events(users, events, weights, target_events, candidates)
+    similar_count = _replace(SimilarEvent, 'event_id', target_events, similar, since is None)
+    recommendations = recommend(users, events, weights, target_users, similar)
+    recommendation_count = _replace(UserRecommendation, 'user_id', target_users, recommendations, since is None)
+
+    if since is None:
+        JobCheckpoint.objects.update_or_create(name=REFRESH_CHECKPOINT, defaults={'at': now})
+    else:
+        checkpoints.filter(at=since).update(at=now)
+    return {
+        'events': len(target_events),
+        'similar_events': similar_count,
+        'users': len(target_users),
+        'recommendations': recommendation_count,
+    }
@@ -0,0 +1,229 @@
+"""
+Full-text search over events.
+
+The search index lives outside of the Django models because its storage is
+specific to the database backend:
+
+- PostgreSQL: a weighted `search_vector` tsvector column on `api_event` with a
+  GIN index, kept current by triggers on `api_event` and `api_organizer`.
+- SQLite: an FTS5 virtual table `api_event_fts` whose rowid is the event ID,
+  kept current by triggers on the same tables.
+
+Since the triggers also pick up bulk updates, the index never has to be
+maintained from Python. `install_search_index` is idempotent and runs after
+every migration, because SQLite drops the triggers when a migration rebuilds
+the `api_event` table.
+"""
+import re
+from django.db import connection as default_connection
+
+SEARCH_MIGRATION = ('api', '0030_event_search_index')
+SEARCH_FIELDS = ['event_name', 'tags', 'organizer_name', 'description', 'detailed_description']
+SQLITE_WEIGHTS = [10.0, 5.0, 5.0, 2.0, 1.0]
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+POSTGRES_INSTALL = [
+    "ALTER TABLE api_event ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    """
+    CREATE OR REPLACE FUNCTION api_event_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.event_name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.tags, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(
+                (SELECT organizer_name FROM api_organizer WHERE id = NEW.organizer_id), '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'C') ||
+            setweight(to_tsvector('simple', coalesce(NEW.detailed_description, '')), 'D');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS api_event_search_vector_trigger ON api_event",
+    """
+    CREATE TRIGGER api_event_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF event_name, tags, organizer_id, description, detailed_description
+    ON api_event FOR EACH ROW EXECUTE FUNCTION api_event_search_vector_update()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION api_organizer_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        UPDATE api_event SET organizer_id = organizer_id WHERE organizer_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS api_organizer_search_vector_trigger ON api_organizer",
+    """
+    CREATE TRIGGER api_organizer_search_vector_trigger
+    AFTER UPDATE OF organizer_name ON api_organizer FOR EACH ROW
+    WHEN (OLD.organizer_name IS DISTINCT FROM NEW.organizer_name)
+    EXECUTE FUNCTION api_organizer_search_vector_update()
+    """,
+    "CREATE INDEX IF NOT EXISTS event_search_vector_idx ON api_event USING gin (search_vector)",
+]
+
+POSTGRES_REBUILD = [
+    "UPDATE api_event SET organizer_id = organizer_id",
+]
+
+POSTGRES_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS api_organizer_search_vector_trigger ON api_organizer",
+    "DROP FUNCTION IF EXISTS api_organizer_search_vector_update()",
+    "DROP TRIGGER IF EXISTS api_event_search_vector_trigger ON api_event",
+    "DROP FUNCTION IF EXISTS api_event_search_vector_update()",
+    "DROP INDEX IF EXISTS event_search_vector_idx",
+    "ALTER TABLE api_event DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_INSERT_ROW = """
+    INSERT INTO api_event_fts (rowid, event_name, tags, organizer_name, description, detailed_description)
+    VALUES (new.id, new.event_name, new.tags,
+            (SELECT organizer_name FROM api_organizer WHERE id = new.organizer_id),
+            new.description, new.detailed_description);
+"""
+
+SQLITE_INSTALL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS api_event_fts
+    USING fts5({', '.join(SEARCH_FIELDS)}, tokenize='unicode61 remove_diacritics 2')
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS api_event_fts_insert AFTER INSERT ON api_event BEGIN
+        {SQLITE_INSERT_ROW}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS api_event_fts_update
+    AFTER UPDATE OF event_name, tags, organizer_id, description, detailed_description ON api_event BEGIN
+        DELETE FROM api_event_fts WHERE rowid = old.id;
+        {SQLITE_INSERT_ROW}
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_event_fts_delete AFTER DELETE ON api_event BEGIN
+        DELETE FROM api_event_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_organizer_fts_update AFTER UPDATE OF organizer_name ON api_organizer BEGIN
+        UPDATE api_event_fts SET organizer_name = new.organizer_name
+        WHERE rowid IN (SELECT id FROM api_event WHERE organizer_id = new.id);
+    END
+    """,
+]
+
+SQLITE_REBUILD = [
+    "DELETE FROM api_event_fts",
+    """
+    INSERT INTO api_event_fts (rowid, event_name, tags, organizer_name, description, detailed_description)
+    SELECT event.id, event.event_name, event.tags, organizer.organizer_name,
+           event.description, event.detailed_description
+    FROM api_event AS event LEFT JOIN api_organizer AS organizer ON organizer.id = event.organizer_id
+    """,
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS api_organizer_fts_update",
+    "DROP TRIGGER IF EXISTS api_event_fts_delete",
+    "DROP TRIGGER IF EXISTS api_event_fts_update",
+    "DROP TRIGGER IF EXISTS api_event_fts_insert",
+    "DROP TABLE IF EXISTS api_event_fts",
+]
+
+STATEMENTS = {
+    'postgresql': {'install': POSTGRES_INSTALL, 'rebuild': POSTGRES_REBUILD, 'uninstall': POSTGRES_UNINSTALL},
+    'sqlite': {'install': SQLITE_INSTALL, 'rebuild': SQLITE_REBUILD, 'uninstall': SQLITE_UNINSTALL},
+}
+
+
+def _run(connection, action: str) -> None:
+    """
+    Execute the `action` statements of the connection's backend, if it has any.
+    """
+    statements = STATEMENTS.get(connection.vendor, {}).get(action, [])
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def install_search_index(connection=default_connection) -> None:
+    """
+    Create the search index storage and the triggers that maintain it.
+    """
+    _run(connection, 'install')
+
+
+def rebuild_search_index(connection=default_connection) -> None:
+    """
+    Re-index every event.
+    """
+    _run(connection, 'rebuild')
+
+
+def uninstall_search_index(connection=default_connection) -> None:
+    """
+    Drop the search index storage and its triggers.
+    """
+    _run(connection, 'uninstall')
+
+
+def tokenize(query: str) -> list:
+    """
+    Split a user query into search terms, dropping any search operator syntax.
+    """
+    return TOKEN_PATTERN.findall(query.lower())
+
+
+def search_event_ids(query: str, limit: int, offset: int = 0, created_before=None, connection=default_connection) -> list:
+    """
+    Find the events matching every term of `query`, best match first.
+
+    Each term also matches words it is a prefix of, so results show up while the
+    user is still typing.
+
+    Args:
+        query (str): The user's search query.
+        limit (int): Maximum number of event IDs to return.
+        offset (int, optional): Number of matches to skip.
+        created_before (datetime, optional): Only match events created at or before this time.
+        connection (optional): The database connection to search.
+
+    Returns:
+        list: The matching event IDs, ordered by decreasing relevance.
+
+    Raises:
+        NotImplementedError: If the database backend has no search index.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return []
+
+    if connection.vendor == 'postgresql':
+        sql = """
+            SELECT event.id
+            FROM api_event AS event, to_tsquery('simple', %s) AS query
+            WHERE event.search_vector @@ query {created_filter}
+            ORDER BY ts_rank(event.search_vector, query) DESC, event.id DESC
+            LIMIT %s OFFSET %s
+        """
+        match = ' & '.join(f'{term}:*' for term in terms)
+    elif connection.vendor == 'sqlite':
+        sql = f"""
+            SELECT event.id
+            FROM api_event_fts JOIN api_event AS event ON event.id = api_event_fts.rowid
+            WHERE api_event_fts MATCH %s {{created_filter}}
+            ORDER BY bm25(api_event_fts, {', '.join(map(str, SQLITE_WEIGHTS))}), event.id DESC
+            LIMIT %s OFFSET %s
+        """
+        match = ' '.join(f'"{term}"*' for term in terms)
+    else:
+        raise NotImplementedError(f"Event search is not available on {connection.vendor}.")
+
+    params = [match]
+    created_filter = ''
+    if created_before is not None:
+        created_filter = 'AND event.event_create_date <= %s'
+        params.append(created_before)
+    with connection.cursor() as cursor:
+        cursor.execute(sql.format(created_filter=created_filter), [*params, limit, offset])
+        return [row[0] for row in cursor.fetchall()]
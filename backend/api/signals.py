@@ -0,0 +1,44 @@
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from api.cache import bump_event_version, bump_feed_version, bump_likes_version
+from api.models import Bookmarks, Event, Like, Organizer, Ticket
+
+
+def _bump_now_and_on_commit(bump) -> None:
+    """
+    Bump a cache version right away and again once the transaction commits, so a
+    page rebuilt from pre-commit data in between is not served afterwards.
+    """
+    bump()
+    transaction.on_commit(bump)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=Organizer)
+@receiver(post_delete, sender=Organizer)
+@receiver(m2m_changed, sender=Event.normalized_tags.through)
+def invalidate_event_feed(sender, **kwargs):
+    """
+    Invalidate the cached event feed whenever the events it lists or their order change.
+    """
+    _bump_now_and_on_commit(bump_feed_version)
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+@receiver(post_save, sender=Bookmarks)
+@receiver(post_delete, sender=Bookmarks)
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def invalidate_engaged_event(sender, instance, **kwargs):
+    """
+    Invalidate the cached feed pages that render the engaged event, whose counters changed.
+
+    Like counts also order the 'most_liked' pages, which are invalidated on every like.
+    """
+    _bump_now_and_on_commit(partial(bump_event_version, instance.event_id))
+    if sender is Like:
+        _bump_now_and_on_commit(bump_likes_version)
@@ -0,0 +1,64 @@
+"""
+Streaming JSON responses for list endpoints whose results may not fit in memory.
+
+The rows are read from the database in chunks with `QuerySet.iterator`, serialized
+one chunk at a time and written to the client as parts of a single JSON array, so
+the memory used by a response does not grow with the number of rows.
+"""
+import json
+from itertools import islice
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from ninja.responses import NinjaJSONEncoder
+
+
+def iter_chunks(rows, size: int):
+    """
+    Split an iterable into lists of at most `size` items.
+    """
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def encode_json_array(rows, serialize, chunk_size: int):
+    """
+    Encode the serialized rows as a JSON array, one chunk of rows at a time.
+
+    Args:
+        rows (iterable): The rows to encode, typically `queryset.iterator(chunk_size)`.
+        serialize (callable): Turns a list of rows into a list of JSON-serializable items,
+            such as schemas or dicts.
+        chunk_size (int): Number of rows serialized together.
+
+    Yields:
+        bytes: Consecutive parts of the JSON array.
+    """
+    yield b'['
+    separator = b''
+    for chunk in iter_chunks(rows, chunk_size):
+        items = [json.dumps(item, cls=NinjaJSONEncoder) for item in serialize(chunk)]
+        if items:
+            yield separator + ', '.join(items).encode()
+            separator = b', '
+    yield b']'
+
+
+def stream_json_array(queryset, serialize, chunk_size: int = None) -> StreamingHttpResponse:
+    """
+    Build a response that streams the serialized rows of `queryset` as a JSON array.
+
+    Args:
+        queryset (QuerySet): The rows to return, already filtered and ordered.
+        serialize (callable): Turns a list of rows into a list of JSON-serializable items.
+        chunk_size (int, optional): Number of rows fetched and serialized at a time,
+            defaults to the STREAMING_CHUNK_SIZE setting.
+
+    Returns:
+        StreamingHttpResponse: The JSON array response.
+    """
+    chunk_size = chunk_size or settings.STREAMING_CHUNK_SIZE
+    return StreamingHttpResponse(
+        encode_json_array(queryset.iterator(chunk_size=chunk_size), serialize, chunk_size),
+        content_type='application/json; charset=utf-8',
+    )
@@ -1,4 +1,4 @@
-from .utils.utils_bookmark import BookmarkModelsTest, Bookmarks
+from .utils.utils_bookmark import BookmarkModelsTest, Bookmarks, Event
 
 
 class BookmarkTest(BookmarkModelsTest):
@@ -10,6 +10,15 @@ class BookmarkTest(BookmarkModelsTest):
         self.assertEqual(response.status_code, 200)
         
 
+    def test_show_bookmark_engagement_counts(self):
+        Bookmarks.objects.create(event=self.event_test, attendee=self.test_user)
+        Event.objects.reconcile_counters()
+        token = self.get_token_for_user(self.test_user)
+        response = self.client.get(self.show_bookmark_url, headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(response.json()[0]['id'], self.event_test.id)
+        self.assertEqual(response.json()[0]['engagement']['total_bookmarks'], 1)
+
     def test_toggle_bookmark_not_bookmarked(self):
         token = self.get_token_for_user(self.test_user)
         response = self.client.put(f'/api/bookmarks/{self.event_test.id}/toggle-bookmark',headers={"Authorization": f"Bearer {token}"})
@@ -25,6 +34,15 @@ class BookmarkTest(BookmarkModelsTest):
         self.assertEqual(response.json()['message'], 'Bookmark removed successfully.')
         self.assertEqual(Bookmarks.objects.filter(event=self.event_test, attendee=self.test_user).count(), 0)
 
+    def test_toggle_bookmark_updates_bookmark_count(self):
+        token = self.get_token_for_user(self.test_user)
+        self.client.put(f'/api/bookmarks/{self.event_test.id}/toggle-bookmark',headers={"Authorization": f"Bearer {token}"})
+        self.event_test.refresh_from_db()
+        self.assertEqual(self.event_test.bookmark_count, 1)
+        self.client.put(f'/api/bookmarks/{self.event_test.id}/toggle-bookmark',headers={"Authorization": f"Bearer {token}"})
+        self.event_test.refresh_from_db()
+        self.assertEqual(self.event_test.bookmark_count, 0)
+
     def test_toggle_bookmark_event_does_not_exist(self):
         token = self.get_token_for_user(self.test_user)
         response = self.client.put(f'/api/bookmarks/{999}/toggle-bookmark',headers={"Authorization": f"Bearer {token}"})
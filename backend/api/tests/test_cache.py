@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.test import TestCase
+from api.cache import bump_event_version, bump_feed_version, event_versions, feed_cache_key, get_or_build
+
+
+class FeedCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_feed_version_changes_keys(self):
+        key = feed_cache_key(cursor=None, limit=20, status=None)
+        self.assertEqual(key, feed_cache_key(status=None, limit=20, cursor=None))
+        bump_feed_version()
+        self.assertNotEqual(key, feed_cache_key(cursor=None, limit=20, status=None))
+
+    def test_bump_event_version_changes_only_that_event(self):
+        self.assertEqual(event_versions([1, 2]), {})
+        versions = event_versions([1, 2], create=True)
+        self.assertEqual(set(versions), {1, 2})
+        bump_event_version(1)
+        current = event_versions([1, 2])
+        self.assertNotEqual(current[1], versions[1])
+        self.assertEqual(current[2], versions[2])
+
+    def test_get_or_build_rebuilds_stale_value(self):
+        get_or_build('feed-test', lambda: ('old', True))
+        value = get_or_build('feed-test', lambda: ('new', True), is_fresh=lambda value: value != 'old')
+        self.assertEqual(value, 'new')
+        self.assertEqual(cache.get('feed-test'), 'new')
+
+    def test_get_or_build_caches_value(self):
+        calls = []
+        def build():
+            calls.append(1)
+            return 'page', True
+        self.assertEqual(get_or_build('feed-test', build), 'page')
+        self.assertEqual(get_or_build('feed-test', build), 'page')
+        self.assertEqual(len(calls), 1)
+
+    def test_get_or_build_does_not_cache_uncacheable_value(self):
+        self.assertEqual(get_or_build('feed-test', lambda: ('error', False)), 'error')
+        self.assertIsNone(cache.get('feed-test'))
+
+    def test_get_or_build_waits_for_lock_holder(self):
+        cache.add('feed-test:lock', 1)
+        value = get_or_build('feed-test', lambda: ('fallback', True), lock_timeout=0.1)
+        self.assertEqual(value, 'fallback')
+        self.assertIsNone(cache.get('feed-test'))
@@ -1,6 +1,12 @@
-from .utils.utils_event import EventModelsTest, timezone,datetime, Event, Organizer, fake, patch, ALLOWED_IMAGE_TYPES, MagicMock, ClientError, SimpleUploadedFile,ValidationError, EventResponseSchema
+from .utils.utils_event import EventModelsTest, timezone,datetime, Event, Organizer, fake, patch, ALLOWED_IMAGE_TYPES, MagicMock, ClientError, SimpleUploadedFile,ValidationError, EventResponseSchema, Ticket, Like, Bookmarks, Tag, UserEngagementResolver
 
 from django.http import QueryDict
+from django.conf import settings
+from api.models import AttendeeUser, EventAllowedDomain, SimilarEvent, UserRecommendation
+from api.recommendations import load_engagements, refresh_recommendations
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 import tempfile
 import json
 class EventTest(EventModelsTest):
@@ -312,12 +318,620 @@ class EventTest(EventModelsTest):
     
     # ## Test list all event function
     def test_valid_list_all_event(self):
-        response  = self.client.get('/api/events/events')
+        # The private event only shows up for users of its allowed domains.
+        headers = {'Authorization': f'Bearer {self.get_token_for_user(self.test_user)}'}
+        response  = self.client.get('/api/events/events', headers=headers)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.json()), 3)
 
+    def test_list_all_event_hides_restricted_private_events(self):
+        outsider = self.create_user("outsider", "outsider")
+        outsider.email = 'outsider@other.org'
+        outsider.save()
+        tokens = {
+            'anonymous': None,
+            'outsider': self.get_token_for_user(outsider),
+            'allowed': self.get_token_for_user(self.test_user),
+            'organizer': self.get_token_for_user(self.test_user1),
+        }
+        expected = {'anonymous': False, 'outsider': False, 'allowed': True, 'organizer': True}
+        for name, token in tokens.items():
+            headers = {'Authorization': f'Bearer {token}'} if token else {}
+            ids = [event['id'] for event in self.client.get('/api/events/events', headers=headers).json()]
+            self.assertEqual(self.private_event.id in ids, expected[name], name)
+            self.assertIn(self.public_event.id, ids)
+
+        self.private_event.allowed_email_domains = ''
+        self.private_event.save()
+        ids = [event['id'] for event in self.client.get('/api/events/events').json()]
+        self.assertIn(self.private_event.id, ids)
+
+    def test_allowed_domains_follow_event_edits(self):
+        self.assertEqual(sorted(self.private_event.allowed_domains.values_list('domain', flat=True)), ['example.com', 'ku.th'])
+        self.private_event.allowed_email_domains = 'KU.th, other.org'
+        self.private_event.save()
+        self.assertEqual(sorted(self.private_event.allowed_domains.values_list('domain', flat=True)), ['ku.th', 'other.org'])
+        with self.assertNumQueries(1):
+            self.assertTrue(self.private_event.is_email_allowed('someone@Other.org'))
+        self.assertFalse(self.private_event.is_email_allowed('jane.doe@example.com'))
+        self.assertFalse(self.private_event.is_email_allowed('not-an-email'))
+
+    def test_list_all_event_stream(self):
+        headers = {'Authorization': f'Bearer {self.get_token_for_user(self.test_user)}'}
+        response = self.client.get('/api/events/events?stream=true&sort=cheapest', headers=headers)
+        self.assertTrue(response.streaming)
+        streamed = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(streamed, self.client.get('/api/events/events?sort=cheapest', headers=headers).json())
+        self.assertEqual(self.client.get('/api/events/events?stream=true&sort=random').status_code, 400)
+
+    def test_ticket_and_attendee_list_stream(self):
+        token = self.get_token_for_user(self.test_user)
+        for user in [self.test_user1, self.create_user("attendee", "attendee")]:
+            Ticket.objects.create(event=self.event_test, attendee=user)
+        for url in [f'/api/events/{self.event_test.id}/ticket-list', f'/api/events/{self.event_test.id}/attendee-list']:
+            with self.settings(STREAMING_CHUNK_SIZE=1):
+                response = self.client.get(f'{url}?stream=true', headers={'Authorization': f'Bearer {token}'})
+                streamed = json.loads(b''.join(response.streaming_content))
+            self.assertEqual(len(streamed), 2)
+            self.assertEqual(streamed, self.client.get(url, headers={'Authorization': f'Bearer {token}'}).json())
+
+    def test_list_all_event_fields(self):
+        headers = {'Authorization': f'Bearer {self.get_token_for_user(self.test_user)}'}
+        full = {event['id']: event for event in self.client.get('/api/events/events', headers=headers).json()}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/events/events?fields=event_name,status,engagement', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        for event in response.json():
+            self.assertEqual(sorted(event), ['engagement', 'event_name', 'id', 'status'])
+            self.assertEqual(event, {name: full[event['id']][name] for name in event})
+        feed_sql = [query['sql'] for query in queries.captured_queries if 'ORDER BY' in query['sql'] and '"api_event"."id"' in query['sql']]
+        self.assertTrue(feed_sql)
+        self.assertNotIn('detailed_description', feed_sql[-1])
+
+        page = self.client.get('/api/events/events?limit=2&fields=organizer').json()
+        self.assertEqual(sorted(page['results'][0]), ['id', 'organizer'])
+        self.assertIn('organizer_name', page['results'][0]['organizer'])
+        response = self.client.get('/api/events/events?fields=event_name,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'Unknown event fields: password')
+
+    def test_list_all_event_organizer_queries(self):
+        for index in range(5):
+            self.create_event(timezone.now(), timezone.now() + datetime.timedelta(days=1),
+                              timezone.now() + datetime.timedelta(days=2), timezone.now() + datetime.timedelta(days=3))
+        with CaptureQueriesContext(connection) as queries:
+            events = self.client.get('/api/events/events').json()
+        self.assertEqual(len(events), 7)
+        self.assertFalse([query for query in queries.captured_queries if 'FROM "api_organizer"' in query['sql']])
+
+    def test_list_all_event_normalized(self):
+        headers = {'Authorization': f'Bearer {self.get_token_for_user(self.test_user)}'}
+        full = self.client.get('/api/events/events', headers=headers).json()
+        response = self.client.get('/api/events/events?normalize=true', headers=headers).json()
+        self.assertEqual(sorted(response['organizers']), sorted({str(event['organizer']['id']) for event in full}))
+        for event, normalized in zip(full, response['results']):
+            organizer = event.pop('organizer')
+            self.assertEqual(normalized.pop('organizer_id'), organizer['id'])
+            self.assertEqual(response['organizers'][str(organizer['id'])], organizer)
+            self.assertEqual(normalized, event)
+
+        page = self.client.get('/api/events/events?normalize=true&limit=1&fields=event_name').json()
+        self.assertEqual(page['organizers'], {})
+        self.assertEqual(sorted(page['results'][0]), ['event_name', 'id'])
+        self.assertIsNotNone(page['next_cursor'])
+        self.assertEqual(self.client.get('/api/events/events?normalize=true&stream=true').status_code, 400)
+
+    def test_list_all_event_cursor_pages(self):
+        headers = {'Authorization': f'Bearer {self.get_token_for_user(self.test_user)}'}
+        response = self.client.get('/api/events/events?limit=2', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        first_page = response.json()
+        self.assertEqual(first_page['limit'], 2)
+        self.assertEqual(len(first_page['results']), 2)
+        self.assertIsNotNone(first_page['next_cursor'])
+
+        response = self.client.get(f"/api/events/events?limit=2&cursor={first_page['next_cursor']}", headers=headers)
+        second_page = response.json()
+        self.assertEqual(len(second_page['results']), 1)
+        self.assertIsNone(second_page['next_cursor'])
+        seen_ids = {event['id'] for event in first_page['results'] + second_page['results']}
+        self.assertEqual(seen_ids, {self.event_test.id, self.public_event.id, self.private_event.id})
+
+    def test_list_all_event_engagement_counts(self):
+        Like.objects.create(event=self.event_test, user=self.test_user, status='like')
+        Like.objects.create(event=self.event_test, user=self.test_user1, status='unlike')
+        Bookmarks.objects.create(event=self.event_test, attendee=self.test_user)
+        Bookmarks.objects.create(event=self.event_test, attendee=self.test_user1)
+        Ticket.objects.create(event=self.event_test, attendee=self.test_user1)
+        self.assertEqual(Event.objects.reconcile_counters(), 1)
+        self.assertEqual(Event.objects.reconcile_counters(), 0)
+        response = self.client.get('/api/events/events')
+        event_data = next(event for event in response.json() if event['id'] == self.event_test.id)
+        self.assertEqual(event_data['engagement'], {'total_likes': 1, 'total_bookmarks': 2})
+        self.assertEqual(event_data['current_attendees'], 1)
+
+    def test_list_all_event_user_engagement(self):
+        Like.objects.create(event=self.event_test, user=self.test_user1, status='like')
+        Bookmarks.objects.create(event=self.public_event, attendee=self.test_user1)
+        Ticket.objects.create(event=self.event_test, attendee=self.test_user1)
+        token = self.get_token_for_user(self.test_user1)
+        response = self.client.get('/api/events/events', headers={'Authorization': f'Bearer {token}'})
+        engaged = {event['id']: event['user_engaged'] for event in response.json()}
+        self.assertEqual(engaged[self.event_test.id], {'is_liked': True, 'is_bookmarked': False, 'is_applied': True})
+        self.assertEqual(engaged[self.public_event.id], {'is_liked': False, 'is_bookmarked': True, 'is_applied': False})
+        self.assertEqual(engaged[self.private_event.id], {'is_liked': False, 'is_bookmarked': False, 'is_applied': False})
+
+    def test_user_engagement_resolver_query_count(self):
+        events = list(Event.objects.all())
+        with self.assertNumQueries(3):
+            resolver = UserEngagementResolver(self.test_user1, events)
+        with self.assertNumQueries(0):
+            for event in events:
+                resolver.resolve(event)
+
+    def test_read_endpoints_do_not_write(self):
+        updated_at = Event.objects.get(id=self.event_test.id).updated_at
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/events/events')
+            self.client.get(f'/api/events/{self.event_test.id}')
+        writes = [query['sql'] for query in queries if not query['sql'].lstrip().upper().startswith('SELECT')]
+        self.assertEqual(writes, [])
+        self.assertEqual(Event.objects.get(id=self.event_test.id).updated_at, updated_at)
+
+    def test_get_detail_derives_status(self):
+        response = self.client.get(f'/api/events/{self.event_test.id}')
+        self.assertEqual(response.json()['status'], 'ONGOING')
+        self.assertEqual(response.json()['status_registeration'], 'OPEN')
+        self.assertEqual(Event.objects.get(id=self.event_test.id).status, '')
+
+    def test_sync_statuses_persists_changes_only(self):
+        transitions = Event.objects.sync_statuses()
+        self.assertEqual(transitions['ONGOING'], 1)
+        self.assertEqual(transitions['COMPLETED'], 2)
+        self.event_test.refresh_from_db()
+        self.assertEqual(self.event_test.status, 'ONGOING')
+        self.assertEqual(self.event_test.status_registeration, 'OPEN')
+        self.assertEqual(sum(Event.objects.sync_statuses().values()), 0)
+
+    def test_sync_statuses_registration_transitions(self):
+        full_event = self.create_event(
+            timezone.now() - datetime.timedelta(days=2), timezone.now() + datetime.timedelta(days=1),
+            timezone.now() + datetime.timedelta(days=2), timezone.now() + datetime.timedelta(days=3),
+        )
+        full_event.max_attendee = 1
+        full_event.save()
+        Ticket.objects.create(event=full_event, attendee=self.test_user1)
+        Event.objects.reconcile_counters()
+        closed_event = self.create_event(
+            timezone.now() - datetime.timedelta(days=3), timezone.now() - datetime.timedelta(days=1),
+            timezone.now() + datetime.timedelta(days=2), timezone.now() + datetime.timedelta(days=3),
+        )
+        Event.objects.sync_statuses()
+        full_event.refresh_from_db()
+        closed_event.refresh_from_db()
+        self.assertEqual((full_event.status, full_event.status_registeration), ('UPCOMING', 'FULL'))
+        self.assertEqual((closed_event.status, closed_event.status_registeration), ('UPCOMING', 'CLOSED'))
+
+        Ticket.objects.filter(event=full_event).delete()
+        Event.objects.reconcile_counters()
+        self.assertEqual(Event.objects.sync_statuses()['OPEN'], 1)
+        full_event.refresh_from_db()
+        self.assertEqual(full_event.status_registeration, 'OPEN')
+
+    def test_sync_statuses_full_within_registration_window(self):
+        now = timezone.now()
+        closed_unmarked = self.create_event(now - datetime.timedelta(days=3), now - datetime.timedelta(minutes=1),
+                                            now + datetime.timedelta(days=2), now + datetime.timedelta(days=3))
+        not_started = self.create_event(now + datetime.timedelta(days=1), now + datetime.timedelta(days=2),
+                                        now + datetime.timedelta(days=3), now + datetime.timedelta(days=4))
+        Event.objects.filter(id__in=[closed_unmarked.id, not_started.id]).update(
+            max_attendee=1, attendee_count=1, status_registeration='OPEN')
+        self.assertEqual(Event.objects.sync_statuses(now=now)['FULL'], 1)
+        self.assertEqual(Event.objects.get(id=closed_unmarked.id).status_registeration, 'FULL')
+        self.assertEqual(Event.objects.get(id=not_started.id).status_registeration, 'OPEN')
+        # Once its registration opens, the event is marked full.
+        self.assertEqual(Event.objects.sync_statuses(now=now + datetime.timedelta(days=1, hours=1))['FULL'], 1)
+
+    def test_list_all_event_filter_by_status(self):
+        response = self.client.get('/api/events/events?status=ongoing')
+        self.assertEqual([event['id'] for event in response.json()], [self.event_test.id])
+        response = self.client.get('/api/events/events?status=finished')
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_all_event_invalid_cursor(self):
+        response = self.client.get('/api/events/events?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'Invalid cursor')
+
+    def test_list_all_event_filters(self):
+        headers = {'Authorization': f'Bearer {self.get_token_for_user(self.test_user)}'}
+        Event.objects.filter(id=self.public_event.id).update(category='WORKSHOP', is_free=False, ticket_price=150)
+        Event.objects.filter(id=self.private_event.id).update(category='WORKSHOP', is_online=True, ticket_price=50)
+        response = self.client.get('/api/events/events?category=WORKSHOP&min_price=100', headers=headers)
+        self.assertEqual([event['id'] for event in response.json()], [self.public_event.id])
+        response = self.client.get('/api/events/events?is_online=true&visibility=PRIVATE', headers=headers)
+        self.assertEqual([event['id'] for event in response.json()], [self.private_event.id])
+        start_from = (timezone.now() + datetime.timedelta(hours=1)).isoformat()
+        response = self.client.get('/api/events/events', {'start_from': start_from}, headers=headers)
+        self.assertEqual(response.json(), [])
+        response = self.client.get('/api/events/events?category=UNKNOWN', headers=headers)
+        self.assertEqual(response.status_code, 422)
+
+    def test_list_all_event_sort_keys(self):
+        headers = {'Authorization': f'Bearer {self.get_token_for_user(self.test_user)}'}
+        Event.objects.filter(id=self.public_event.id).update(ticket_price=150, like_count=1)
+        Event.objects.filter(id=self.private_event.id).update(ticket_price=50, like_count=5)
+        response = self.client.get('/api/events/events?sort=cheapest', headers=headers)
+        self.assertEqual([event['id'] for event in response.json()], [self.event_test.id, self.private_event.id, self.public_event.id])
+        response = self.client.get('/api/events/events?sort=most_liked', headers=headers)
+        self.assertEqual([event['id'] for event in response.json()], [self.private_event.id, self.public_event.id, self.event_test.id])
+        self.assertEqual(self.client.get('/api/events/events?sort=random', headers=headers).status_code, 400)
+
+    def test_list_all_event_sorted_cursor_pages(self):
+        headers = {'Authorization': f'Bearer {self.get_token_for_user(self.test_user)}'}
+        Event.objects.filter(id=self.public_event.id).update(ticket_price=150)
+        Event.objects.filter(id=self.private_event.id).update(ticket_price=50)
+        seen = []
+        cursor = ''
+        while cursor is not None:
+            page = self.client.get(f'/api/events/events?sort=cheapest&limit=1&cursor={cursor}', headers=headers).json()
+            seen += [event['id'] for event in page['results']]
+            cursor = page['next_cursor']
+        self.assertEqual(seen, [self.event_test.id, self.private_event.id, self.public_event.id])
+        first_cursor = self.client.get('/api/events/events?sort=cheapest&limit=1', headers=headers).json()['next_cursor']
+        response = self.client.get(f'/api/events/events?sort=newest&cursor={first_cursor}', headers=headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_all_event_anonymous_feed_is_cached(self):
+        cache.clear()
+        first = self.client.get('/api/events/events?limit=2')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/events/events?limit=2')
+        self.assertEqual(first.json(), second.json())
+
+    def test_list_all_event_not_modified(self):
+        cache.clear()
+        response = self.client.get('/api/events/events?limit=2')
+        etag = response.headers['ETag']
+        response_event_id = response.json()['results'][0]['id']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/events/events?limit=2', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        Event.objects.adjust_counters(response_event_id, like_count=1)
+        cache.clear()
+        response = self.client.get('/api/events/events?limit=2', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_list_all_event_not_modified_authenticated(self):
+        token = self.get_token_for_user(self.test_user1)
+        headers = {'Authorization': f'Bearer {token}'}
+        etag = self.client.get('/api/events/events', headers=headers).headers['ETag']
+        self.assertNotEqual(etag, self.client.get('/api/events/events').headers['ETag'])
+        response = self.client.get('/api/events/events', headers={**headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_all_event_cache_invalidated_on_write(self):
+        cache.clear()
+        self.client.get('/api/events/events')
+        self.event_test.event_name = 'Renamed event'
+        self.event_test.save()
+        response = self.client.get('/api/events/events')
+        names = {event['id']: event['event_name'] for event in response.json()}
+        self.assertEqual(names[self.event_test.id], 'Renamed event')
+        Like.objects.create(event=self.event_test, user=self.test_user1, status='like')
+        token = self.get_token_for_user(self.test_user1)
+        response = self.client.get('/api/events/events', headers={'Authorization': f'Bearer {token}'})
+        engaged = {event['id']: event['user_engaged'] for event in response.json()}
+        self.assertTrue(engaged[self.event_test.id]['is_liked'])
+
         
         
+    def test_list_all_event_like_invalidates_only_its_pages(self):
+        cache.clear()
+        headers = {'Authorization': f'Bearer {self.get_token_for_user(self.test_user1)}'}
+        first, second = [event['id'] for event in self.client.get('/api/events/events?limit=2').json()['results']]
+        page = self.client.get('/api/events/events?limit=1').json()
+        self.client.get('/api/events/events?limit=1&sort=most_liked')
+        self.client.put(f'/api/likes/{second}/toggle-like', headers=headers)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/events/events?limit=1').json(), page)
+        # Likes order the 'most_liked' pages, so those are rebuilt.
+        response = self.client.get('/api/events/events?limit=1&sort=most_liked')
+        self.assertEqual(response.json()['results'][0]['id'], second)
+
+        self.client.put(f'/api/likes/{first}/toggle-like', headers=headers)
+        response = self.client.get('/api/events/events?limit=1')
+        self.assertEqual(response.json()['results'][0]['engagement']['total_likes'], 1)
+
+    def test_get_detail_not_modified(self):
+        response = self.client.get(f'/api/events/{self.event_test.id}')
+        etag = response.headers['ETag']
+        response = self.client.get(f'/api/events/{self.event_test.id}', headers={'If-None-Match': f'W/{etag}'})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+        token = self.get_token_for_user(self.test_user1)
+        self.client.put(f'/api/likes/{self.event_test.id}/toggle-like', headers={'Authorization': f'Bearer {token}'})
+        response = self.client.get(f'/api/events/{self.event_test.id}', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['engagement']['total_likes'], 1)
+
+    def test_search_events_ranked(self):
+        headers = {'Authorization': f'Bearer {self.get_token_for_user(self.test_user1)}'}
+        response = self.client.get('/api/events/search?q=publ')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([event['id'] for event in response.json()['results']], [self.public_event.id])
+        self.public_event.description = 'Private dinner'
+        self.public_event.save()
+        response = self.client.get('/api/events/search?q=private', headers=headers)
+        self.assertEqual([event['id'] for event in response.json()['results']], [self.private_event.id, self.public_event.id])
+
+    def test_search_events_follows_writes(self):
+        self.organizer1.organizer_name = 'Zebra Club'
+        self.organizer1.save()
+        headers = {'Authorization': f'Bearer {self.get_token_for_user(self.test_user1)}'}
+        response = self.client.get('/api/events/search?q=zebra', headers=headers)
+        self.assertEqual({event['id'] for event in response.json()['results']}, {self.public_event.id, self.private_event.id})
+        self.private_event.delete()
+        response = self.client.get('/api/events/search?q=zebra', headers=headers)
+        self.assertEqual([event['id'] for event in response.json()['results']], [self.public_event.id])
+
+    def test_search_events_pagination(self):
+        # The generated name and description of event_test can contain "event" too.
+        Event.objects.filter(id=self.event_test.id).update(event_name='Workshop', description='')
+        headers = {'Authorization': f'Bearer {self.get_token_for_user(self.test_user1)}'}
+        response = self.client.get('/api/events/search?q=event&limit=1', headers=headers)
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertEqual(response.json()['next_offset'], 1)
+        response = self.client.get('/api/events/search?q=event&limit=1&offset=1', headers=headers)
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertIsNone(response.json()['next_offset'])
+
+    def test_restricted_private_event_hidden_from_outsiders(self):
+        cache.clear()
+        outsider = AttendeeUser.objects.create(username='outsider', first_name='Out', last_name='Sider',
+                                               birth_date='1995-06-15', email='out@other.org')
+        self.private_event.tags = 'art'
+        self.private_event.save()
+        self.private_event.sync_tags()
+        Event.objects.filter(id=self.private_event.id).update(latitude=18.7883, longitude=98.9853)
+        for user, visible in [(None, False), (outsider, False), (self.test_user1, True)]:
+            headers = {'Authorization': f'Bearer {self.get_token_for_user(user)}'} if user else {}
+            response = self.client.get('/api/events/search?q=private', headers=headers)
+            self.assertEqual(self.private_event.id in [event['id'] for event in response.json()['results']], visible)
+            response = self.client.get('/api/events/nearby?lat=18.7883&lng=98.9853', headers=headers)
+            self.assertEqual(self.private_event.id in [event['id'] for event in response.json()], visible)
+            # The map tiles and tag counts are shared, so they leave restricted events out for everyone.
+            response = self.client.get('/api/events/map-clusters?bbox=97,5,106,21&zoom=2', headers=headers)
+            self.assertEqual(response.json(), [])
+            self.assertEqual(self.client.get('/api/events/tags', headers=headers).json(), [])
+
+    def test_search_events_invalid_query(self):
+        self.assertEqual(self.client.get('/api/events/search?q=%20').status_code, 400)
+        response = self.client.get('/api/events/search?q=%22%2A%28')
+        self.assertEqual(response.json()['results'], [])
+
+    def test_nearby_events(self):
+        Event.objects.filter(id=self.event_test.id).update(latitude=13.7563, longitude=100.5018)
+        Event.objects.filter(id=self.public_event.id).update(latitude=13.8000, longitude=100.5200)
+        Event.objects.filter(id=self.private_event.id).update(latitude=18.7883, longitude=98.9853)
+        response = self.client.get('/api/events/nearby?lat=13.7563&lng=100.5018&radius_km=10')
+        self.assertEqual([event['id'] for event in response.json()], [self.event_test.id, self.public_event.id])
+        self.assertEqual(response.json()[0]['distance_km'], 0)
+        self.assertAlmostEqual(response.json()[1]['distance_km'], 5.21, places=1)
+        response = self.client.get('/api/events/nearby?lat=13.7563&lng=100.5018&radius_km=1000&limit=1')
+        self.assertEqual([event['id'] for event in response.json()], [self.event_test.id])
+
+    def test_nearby_events_skips_deleted_match(self):
+        Event.objects.filter(id=self.public_event.id).update(latitude=13.8000, longitude=100.5200)
+        with patch('api.views.strategy.event_strategy.nearest', return_value=[(999999, 0.5), (self.public_event.id, 1.0)]):
+            response = self.client.get('/api/events/nearby?lat=13.7563&lng=100.5018')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(event['id'], event['distance_km']) for event in response.json()], [(self.public_event.id, 1.0)])
+
+    def test_nearby_events_from_user_location(self):
+        Event.objects.filter(id=self.private_event.id).update(latitude=18.7883, longitude=98.9853)
+        self.assertEqual(self.client.get('/api/events/nearby').status_code, 400)
+        self.test_user1.latitude, self.test_user1.longitude = 18.79, 98.98
+        self.test_user1.save()
+        token = self.get_token_for_user(self.test_user1)
+        response = self.client.get('/api/events/nearby', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual([event['id'] for event in response.json()], [self.private_event.id])
+
+    def test_map_clusters(self):
+        cache.clear()
+        Event.objects.filter(id=self.event_test.id).update(latitude=13.7563, longitude=100.5018)
+        Event.objects.filter(id=self.public_event.id).update(latitude=13.8000, longitude=100.5200)
+        Event.objects.filter(id=self.private_event.id).update(latitude=18.7883, longitude=98.9853)
+        EventAllowedDomain.objects.filter(event=self.private_event).delete()
+        response = self.client.get('/api/events/map-clusters?bbox=97,5,106,21&zoom=2')
+        clusters = sorted(response.json(), key=lambda cluster: cluster['latitude'])
+        self.assertEqual([(cluster['count'], cluster['event_id']) for cluster in clusters],
+                         [(2, None), (1, self.private_event.id)])
+        self.assertAlmostEqual(clusters[0]['latitude'], 13.77815)
+
+        token = self.get_token_for_user(self.test_user)
+        data = {"event_name": self.event_test.event_name, "latitude": "18.7", "longitude": "98.9"}
+        self.client.patch(f'/api/events/{self.event_test.id}/edit', data=json.dumps(data), headers={'Authorization': f'Bearer {token}'})
+        response = self.client.get('/api/events/map-clusters?bbox=97,5,106,21&zoom=2')
+        clusters = sorted(response.json(), key=lambda cluster: cluster['latitude'])
+        self.assertEqual([cluster['count'] for cluster in clusters], [1, 2])
+
+    def test_parse_tags(self):
+        self.assertEqual(Tag.parse(' Music, jazz ,,MUSIC, Live Shows '), ['music', 'jazz', 'live shows'])
+        self.assertEqual(Tag.parse(''), [])
+
+    def test_create_event_with_tags(self):
+        token = self.get_token_for_user(self.test_user)
+        data = {
+            "category": "CONCERT",
+            "dress_code": "CASUAL",
+            "event_name": "Tagged Event",
+            "event_create_date": timezone.now().isoformat(),
+            "start_date_event": (timezone.now() + datetime.timedelta(days=2)).isoformat(),
+            "end_date_event": (timezone.now() + datetime.timedelta(days=3)).isoformat(),
+            "start_date_register": timezone.now().isoformat(),
+            "end_date_register": (timezone.now() + datetime.timedelta(days=1)).isoformat(),
+            "description": "An event with tags.",
+            "detailed_description": "An event with tags.",
+            "address": "Tech Park, Downtown",
+            "contact_email": "info@techconference.com",
+            "contact_phone": "+1234567890",
+            "tags": "Music, Jazz",
+        }
+        response = self.client.post('/api/events/create-event', data=data, headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        event = Event.objects.get(id=response.json()['id'])
+        self.assertEqual(event.tags, "Music, Jazz")
+        self.assertEqual(sorted(event.normalized_tags.values_list('name', flat=True)), ['jazz', 'music'])
+
+    def test_list_all_event_filter_by_tag(self):
+        token = self.get_token_for_user(self.test_user)
+        data = {"event_name": self.event_test.event_name, "tags": "Music, Jazz"}
+        self.client.patch(f'/api/events/{self.event_test.id}/edit', data=json.dumps(data), headers={'Authorization': f'Bearer {token}'})
+        response = self.client.get('/api/events/events?tag=JAZZ')
+        self.assertEqual([event['id'] for event in response.json()], [self.event_test.id])
+
+        data = {"event_name": self.event_test.event_name, "tags": "Music"}
+        self.client.patch(f'/api/events/{self.event_test.id}/edit', data=json.dumps(data), headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(self.client.get('/api/events/events?tag=jazz').json(), [])
+
+    def test_tag_facets(self):
+        cache.clear()
+        for event, tags in [(self.event_test, 'music, jazz'), (self.public_event, 'Music'), (self.private_event, 'art')]:
+            event.tags = tags
+            event.save()
+            event.sync_tags()
+        Tag.objects.create(name='unused')
+        response = self.client.get('/api/events/tags')
+        self.assertEqual(response.json(), [{'name': 'music', 'count': 2}, {'name': 'jazz', 'count': 1}])
+        self.assertEqual(len(self.client.get('/api/events/tags?limit=1').json()), 1)
+
+        self.private_event.tags = 'music'
+        self.private_event.allowed_email_domains = ''
+        self.private_event.save()
+        self.private_event.sync_tags()
+        response = self.client.get('/api/events/tags')
+        self.assertEqual(response.json()[0], {'name': 'music', 'count': 3})
+
+    def test_trending_events(self):
+        Event.objects.filter(id=self.event_test.id).update(trending_score=1.5)
+        Event.objects.filter(id=self.public_event.id).update(trending_score=4.0)
+        Event.objects.filter(id=self.private_event.id).update(trending_score=9.0)
+        response = self.client.get('/api/events/trending')
+        self.assertEqual([(event['id'], event['trending_score']) for event in response.json()],
+                         [(self.public_event.id, 4.0), (self.event_test.id, 1.5)])
+        response = self.client.get('/api/events/trending?limit=1',
+                                   headers={'Authorization': f'Bearer {self.get_token_for_user(self.test_user)}'})
+        self.assertEqual([event['id'] for event in response.json()], [self.private_event.id])
+
+    def test_trending_score_follows_engagement(self):
+        token = self.get_token_for_user(self.test_user1)
+        headers = {'Authorization': f'Bearer {token}'}
+        self.client.put(f'/api/likes/{self.public_event.id}/toggle-like', headers=headers)
+        self.client.put(f'/api/bookmarks/{self.public_event.id}/toggle-bookmark', headers=headers)
+        self.public_event.refresh_from_db()
+        self.assertAlmostEqual(self.public_event.trending_score, 3.0)
+        self.client.put(f'/api/likes/{self.public_event.id}/toggle-like', headers=headers)
+        self.public_event.refresh_from_db()
+        self.assertAlmostEqual(self.public_event.trending_score, 2.0, places=3)
+
+    def test_decay_and_rebuild_trending_scores(self):
+        now = timezone.now()
+        Bookmarks.objects.create(event=self.event_test, attendee=self.test_user1,
+                                 bookmark_at=now - datetime.timedelta(hours=settings.TRENDING_HALF_LIFE_HOURS))
+        Like.objects.create(event=self.event_test, user=self.test_user1, status='like')
+        Like.objects.create(event=self.public_event, user=self.test_user1, status='unlike')
+        self.assertEqual(Event.objects.rebuild_trending_scores(now=now), 1)
+        self.event_test.refresh_from_db()
+        self.assertAlmostEqual(self.event_test.trending_score, 2.0, places=3)
+
+        Event.objects.decay_trending_scores(now=now + datetime.timedelta(hours=settings.TRENDING_HALF_LIFE_HOURS))
+        self.event_test.refresh_from_db()
+        self.assertAlmostEqual(self.event_test.trending_score, 1.0, places=3)
+        # The checkpoint is in the database, so another process does not decay the same interval again.
+        cache.clear()
+        Event.objects.decay_trending_scores(now=now + datetime.timedelta(hours=settings.TRENDING_HALF_LIFE_HOURS))
+        self.event_test.refresh_from_db()
+        self.assertAlmostEqual(self.event_test.trending_score, 1.0, places=3)
+        Event.objects.decay_trending_scores(now=now + datetime.timedelta(days=365))
+        self.event_test.refresh_from_db()
+        self.assertEqual(self.event_test.trending_score, 0)
+
+    def test_similar_and_recommended_events(self):
+        Event.objects.filter(id=self.public_event.id).update(end_date_event=timezone.now() + datetime.timedelta(days=1))
+        newcomer = self.create_user("newcomer", "newcomer")
+        for user in (self.test_user, self.test_user1):
+            Like.objects.create(event=self.event_test, user=user, status='like')
+            Like.objects.create(event=self.public_event, user=user, status='like')
+        Like.objects.create(event=self.event_test, user=newcomer, status='like')
+        counts = refresh_recommendations()
+        self.assertEqual((counts['events'], counts['users']), (2, 3))
+
+        response = self.client.get(f'/api/events/{self.event_test.id}/similar')
+        self.assertEqual([event['id'] for event in response.json()], [self.public_event.id])
+        headers = {'Authorization': f'Bearer {self.get_token_for_user(newcomer)}'}
+        response = self.client.get('/api/events/recommended', headers=headers)
+        self.assertEqual([event['id'] for event in response.json()], [self.public_event.id])
+        self.assertEqual(self.client.get('/api/events/recommended').status_code, 401)
+
+        # The checkpoint of the previous run is in the database, so the next run is
+        # incremental even in another process, and only loads the affected engagements.
+        cache.clear()
+        Like.objects.create(event=self.public_event, user=newcomer, status='like')
+        Event.objects.filter(id=self.public_event.id).update(trending_score=1)
+        with patch('api.recommendations.load_engagements', wraps=load_engagements) as mock_load, \
+                CaptureQueriesContext(connection) as queries:
+            counts = refresh_recommendations()
+        self.assertIsNotNone(mock_load.call_args.args[0])
+        # Only the similar events of the affected events are replaced, none are read back.
+        self.assertFalse([query for query in queries.captured_queries
+                          if query['sql'].startswith('SELECT') and '"api_similarevent"' in query['sql']])
+        self.assertEqual(set(SimilarEvent.objects.values_list('event_id', 'similar_event_id')),
+                         {(self.event_test.id, self.public_event.id), (self.public_event.id, self.event_test.id)})
+        self.assertEqual(counts['users'], 1)
+        self.assertEqual(UserRecommendation.objects.count(), 0)
+        response = self.client.get('/api/events/recommended', headers=headers)
+        self.assertEqual([event['trending_score'] for event in response.json()], [1.0])
+
+    def test_calendar_events(self):
+        now = timezone.now()
+        Event.objects.filter(id=self.event_test.id).update(start_date_event=now - datetime.timedelta(days=1),
+                                                           end_date_event=now + datetime.timedelta(days=1))
+        Event.objects.filter(id=self.public_event.id).update(start_date_event=now + datetime.timedelta(days=10),
+                                                             end_date_event=now + datetime.timedelta(days=11))
+        Event.objects.filter(id=self.private_event.id).update(start_date_event=now - datetime.timedelta(days=5),
+                                                              end_date_event=now - datetime.timedelta(days=4))
+        window = {'from': (now - datetime.timedelta(days=30)).isoformat(), 'to': (now + datetime.timedelta(days=5)).isoformat()}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/events/calendar', window)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual([(event['id'], event['status']) for event in response.json()], [(self.event_test.id, 'ONGOING')])
+        self.assertEqual(sorted(response.json()[0]), ['category', 'end_date_event', 'event_name', 'id', 'is_online',
+                                                      'start_date_event', 'status'])
+
+        headers = {'Authorization': f'Bearer {self.get_token_for_user(self.test_user)}'}
+        response = self.client.get('/api/events/calendar', window, headers=headers)
+        self.assertEqual([event['id'] for event in response.json()], [self.private_event.id, self.event_test.id])
+        self.event_test.refresh_from_db()
+        self.assertNotEqual(self.event_test.status, 'ONGOING')
+
+    def test_calendar_events_invalid_window(self):
+        now = timezone.now()
+        window = {'from': now.isoformat(), 'to': (now - datetime.timedelta(days=1)).isoformat()}
+        self.assertEqual(self.client.get('/api/events/calendar', window).status_code, 400)
+        window = {'from': now.isoformat(), 'to': (now + datetime.timedelta(days=400)).isoformat()}
+        self.assertEqual(self.client.get('/api/events/calendar', window).status_code, 400)
+        self.assertEqual(self.client.get('/api/events/calendar').status_code, 422)
+
+    def test_map_clusters_invalid_bbox(self):
+        self.assertEqual(self.client.get('/api/events/map-clusters?bbox=1,2,3&zoom=2').status_code, 400)
+        self.assertEqual(self.client.get('/api/events/map-clusters?bbox=0,50,10,40&zoom=2').status_code, 400)
+        self.assertEqual(self.client.get('/api/events/map-clusters?bbox=-180,-90,180,90&zoom=10').status_code, 400)
+        response = self.client.get('/api/events/map-clusters?bbox=170,-10,-170,10&zoom=3')
+        self.assertEqual(response.status_code, 200)
+
     def test_get_detail(self):
         response = self.client.get(f'/api/events/{self.event_test.id}')
         self.assertEqual(response.status_code , 200)
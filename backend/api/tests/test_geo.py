@@ -0,0 +1,21 @@
+import numpy as np
+from django.test import TestCase
+from api.geo import bounding_box, haversine_km
+from api.models import Event
+
+
+class GeoTest(TestCase):
+
+    def test_haversine_km(self):
+        distances = haversine_km(13.7563, 100.5018, np.array([13.7563, 18.7883]), np.array([100.5018, 98.9853]))
+        self.assertAlmostEqual(distances[0], 0)
+        self.assertAlmostEqual(distances[1], 582, delta=2)
+
+    def test_bounding_box_across_antimeridian(self):
+        query = str(Event.objects.filter(bounding_box(0, 179.99, 50)).query)
+        self.assertIn(' OR ', query)
+        self.assertEqual(str(Event.objects.filter(bounding_box(0, 100, 50)).query).count(' OR '), 0)
+
+    def test_bounding_box_at_pole(self):
+        query = str(Event.objects.filter(bounding_box(89.9, 0, 50)).query)
+        self.assertNotIn('longitude', query.split('WHERE')[1])
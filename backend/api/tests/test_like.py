@@ -16,6 +16,14 @@ class LikeTestAPI(LikeModelsTest):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(Like.objects.count(), 1)
         self.assertEqual(Like.objects.first().status, 'unlike')
+    def test_toggle_like_updates_like_count(self):
+        token = self.get_token_for_user(self.test_user)
+        self.client.put(f'/api/likes/{self.event_test.id}/toggle-like', headers={'Authorization': f'Bearer {token}'})
+        self.event_test.refresh_from_db()
+        self.assertEqual(self.event_test.like_count, 1)
+        self.client.put(f'/api/likes/{self.event_test.id}/toggle-like', headers={'Authorization': f'Bearer {token}'})
+        self.event_test.refresh_from_db()
+        self.assertEqual(self.event_test.like_count, 0)
     def test_toggle_like_on_non_existent_event(self):
         token = self.get_token_for_user(self.test_user)
         response = self.client.put(f'/api/likes/{999}/toggle-like', headers={'Authorization': f'Bearer {token}'})
@@ -1,5 +1,15 @@
 from .utils.utils_ticket import TicketModelsTest, Organizer, Event, Ticket, fake, timezone,datetime,AttendeeUser,patch, ValidationError
+import json
 import logging
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from api.cache import event_versions
+from api.models import IdempotencyRecord, TicketNumberSequence, WaitlistEntry
+from api.ticket_numbers import format_ticket_number
+from api.utils import send_registration_confirmation_email, send_registration_confirmation_emails
 logging.disable(logging.CRITICAL)
 
 class TicketTestAPI(TicketModelsTest):
@@ -69,6 +79,7 @@ class TicketTestAPI(TicketModelsTest):
         normal_user = self.create_user("test","test")
         token = self.get_token_for_user(normal_user)
         Ticket.objects.create(attendee= self.test_user, event=  event_test)
+        Event.objects.reconcile_counters()
         response = self.client.post(self.user_reserve_event_url + str(event_test.id) + '/register',  headers={'Authorization': f'Bearer {token}'})
         self.assertEqual(response.status_code, 400)
         self.assertIn('This event has reached the maximum number of attendees', response.json().get("error", ""))
@@ -157,10 +168,16 @@ class TicketTestAPI(TicketModelsTest):
             description=fake.text(max_nb_chars=200),
             status_registeration = "CLOSED",
         )
-        token = self.get_token_for_user(self.test_user)
+        # The stored status is only refreshed by the beat task, so a stale one does not block registration.
+        token = self.get_token_for_user(self.create_user("test", "test"))
         response = self.client.post(self.user_reserve_event_url + str(event_test.id) + '/register',  headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 201)
+        with patch("api.models.Event.can_register", return_value=True):
+            Event.objects.filter(id=event_test.id).update(end_date_register=timezone.now() - datetime.timedelta(hours=1))
+            response = self.client.post(self.user_reserve_event_url + str(event_test.id) + '/register',
+                                        headers={'Authorization': f'Bearer {self.get_token_for_user(self.create_attendee("late"))}'})
         self.assertEqual(response.status_code, 400)
-        self.assertEqual(response.json()['error'], f'Registration for this event is {event_test.status_registeration.lower()} now.')
+        self.assertEqual(response.json()['error'], 'Registration for this event is closed now.')
         
 
     def test_invalid_register_private_event(self):
@@ -205,6 +222,250 @@ class TicketTestAPI(TicketModelsTest):
         self.assertFalse(Ticket.objects.filter(event = event_test, attendee = user).exists())
         
         
+    def test_register_and_cancel_update_attendee_count(self):
+        user = self.create_user("test","test")
+        token = self.get_token_for_user(user)
+        self.client.post(self.user_reserve_event_url + str(self.event_test.id) + '/register',  headers={'Authorization': f'Bearer {token}'})
+        self.event_test.refresh_from_db()
+        self.assertEqual(self.event_test.attendee_count, 1)
+        ticket = Ticket.objects.get(event=self.event_test, attendee=user)
+        self.client.delete(f"/api/tickets/{ticket.id}/cancel", headers={'Authorization': f'Bearer {token}'})
+        self.event_test.refresh_from_db()
+        self.assertEqual(self.event_test.attendee_count, 0)
+
+    @patch("api.utils.TicketEmailService.send_email", return_value=True)
+    def test_register_queues_confirmation_email(self, mock_send_email):
+        token = self.get_token_for_user(self.create_user("test", "test"))
+        with patch("api.utils.send_registration_confirmation_email.delay") as mock_delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.user_reserve_event_url + str(self.event_test.id) + '/register',  headers={'Authorization': f'Bearer {token}'})
+            mock_send_email.assert_not_called()
+        self.assertEqual(response.status_code, 201)
+        mock_delay.assert_called_once_with(response.json()['id'])
+
+        send_registration_confirmation_email(response.json()['id'])
+        mock_send_email.assert_called_once()
+        self.assertTrue(Ticket.objects.get(id=response.json()['id']).email_sent)
+
+    def test_reserve_spot_stops_at_capacity(self):
+        Event.objects.filter(id=self.event_test.id).update(max_attendee=2, attendee_count=0)
+        reserved = [Event.objects.reserve_spot(self.event_test.id) for _ in range(3)]
+        self.assertEqual(reserved, [True, True, False])
+        self.event_test.refresh_from_db()
+        self.assertEqual(self.event_test.attendee_count, 2)
+        Event.objects.filter(id=self.event_test.id).update(max_attendee=None)
+        self.assertTrue(Event.objects.reserve_spot(self.event_test.id))
+
+    @patch("api.models.Event.compute_registeration_status", return_value='OPEN')
+    def test_register_rechecks_capacity_atomically(self, mock_compute_registeration_status):
+        # The capacity check passed on a stale event, but the spot was taken meanwhile.
+        Event.objects.filter(id=self.event_test.id).update(max_attendee=1, attendee_count=1)
+        token = self.get_token_for_user(self.create_user("test", "test"))
+        response = self.client.post(self.user_reserve_event_url + str(self.event_test.id) + '/register',  headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('This event has reached the maximum number of attendees', response.json()['error'])
+        self.assertFalse(Ticket.objects.filter(event=self.event_test).exists())
+
+    @patch("api.models.Ticket.save", side_effect=IntegrityError)
+    def test_register_duplicate_releases_spot(self, mock_save):
+        token = self.get_token_for_user(self.create_user("test", "test"))
+        response = self.client.post(self.user_reserve_event_url + str(self.event_test.id) + '/register',  headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], "User has already registered for this event.")
+        self.event_test.refresh_from_db()
+        self.assertEqual(self.event_test.attendee_count, 0)
+
+    def test_register_succeeds_when_broker_is_down(self):
+        token = self.get_token_for_user(self.create_user("test", "test"))
+        url = self.user_reserve_event_url + str(self.event_test.id) + '/register'
+        with patch("api.utils.send_registration_confirmation_email.delay", side_effect=ConnectionError) as mock_delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 201)
+        mock_delay.assert_called_once_with(response.json()['id'])
+
+    def test_register_replays_idempotent_retry(self):
+        cache.clear()
+        token = self.get_token_for_user(self.create_user("test", "test"))
+        headers = {'Authorization': f'Bearer {token}', 'Idempotency-Key': 'retry-1'}
+        url = self.user_reserve_event_url + str(self.event_test.id) + '/register'
+        with patch("api.utils.send_registration_confirmation_email.delay") as mock_delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            first = self.client.post(url, headers=headers)
+        # The response is kept in the database, so a retry reaching another worker replays it too.
+        cache.clear()
+        with patch("api.utils.send_registration_confirmation_email.delay") as mock_retry_delay, \
+                CaptureQueriesContext(connection) as queries:
+            retry = self.client.post(url, headers=headers)
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertFalse([query for query in queries.captured_queries
+                          if 'api_event' in query['sql'] or 'api_ticket' in query['sql']])
+        mock_delay.assert_called_once()
+        mock_retry_delay.assert_not_called()
+        self.event_test.refresh_from_db()
+        self.assertEqual(self.event_test.attendee_count, 1)
+
+        # Another key is another request, which is rejected as a duplicate registration.
+        response = self.client.post(url, headers={**headers, 'Idempotency-Key': 'retry-2'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_idempotency_key_is_scoped_to_user(self):
+        cache.clear()
+        url = self.user_reserve_event_url + str(self.event_test.id) + '/register'
+        for username in ("first", "second"):
+            token = self.get_token_for_user(self.create_attendee(username))
+            response = self.client.post(url, headers={'Authorization': f'Bearer {token}', 'Idempotency-Key': 'shared'})
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(Ticket.objects.filter(event=self.event_test).count(), 2)
+
+    def test_cancel_replays_idempotent_retry(self):
+        cache.clear()
+        user = self.create_user("test", "test")
+        token = self.get_token_for_user(user)
+        ticket = Ticket.objects.create(event=self.event_test, attendee=user)
+        headers = {'Authorization': f'Bearer {token}', 'Idempotency-Key': 'cancel-1'}
+        first = self.client.delete(f"/api/tickets/{ticket.id}/cancel", headers=headers)
+        retry = self.client.delete(f"/api/tickets/{ticket.id}/cancel", headers=headers)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry.json(), first.json())
+
+    def test_idempotent_request_in_progress(self):
+        user = self.create_user("test", "test")
+        token = self.get_token_for_user(user)
+        headers = {'Authorization': f'Bearer {token}', 'Idempotency-Key': 'slow'}
+        url = self.user_reserve_event_url + str(self.event_test.id) + '/register'
+        IdempotencyRecord.objects.create(user=user, method='POST', path=url, key='slow')
+        response = self.client.post(url, headers=headers)
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Ticket.objects.filter(event=self.event_test).exists())
+
+        # A request that did not finish within the lock timeout no longer holds its key.
+        IdempotencyRecord.objects.update(created_at=timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT))
+        response = self.client.post(url, headers=headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(IdempotencyRecord.objects.get().status_code, 201)
+
+    def test_purge_expired_idempotency_records(self):
+        user = self.create_user("test", "test")
+        now = timezone.now()
+        IdempotencyRecord.objects.create(user=user, method='POST', path='/old', key='a', status_code=201,
+                                         created_at=now - timedelta(seconds=settings.IDEMPOTENCY_KEY_TIMEOUT + 1))
+        IdempotencyRecord.objects.create(user=user, method='POST', path='/new', key='a', status_code=201,
+                                         created_at=now)
+        self.assertEqual(IdempotencyRecord.objects.purge(now=now), 1)
+        self.assertEqual(list(IdempotencyRecord.objects.values_list('path', flat=True)), ['/new'])
+
+    def create_attendee(self, username):
+        return AttendeeUser.objects.create(username=username, first_name=username, last_name='Doe',
+                                           birth_date='1995-06-15', email=f'{username}@example.com')
+
+    def create_full_event(self):
+        event = Event.objects.create(
+            event_name=fake.company(),
+            organizer=self.become_organizer(self.test_user, "test_user"),
+            start_date_register=timezone.now() - datetime.timedelta(days=2),
+            end_date_register=timezone.now() + datetime.timedelta(days=1),
+            start_date_event=timezone.now() + datetime.timedelta(days=2),
+            end_date_event=timezone.now() + datetime.timedelta(days=3),
+            max_attendee=1,
+            description=fake.text(max_nb_chars=200),
+        )
+        holder = self.create_attendee("holder")
+        Ticket.objects.create(event=event, attendee=holder)
+        Event.objects.reconcile_counters()
+        return event, holder
+
+    def test_join_waitlist(self):
+        event, _ = self.create_full_event()
+        url = f"{self.user_reserve_event_url}{event.id}/waitlist"
+        tokens = [self.get_token_for_user(self.create_attendee(f"waiting{index}")) for index in range(2)]
+        for index, token in enumerate(tokens):
+            response = self.client.post(url, headers={'Authorization': f'Bearer {token}'})
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.json()['position'], index + 1)
+        response = self.client.post(url, headers={'Authorization': f'Bearer {tokens[0]}'})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.delete(url, headers={'Authorization': f'Bearer {tokens[0]}'})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(url, headers={'Authorization': f'Bearer {tokens[1]}'})
+        self.assertEqual(response.json()['position'], 1)
+        self.assertEqual(self.client.get(url, headers={'Authorization': f'Bearer {tokens[0]}'}).status_code, 404)
+
+        token = self.get_token_for_user(self.create_user("test", "test"))
+        response = self.client.post(f"{self.user_reserve_event_url}{self.event_test.id}/waitlist", headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cancel_ticket_promotes_waitlist_head(self):
+        event, holder = self.create_full_event()
+        first, second = self.create_attendee("first"), self.create_attendee("second")
+        WaitlistEntry.objects.join(event, first)
+        WaitlistEntry.objects.join(event, second)
+        ticket = Ticket.objects.get(event=event, attendee=holder)
+        with patch("api.utils.TicketNotificationManager.send_cancellation_notification"), \
+                patch("api.utils.send_waitlist_promotion_email.delay", side_effect=ConnectionError) as mock_delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f"/api/tickets/{ticket.id}/cancel", headers={'Authorization': f'Bearer {self.get_token_for_user(holder)}'})
+        # The promotion email failing to be queued does not fail the committed cancellation.
+        self.assertEqual(response.status_code, 200)
+        promoted = Ticket.objects.get(event=event)
+        self.assertEqual(promoted.attendee, first)
+        self.assertEqual(list(WaitlistEntry.objects.filter(event=event).values_list('attendee', flat=True)), [second.id])
+        mock_delay.assert_called_once_with(promoted.id)
+        event.refresh_from_db()
+        self.assertEqual(event.attendee_count, 1)
+
+    def test_join_waitlist_after_status_sync(self):
+        event, _ = self.create_full_event()
+        self.assertEqual(Event.objects.sync_statuses()['FULL'], 1)
+        token = self.get_token_for_user(self.create_attendee("waiting"))
+        response = self.client.post(f"{self.user_reserve_event_url}{event.id}/waitlist", headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 201)
+
+    def test_register_after_cancellation_before_status_sync(self):
+        event, holder = self.create_full_event()
+        Event.objects.sync_statuses()
+        Ticket.objects.get(event=event, attendee=holder).cancel_ticket()
+        token = self.get_token_for_user(self.create_attendee("late"))
+        response = self.client.post(f"{self.user_reserve_event_url}{event.id}/register", headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 201)
+
+    def test_no_promotion_after_registration_closed(self):
+        event, holder = self.create_full_event()
+        WaitlistEntry.objects.join(event, self.create_attendee("first"))
+        Event.objects.filter(id=event.id).update(end_date_register=timezone.now() - datetime.timedelta(hours=1))
+        Ticket.objects.get(event=event, attendee=holder).cancel_ticket()
+        self.assertFalse(Ticket.objects.filter(event=event, status='ACTIVE').exists())
+        self.assertFalse(WaitlistEntry.objects.filter(event=event).exists())
+        event.refresh_from_db()
+        self.assertEqual(event.attendee_count, 0)
+
+    def test_cancel_ticket_rolls_back_when_promotion_fails(self):
+        event, holder = self.create_full_event()
+        WaitlistEntry.objects.join(event, self.create_attendee("first"))
+        ticket = Ticket.objects.get(event=event, attendee=holder)
+        with patch("api.models.waitlist.WaitlistManager.promote_next", side_effect=IntegrityError), \
+                self.assertRaises(IntegrityError):
+            ticket.cancel_ticket()
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.status, 'ACTIVE')
+        event.refresh_from_db()
+        self.assertEqual(event.attendee_count, 1)
+
+    def test_promote_skips_registered_users(self):
+        event, holder = self.create_full_event()
+        WaitlistEntry.objects.join(event, holder)
+        Ticket.objects.filter(event=event).update(status='CANCELLED')
+        Event.objects.reconcile_counters()
+        self.assertIsNone(WaitlistEntry.objects.promote_next(event.id))
+        self.assertFalse(WaitlistEntry.objects.filter(event=event).exists())
+        event.refresh_from_db()
+        self.assertEqual(event.attendee_count, 0)
+
     def test_invalid_cancel_ticket(self):
         user = self.create_user("test","test")
         token = self.get_token_for_user(user)
@@ -315,6 +576,102 @@ class TicketTestAPI(TicketModelsTest):
         self.assertEqual(Ticket.objects.filter(ticket_number=ticket.ticket_number).count(), 1)
         
             
+    def test_ticket_number_kept_on_later_saves(self):
+        ticket = Ticket.objects.create(event=self.event_test, attendee=self.test_user)
+        ticket_number = ticket.ticket_number
+        ticket.status = 'CANCELLED'
+        ticket.save(update_fields=['status'])
+        ticket.save()
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.ticket_number, ticket_number)
+
+    def test_ticket_numbers_are_distinct(self):
+        numbers = {format_ticket_number(value) for value in range(1, 20001)}
+        self.assertEqual(len(numbers), 20000)
+        self.assertTrue(all(len(number) == len("TICKET-") + 10 for number in numbers))
+        with self.assertRaises(ValueError):
+            format_ticket_number(1 << 50)
+
+    def test_ticket_number_allocations_are_disjoint(self):
+        block = TicketNumberSequence.objects.allocate(3)
+        single = TicketNumberSequence.objects.allocate()
+        self.assertEqual(block, sorted(set(block)))
+        self.assertEqual(len(single), 1)
+        self.assertGreater(single[0], block[-1])
+
+    def issue_tickets(self, emails, user=None):
+        token = self.get_token_for_user(user or self.test_user)
+        return self.client.post(f"{self.user_reserve_event_url}{self.event_test.id}/issue",
+                                data=json.dumps({'emails': emails}), content_type="application/json",
+                                headers={'Authorization': f'Bearer {token}'})
+
+    def test_bulk_issue_tickets(self):
+        Event.objects.filter(id=self.event_test.id).update(max_attendee=10, attendee_count=0)
+        attendees = [self.create_attendee(f"guest{index}") for index in range(3)]
+        Ticket.objects.create(event=self.event_test, attendee=attendees[0])
+        Event.objects.filter(id=self.event_test.id).update(attendee_count=1)
+        emails = [attendee.email for attendee in attendees] + ['nobody@example.com', self.test_user.email]
+        with patch("api.utils.send_registration_confirmation_emails.delay") as mock_delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.issue_tickets(emails)
+
+        self.assertEqual(response.status_code, 201)
+        tickets = response.json()['tickets']
+        self.assertEqual([ticket['email'] for ticket in tickets], [attendees[1].email, attendees[2].email])
+        self.assertEqual(response.json()['skipped'], [attendees[0].email, 'nobody@example.com', self.test_user.email])
+        self.assertEqual(len({ticket['ticket_number'] for ticket in tickets}), 2)
+        self.assertEqual(Ticket.objects.filter(event=self.event_test, status='ACTIVE').count(), 3)
+        self.event_test.refresh_from_db()
+        self.assertEqual(self.event_test.attendee_count, 3)
+        mock_delay.assert_called_once_with([ticket['id'] for ticket in tickets])
+
+    def test_bulk_issue_succeeds_when_broker_is_down(self):
+        Event.objects.filter(id=self.event_test.id).update(max_attendee=10, attendee_count=0)
+        attendee = self.create_attendee("guest")
+        with patch("api.utils.send_registration_confirmation_emails.delay", side_effect=ConnectionError), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.issue_tickets([attendee.email])
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Ticket.objects.filter(event=self.event_test, attendee=attendee).exists())
+
+    def test_bulk_issue_matches_emails_case_insensitively(self):
+        Event.objects.filter(id=self.event_test.id).update(max_attendee=10, attendee_count=0)
+        attendee = self.create_attendee("guest")
+        AttendeeUser.objects.filter(id=attendee.id).update(email='Guest@Example.com')
+        version = event_versions([self.event_test.id], create=True)
+        with patch("api.utils.send_registration_confirmation_emails.delay"), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.issue_tickets(['GUEST@example.com', 'guest@EXAMPLE.com'])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([ticket['email'] for ticket in response.json()['tickets']], ['Guest@Example.com'])
+        self.assertEqual(response.json()['skipped'], [])
+        self.assertNotEqual(event_versions([self.event_test.id]), version)
+
+    @patch("api.utils.TicketEmailService.send_email", return_value=True)
+    def test_bulk_issue_confirmation_emails(self, mock_send_email):
+        attendees = [self.create_attendee(f"guest{index}") for index in range(2)]
+        tickets = Ticket.objects.bulk_issue(self.event_test, attendees)
+        self.assertEqual(send_registration_confirmation_emails([ticket.id for ticket in tickets]), 2)
+        self.assertEqual(mock_send_email.call_count, 2)
+        self.assertEqual(Ticket.objects.filter(event=self.event_test, email_sent=True).count(), 2)
+
+    def test_bulk_issue_checks_capacity(self):
+        Event.objects.filter(id=self.event_test.id).update(max_attendee=1, attendee_count=0)
+        attendees = [self.create_attendee(f"guest{index}") for index in range(2)]
+        response = self.issue_tickets([attendee.email for attendee in attendees])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], "This event does not have 2 spots left.")
+        self.assertFalse(Ticket.objects.filter(event=self.event_test).exists())
+
+    def test_bulk_issue_requires_event_organizer(self):
+        attendee = self.create_attendee("guest")
+        response = self.issue_tickets([attendee.email], user=attendee)
+        self.assertEqual(response.status_code, 403)
+        other = self.create_attendee("other")
+        self.become_organizer(other, "other")
+        response = self.issue_tickets([attendee.email], user=other)
+        self.assertEqual(response.status_code, 404)
+
     def test_cancellation_date_not_changed_if_already_set(self):
         # Create a ticket with a pre-set cancellation date and save it
         cancellation_date = timezone.now() - timezone.timedelta(days=1)
@@ -1,9 +1,9 @@
 from django.test import TestCase
 from django.utils import timezone
-from api.models import AttendeeUser, Organizer, Event, Ticket
+from api.models import AttendeeUser, Organizer, Event, Ticket, Like, Bookmarks, Tag
 from datetime import datetime
 from ninja.testing import TestClient
-from api.views.schemas.event_schema import EventResponseSchema
+from api.views.schemas.event_schema import EventResponseSchema, UserEngagementResolver
 from ninja_jwt.tokens import RefreshToken
 from faker import Faker
 import datetime
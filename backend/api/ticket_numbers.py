@@ -0,0 +1,64 @@
+"""
+Collision-free ticket numbers.
+
+Every ticket number encodes a distinct value of the ticket number sequence, see
+`TicketNumberSequenceManager.allocate`. The value is scrambled with a keyed
+Feistel permutation of NUMBER_BITS bits, so consecutive tickets do not get
+guessable consecutive numbers, but two values never give the same number. The result is written with 10 Crockford base32
+characters, which never clash with the 8 character random numbers of older
+tickets.
+"""
+import hashlib
+import hmac
+from django.conf import settings
+
+PREFIX = 'TICKET'
+# Crockford base32, without the easily confused I, L, O and U.
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+NUMBER_LENGTH = 10
+NUMBER_BITS = NUMBER_LENGTH * 5
+HALF_BITS = NUMBER_BITS // 2
+HALF_MASK = (1 << HALF_BITS) - 1
+ROUNDS = 4
+
+
+def _round_function(key: bytes, index: int, half: int) -> int:
+    digest = hmac.new(key, f'{index}:{half}'.encode(), hashlib.sha256).digest()
+    return int.from_bytes(digest[:8], 'big') & HALF_MASK
+
+
+def permute(value: int) -> int:
+    """
+    Map a sequence value to a scrambled value of NUMBER_BITS bits.
+
+    The mapping is a bijection, so distinct values stay distinct. It depends on
+    the TICKET_NUMBER_KEY setting, which must not change once tickets are issued.
+
+    Args:
+        value (int): The sequence value, below 2 ** NUMBER_BITS.
+
+    Returns:
+        int: The scrambled value.
+    """
+    if not 0 <= value < 1 << NUMBER_BITS:
+        raise ValueError(f"Ticket sequence value {value} does not fit in {NUMBER_BITS} bits.")
+    key = settings.TICKET_NUMBER_KEY.encode()
+    left, right = value >> HALF_BITS, value & HALF_MASK
+    for index in range(ROUNDS):
+        left, right = right, left ^ _round_function(key, index, right)
+    return (left << HALF_BITS) | right
+
+
+def format_ticket_number(value: int) -> str:
+    """
+    Get the ticket number of a sequence value, for example "TICKET-4K9Z0QWM2B".
+
+    Args:
+        value (int): The sequence value, allocated by `TicketNumberSequence.objects.allocate`.
+
+    Returns:
+        str: The ticket number.
+    """
+    scrambled = permute(value)
+    code = ''.join(ALPHABET[(scrambled >> shift) & 31] for shift in range(NUMBER_BITS - 5, -1, -5))
+    return f"{PREFIX}-{code}"
@@ -0,0 +1,126 @@
+"""
+Time-decayed "trending" score of events.
+
+Every like, bookmark and ticket registration adds its weight to
+`Event.trending_score` in the same UPDATE that adjusts the event counters, and
+removing one subtracts what is left of its weight. A periodic job multiplies
+all scores by the decay accumulated since its previous run, so a score is the
+sum of the engagement weights, each halved every TRENDING_HALF_LIFE_HOURS.
+Reading the trending events is then a top-K scan of the score index.
+"""
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.utils import timezone
+
+ENGAGEMENT_WEIGHTS = {'like': 1.0, 'bookmark': 2.0, 'ticket': 3.0}
+DECAY_CHECKPOINT = 'trending:decay'
+# Scores below this are reset to zero, so they drop out of the ranking and the index scan.
+MIN_SCORE = 1e-3
+# Engagements older than this many half-lives weigh less than 0.1% and are not replayed by `rebuild_scores`.
+HORIZON_HALF_LIVES = 10
+
+
+def half_life_seconds() -> float:
+    return settings.TRENDING_HALF_LIFE_HOURS * 3600
+
+
+def engagement_weight(kind: str, at=None, now=None) -> float:
+    """
+    Get the current weight of one engagement in the trending score.
+
+    Args:
+        kind (str): 'like', 'bookmark' or 'ticket'.
+        at (datetime, optional): When the engagement happened, defaults to now.
+        now (datetime, optional): The reference time, defaults to the current time.
+
+    Returns:
+        float: The weight of the engagement, decayed since `at`.
+    """
+    if at is None:
+        return ENGAGEMENT_WEIGHTS[kind]
+    age = ((now or timezone.now()) - at).total_seconds()
+    return ENGAGEMENT_WEIGHTS[kind] * 0.5 ** (max(age, 0) / half_life_seconds())
+
+
+def decay_scores(events, checkpoints, now=None) -> int:
+    """
+    Apply the decay accumulated since the previous run to every positive score.
+
+    The time of the previous run is the DECAY_CHECKPOINT row of `checkpoints`. It
+    is locked and moved forward in the transaction of the UPDATE, so concurrent
+    runs decay every interval exactly once. When it is missing, the run only
+    records the current time.
+
+    Args:
+        events (QuerySet): The events to decay, usually all of them.
+        checkpoints (type): The JobCheckpoint model.
+        now (datetime, optional): The reference time, defaults to the current time.
+
+    Returns:
+        int: The number of decayed events.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        checkpoint, created = checkpoints.objects.select_for_update().get_or_create(
+            name=DECAY_CHECKPOINT, defaults={'at': now},
+        )
+        if created or checkpoint.at >= now:
+            return 0
+        factor = 0.5 ** ((now - checkpoint.at).total_seconds() / half_life_seconds())
+        decayed = events.filter(trending_score__gt=0).update(trending_score=Case(
+            When(trending_score__lt=MIN_SCORE / factor, then=Value(0.0)),
+            default=F('trending_score') * factor,
+            output_field=FloatField(),
+        ))
+        checkpoint.at = now
+        checkpoint.save(update_fields=['at'])
+    return decayed
+
+
+def rebuild_scores(event_model, sources, now=None, checkpoints=None) -> int:
+    """
+    Recompute every trending score from the engagement tables.
+
+    Used to backfill the scores and to repair them after missed decay runs. Only
+    the engagements within HORIZON_HALF_LIVES are read, and their decayed weights
+    are summed per event with NumPy.
+
+    Args:
+        event_model (type): The Event model.
+        sources (list): (queryset, timestamp field, kind) triples, for example
+            `(Like.objects.filter(status='like'), 'liked_at', 'like')`.
+        now (datetime, optional): The reference time, defaults to the current time.
+        checkpoints (type, optional): The JobCheckpoint model, to record `now` as the
+            time of the last decay.
+
+    Returns:
+        int: The number of events with a positive score.
+    """
+    now = now or timezone.now()
+    horizon = now - timezone.timedelta(seconds=HORIZON_HALF_LIVES * half_life_seconds())
+    event_ids, weights = [], []
+    for queryset, field, kind in sources:
+        rows = list(queryset.filter(**{f'{field}__gte': horizon}).values_list('event_id', field))
+        if not rows:
+            continue
+        ages = now.timestamp() - np.fromiter((row[1].timestamp() for row in rows), dtype=np.float64, count=len(rows))
+        event_ids.append(np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)))
+        weights.append(ENGAGEMENT_WEIGHTS[kind] * 0.5 ** (np.maximum(ages, 0) / half_life_seconds()))
+
+    scores = {}
+    if event_ids:
+        ids, inverse = np.unique(np.concatenate(event_ids), return_inverse=True)
+        totals = np.bincount(inverse, weights=np.concatenate(weights))
+        scores = {int(event_id): float(total) for event_id, total in zip(ids, totals) if total >= MIN_SCORE}
+
+    with transaction.atomic():
+        event_model.objects.filter(trending_score__gt=0).update(trending_score=0)
+        event_model.objects.bulk_update(
+            [event_model(id=event_id, trending_score=score) for event_id, score in scores.items()],
+            ['trending_score'], batch_size=1000,
+        )
+        if checkpoints is not None:
+            checkpoints.objects.update_or_create(name=DECAY_CHECKPOINT, defaults={'at': now})
+    return len(scores)
@@ -2,6 +2,7 @@ import logging
 import smtplib
 from celery import shared_task
 from django.conf import settings
+from django.db import transaction
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.contrib.auth.tokens import default_token_generator
@@ -247,6 +248,28 @@ class TicketNotificationManager:
         
         return success
 
+    def send_waitlist_promotion(self) -> bool:
+        """
+        Sends an email to an attendee whose waitlist entry was turned into a ticket.
+
+        Returns:
+            bool: True if the email was sent successfully, False otherwise
+        """
+        html_content = self._generate_waitlist_promotion_html()
+        subject = f"You're In - {self.event.event_name}"
+
+        success = self.email_service.send_email(
+            to_email=self.attendee.email,
+            subject=subject,
+            html_content=html_content
+        )
+
+        if success:
+            self.ticket.email_sent = True
+            self.ticket.save(update_fields=['email_sent'])
+
+        return success
+
     def send_cancellation_notification(self) -> bool:
         """
         Sends a cancellation notification email to the attendee after a ticket has been cancelled.
@@ -362,6 +385,35 @@ class TicketNotificationManager:
         </div>
         """
 
+    def _generate_waitlist_promotion_html(self) -> str:
+        """
+        Generate HTML content for the waitlist promotion email.
+
+        Returns:
+            str: The rendered HTML content
+        """
+        return f"""
+        <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+            <h2 style="color: #333;">A Spot Opened Up</h2>
+            <p>Dear {self.attendee.full_name},</p>
+            <p>A spot became available for <strong>{self.event.event_name}</strong> and you have been moved from the waitlist to the attendee list.</p>
+
+            <div style="background-color: #f8f9fa; padding: 20px; margin: 20px 0; border-radius: 5px;">
+                <h3 style="margin-top: 0;">Event Details</h3>
+                <p><strong>Event:</strong> {self.event.event_name}</p>
+                <p><strong>Date:</strong> {self.event.start_date_event.strftime('%B %d, %Y %I:%M %p')}</p>
+                <p><strong>Location:</strong> {self.event.address}</p>
+                <p><strong>Ticket Number:</strong> {self.ticket.ticket_number}</p>
+            </div>
+
+            <p>If you can no longer attend, please cancel your ticket so the next person on the waitlist can take your spot.</p>
+
+            <div style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #eee;">
+                <small style="color: #666;">This is an automated message, please do not reply directly to this email.</small>
+            </div>
+        </div>
+        """
+
     def _generate_cancellation_html(self) -> str:
         """
         Generate HTML content for the cancellation confirmation email.
@@ -443,4 +495,77 @@ def send_reminder_emails():
     for ticket in tickets:
         notification_manager = TicketNotificationManager(ticket)
         notification_manager.send_reminder_notification()
-        
\ No newline at end of file
+        
+
+
+def delay_on_commit(task, *args) -> None:
+    """
+    Queue a task once the current transaction commits.
+
+    The task is queued by a named function rather than a partial, as Django logs a
+    failing robust hook by its __qualname__. A broker that is down is then logged
+    without failing the request whose data is already committed.
+
+    Args:
+        task (Task): The Celery task to queue.
+        *args: The arguments of the task.
+    """
+    def enqueue():
+        task.delay(*args)
+    enqueue.__qualname__ = f'{task.name}.delay'
+    transaction.on_commit(enqueue, robust=True)
+
+
+@shared_task
+def send_registration_confirmation_email(ticket_id: int):
+    """
+    Sends the registration confirmation email of a ticket and marks it as sent.
+
+    Queued once the registration is committed, so the registration request does
+    not wait for the mail server.
+
+    Args:
+        ticket_id (int): The ID of the registered ticket.
+    """
+    from api.models.ticket import Ticket
+    ticket = Ticket.objects.select_related('event', 'attendee').filter(id=ticket_id).first()
+    if ticket is None:
+        return False
+    return TicketNotificationManager(ticket).send_registration_confirmation()
+
+
+@shared_task
+def send_waitlist_promotion_email(ticket_id: int):
+    """
+    Sends the waitlist promotion email of a ticket.
+
+    Queued once the promotion is committed, so the cancellation that freed the
+    spot does not wait for the email.
+
+    Args:
+        ticket_id (int): The ID of the ticket created by the promotion.
+    """
+    from api.models.ticket import Ticket
+    ticket = Ticket.objects.select_related('event', 'attendee').filter(id=ticket_id).first()
+    if ticket is None:
+        return False
+    return TicketNotificationManager(ticket).send_waitlist_promotion()
+
+
+@shared_task
+def send_registration_confirmation_emails(ticket_ids: list):
+    """
+    Sends the registration confirmation emails of tickets issued in bulk.
+
+    Queued once for all the tickets of a bulk issuance, so the request does not
+    publish one task per ticket.
+
+    Args:
+        ticket_ids (list): The IDs of the issued tickets.
+
+    Returns:
+        int: The number of emails sent.
+    """
+    from api.models.ticket import Ticket
+    tickets = Ticket.objects.select_related('event', 'attendee').filter(id__in=ticket_ids)
+    return sum(TicketNotificationManager(ticket).send_registration_confirmation() for ticket in tickets.iterator())
@@ -45,21 +45,154 @@ class EventAPI(ControllerBase):
         strategy : EventStrategy = EventStrategy.get_strategy('organizer_get_events', request)
         return strategy.execute()
 
-    @route.get('/events', response=List[EventResponseSchema])
-    def list_all_events(self,request: HttpRequest):
+    @route.get('/events', response={200: Union[List[EventResponseSchema], EventCursorPageSchema, EventNormalizedPageSchema], 304: None, 400: ErrorResponseSchema})
+    def list_all_events(self,request: HttpRequest, cursor: Optional[str] = None, limit: Optional[int] = None, status: Optional[str] = None,
+                        filters: EventFilterSchema = Query(...), sort: Optional[str] = None, stream: bool = False,
+                        fields: Optional[str] = None, normalize: bool = False):
         """
         Retrieve all public events for the homepage.
 
         Args:
             request (HttpRequest): The HTTP request object.
+            cursor (str, optional): Cursor of the page to fetch, taken from the previous page's `next_cursor`.
+            limit (int, optional): Number of events per page. Passing `cursor` or `limit` switches to cursor pagination.
+            status (str, optional): Only return events that are currently UPCOMING, ONGOING or COMPLETED.
+            filters (EventFilterSchema): Filter by category, is_free, is_online, visibility, dress_code,
+                start date window (start_from, start_to), ticket price range (min_price, max_price) and tag.
+            sort (str, optional): 'newest' (default), 'soonest', 'most_liked' or 'cheapest'.
+            stream (bool, optional): Stream the whole feed in chunks instead of rendering it at once.
+            fields (str, optional): Comma-separated fields to return, e.g. "event_name,start_date_event"
+                for compact event cards. Returns every field by default.
+            normalize (bool, optional): Return {"results", "organizers"}, where every organizer is listed once
+                by ID and the events reference it by `organizer_id` instead of embedding it.
 
         Returns:
-            List[EventResponseSchema]: List of all events.
+            List[EventResponseSchema]: List of all events, or an EventCursorPageSchema when paginating,
+            or an EventNormalizedPageSchema with `normalize`.
+            304 Not Modified when the If-None-Match header matches the ETag of the page.
         """
-        
+
         strategy : EventStrategy = EventStrategy.get_strategy('list_event', request)
-        return strategy.execute()
+        return strategy.execute(cursor, limit, status, filters, sort, stream, fields, normalize)
     
+    @route.get('/search', response={200: EventSearchPageSchema, 400: ErrorResponseSchema})
+    def search_events(self, request: HttpRequest, q: str, limit: Optional[int] = None, offset: int = 0,
+                      fields: Optional[str] = None):
+        """
+        Full-text search over the public events, ranked by relevance.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            q (str): Search terms matched against the event name, description, detailed description,
+                tags and organizer name. Each term also matches words it is a prefix of.
+            limit (int, optional): Number of events per page.
+            offset (int, optional): Number of matches to skip, taken from the previous page's `next_offset`.
+            fields (str, optional): Comma-separated fields to return for each event, all by default.
+
+        Returns:
+            EventSearchPageSchema: The matching events, best match first.
+        """
+        strategy : EventStrategy = EventStrategy.get_strategy('search_event', request)
+        return strategy.execute(q, limit, offset, fields)
+
+    @route.get('/tags', response=List[TagFacetSchema])
+    def tag_facets(self, request: HttpRequest, limit: Optional[int] = None):
+        """
+        Retrieve the most used tags with their number of public events.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            limit (int, optional): Maximum number of tags to return.
+
+        Returns:
+            List[TagFacetSchema]: The tags and their event counts, most used first.
+        """
+        strategy : EventStrategy = EventStrategy.get_strategy('tag_facets', request)
+        return strategy.execute(limit)
+
+    @route.get('/trending', response=List[EventTrendingSchema])
+    def trending_events(self, request: HttpRequest, limit: Optional[int] = None):
+        """
+        Retrieve the events with the most recent likes, bookmarks and registrations.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            limit (int, optional): Maximum number of events to return, 20 by default.
+
+        Returns:
+            List[EventTrendingSchema]: The events and their trending score, highest first.
+        """
+        strategy : EventStrategy = EventStrategy.get_strategy('trending_event', request)
+        return strategy.execute(limit)
+
+    @route.get('/calendar', response={200: List[EventCalendarSchema], 400: ErrorResponseSchema})
+    def calendar_events(self, request: HttpRequest, start: datetime = Query(..., alias='from'),
+                        end: datetime = Query(..., alias='to')):
+        """
+        Retrieve the events taking place between two dates, for calendar views.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            start (datetime): The start of the window, passed as `from`.
+            end (datetime): The end of the window, passed as `to`.
+
+        Returns:
+            List[EventCalendarSchema]: The events overlapping the window, by start date.
+        """
+        strategy : EventStrategy = EventStrategy.get_strategy('calendar_event', request)
+        return strategy.execute(start, end)
+
+    @route.get('/recommended', response=List[EventResponseSchema], auth=JWTAuth())
+    def recommended_events(self, request: HttpRequest, limit: Optional[int] = None):
+        """
+        Retrieve the events recommended to the user from their likes, bookmarks and tickets.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            limit (int, optional): Maximum number of events to return, 20 by default.
+
+        Returns:
+            List[EventResponseSchema]: The recommended events, best first.
+        """
+        strategy : EventStrategy = EventStrategy.get_strategy('recommended_event', request)
+        return strategy.execute(limit)
+
+    @route.get('/nearby', response={200: List[EventNearbySchema], 400: ErrorResponseSchema})
+    def nearby_events(self, request: HttpRequest, lat: Optional[float] = None, lng: Optional[float] = None,
+                      radius_km: Optional[float] = None, limit: Optional[int] = None, fields: Optional[str] = None):
+        """
+        Retrieve the public events closest to a location.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            lat (float, optional): Latitude of the location. Defaults to the signed-in user's location.
+            lng (float, optional): Longitude of the location. Defaults to the signed-in user's location.
+            radius_km (float, optional): Search radius in kilometers, 10 by default.
+            limit (int, optional): Maximum number of events to return.
+            fields (str, optional): Comma-separated fields to return for each event, all by default.
+
+        Returns:
+            List[EventNearbySchema]: The events within the radius with their distance, closest first.
+        """
+        strategy : EventStrategy = EventStrategy.get_strategy('nearby_event', request)
+        return strategy.execute(lat, lng, radius_km, limit, fields)
+
+    @route.get('/map-clusters', response={200: List[MapClusterSchema], 400: ErrorResponseSchema})
+    def map_clusters(self, request: HttpRequest, bbox: str, zoom: int):
+        """
+        Retrieve the event markers of a map viewport, aggregated into clusters.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            bbox (str): The viewport as "west,south,east,north" in degrees.
+            zoom (int): The map zoom level.
+
+        Returns:
+            List[MapClusterSchema]: The clusters in the viewport with their centroid and event count.
+        """
+        strategy : EventStrategy = EventStrategy.get_strategy('map_clusters', request)
+        return strategy.execute(bbox, zoom)
+
     @route.patch('/{event_id}/edit', response={200: EventUpdateSchema, 401: ErrorResponseSchema, 404: ErrorResponseSchema}, auth=JWTAuth())
     def edit_event(self,request: HttpRequest, event_id: int, data: EventUpdateSchema):
         """
@@ -76,7 +209,7 @@ class EventAPI(ControllerBase):
         strategy : EventStrategy = EventStrategy.get_strategy('edit_event', request)
         return strategy.execute(event_id, data)
 
-    @route.get('/{event_id}', response=EventResponseSchema)
+    @route.get('/{event_id}', response={200: EventResponseSchema, 304: None})
     def event_detail(self,request: HttpRequest, event_id: int):
         """
         Retrieve detailed information for a specific event.
@@ -86,7 +219,8 @@ class EventAPI(ControllerBase):
             event_id (int): The ID of the event.
 
         Returns:
-            EventResponseSchema: Details of the specified event.
+            EventResponseSchema: Details of the specified event, or 304 Not Modified when the
+            If-None-Match header matches the ETag of the event.
         """
         strategy : EventStrategy = EventStrategy.get_strategy('event_detail', request)
         return strategy.execute(event_id)
@@ -109,6 +243,22 @@ class EventAPI(ControllerBase):
         return strategy.execute(event_id, file)
         
     
+    @route.get('/{event_id}/similar', response=List[EventResponseSchema])
+    def similar_events(self, request: HttpRequest, event_id: int, limit: Optional[int] = None):
+        """
+        Retrieve the events that users who engaged with an event also engaged with.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            event_id (int): ID of the event.
+            limit (int, optional): Maximum number of events to return, 10 by default.
+
+        Returns:
+            List[EventResponseSchema]: The similar events, most similar first.
+        """
+        strategy : EventStrategy = EventStrategy.get_strategy('similar_event', request)
+        return strategy.execute(event_id, limit)
+
     @route.get('/{event_id}/comments', response=List[CommentResponseSchema])
     def get_events_comments(self, request: HttpRequest, event_id: int):
         """
@@ -125,33 +275,35 @@ class EventAPI(ControllerBase):
         return strategy.execute()
     
     @route.get('/{event_id}/attendee-list', response=List[UserResponseSchema], auth=JWTAuth())
-    def get_attendee_list(self, request: HttpRequest, event_id: int):
+    def get_attendee_list(self, request: HttpRequest, event_id: int, stream: bool = False):
         """
         Retrieve the list of attendees for a specific event.
 
         Args:
             request (HttpRequest): The HTTP request object, containing user and request metadata.
             event_id (int): The ID of the event for which attendee list is requested.
+            stream (bool, optional): Stream the list in chunks, for exports of large events.
 
         Returns:
             List[UserResponseSchema]: A list of attendee users for the event.
         """
         strategy : EventEngagement = EventEngagement.get_engagement_strategy('event_attendee', request, event_id)
-        return strategy.execute()
+        return strategy.execute(stream)
         
     @route.get('/{event_id}/ticket-list', response=List[TicketResponseSchema], auth=JWTAuth())
-    def get_ticket_list(self, request: HttpRequest, event_id: int):
+    def get_ticket_list(self, request: HttpRequest, event_id: int, stream: bool = False):
         """
         Retrieve the list of tickets for a specific event.
 
         Args:
             request (HttpRequest): The HTTP request object, containing user and request metadata.
             event_id (int): The ID of the event for which ticket list is requested.
+            stream (bool, optional): Stream the list in chunks, for exports of large events.
 
         Returns:
             List[TicketResponseSchema]: A list of tickets for the event.
         """
         strategy : EventEngagement = EventEngagement.get_engagement_strategy('event_ticket', request, event_id)
-        return strategy.execute()    
+        return strategy.execute(stream)    
     
 
@@ -4,9 +4,10 @@ import logging
 import os
 import uuid
 from abc import ABC, abstractmethod
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from enum import Enum
+from functools import lru_cache, partial
 from typing import List, Optional
 
 # Third-Party Packages
@@ -19,16 +20,18 @@ from django.contrib.auth.models import User
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
-from django.db import IntegrityError
-from django.http import Http404, HttpRequest
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
+from django.http import Http404, HttpRequest, HttpResponse, HttpResponseNotModified
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
 from django.utils.crypto import get_random_string
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from django.views import View
 from google.auth.transport import requests
 from google.oauth2 import id_token
-from ninja import File, Form, ModelSchema, Schema
+from ninja import File, FilterSchema, Form, ModelSchema, Query, Schema
 from ninja.errors import HttpError
 from ninja.files import UploadedFile
 from ninja.responses import Response
@@ -47,6 +50,7 @@ from pydantic import (
     condecimal, 
     conint, 
     constr,
+    create_model,
     field_validator,
 )
 # Local Modules
@@ -55,8 +59,10 @@ from api.models.comment import *
 from api.models.event import *
 from api.models.like import *
 from api.models.organizer import *
+from api.models.tag import *
 from api.models.ticket import *
 from api.models.user import *
+from api.models.waitlist import *
 from api.utils import *
 
 logger = logging.getLogger(__name__)
@@ -28,6 +28,49 @@ class DressCode(str, Enum):
     THEMED = 'THEMED'
     OUTDOOR_BEACH_CASUAL = 'OUTDOOR_BEACH_CASUAL'
     
+class UserEngagementResolver:
+    """
+    Resolve a user's like, bookmark and ticket status for a whole page of events.
+
+    The user's liked, bookmarked and ticketed event ids are fetched once for the
+    page, three queries in total, and every event is then answered from memory.
+    """
+    def __init__(self, user: Optional[AttendeeUser], events):
+        self.liked = set()
+        self.bookmarked = set()
+        self.applied = set()
+        if user is None or not user.is_authenticated:
+            return
+        event_ids = [event.id for event in events]
+        if not event_ids:
+            return
+        self.liked = set(Like.objects.filter(
+            status='like', user=user, event_id__in=event_ids
+        ).values_list('event_id', flat=True))
+        self.bookmarked = set(Bookmarks.objects.filter(
+            attendee=user, event_id__in=event_ids
+        ).values_list('event_id', flat=True))
+        self.applied = set(Ticket.objects.filter(
+            attendee=user, event_id__in=event_ids
+        ).values_list('event_id', flat=True))
+
+    def resolve(self, event: Event) -> Dict:
+        """
+        Return the user engagement of a single event of the page.
+
+        Args:
+            event (Event): An event that was part of the resolved page.
+
+        Returns:
+            Dict: User engagement data including the user's like, bookmark and ticket status.
+        """
+        return UserEngagementSchema(
+            is_liked=event.id in self.liked,
+            is_bookmarked=event.id in self.bookmarked,
+            is_applied=event.id in self.applied,
+        ).dict()
+
+
 # Schema for Event
 class EventInputSchema(ModelSchema):
     category : EventCategory
@@ -35,6 +78,7 @@ class EventInputSchema(ModelSchema):
     visibility: EventVisibility = EventVisibility.PUBLIC
     allowed_email_domains: Optional[str] = None
     max_attendee: Optional[int] = None
+    tags: str = ''
     
     @field_validator("max_attendee", mode="before")
     def validate_max_attendee(cls, value):
@@ -49,7 +93,7 @@ class EventInputSchema(ModelSchema):
     
     class Meta:
         model = Event
-        exclude = ('organizer', 'id', 'status_registeration','tags','status', 'event_image','updated_at')     
+        exclude = ('organizer', 'id', 'status_registeration','tags','normalized_tags','status', 'event_image','updated_at', 'attendee_count', 'like_count', 'bookmark_count', 'trending_score')     
 
 class EventResponseSchema(ModelSchema):
     category : EventCategory
@@ -90,28 +134,27 @@ class EventResponseSchema(ModelSchema):
         Returns:
             Dict: User engagement data including the user's like status and bookmark status.
         """
-        if user is None or not user.is_authenticated:
-            return UserEngagementSchema(
-                is_liked=False,
-                is_bookmarked=False,
-                is_applied=False
-            ).dict()
-        
-        return UserEngagementSchema(
-            is_liked=event.likes.has_user_liked(user, event),
-            is_bookmarked=Bookmarks.objects.filter(event=event, attendee=user).exists(),
-            is_applied=Ticket.objects.filter(event=event, attendee=user).exists(),
-        ).dict()
+        return UserEngagementResolver(user, [event]).resolve(event)
         
     @classmethod
     def set_status_event(cls, event: Event):
-        event.set_registeration_status()
-        event.set_status_event()
+        """
+        Fill in the derived status fields of the event for serialization.
+
+        The values are computed in memory only, serializing an event never
+        writes to the database.
+
+        Args:
+            event (Event): The event being serialized.
+        """
+        now = timezone.now()
+        event.status_registeration = event.compute_registeration_status(now)
+        event.status = event.compute_status(now)
         event.current_attendees = event.current_number_attendee
     
     class Meta:
         model = Event
-        fields = '__all__'
+        exclude = ('normalized_tags', 'trending_score')
 
 class EventUpdateSchema(Schema):
     event_name: Optional[str] = None
@@ -124,6 +167,8 @@ class EventUpdateSchema(Schema):
     description: Optional[str] = None
     max_attendee: Optional[int] = None
     address: Optional[str] = None
+    latitude: Optional[Decimal] = None
+    longitude: Optional[Decimal] = None
     is_free: Optional[bool] = True
     ticket_price: Optional[Decimal] = Decimal('0.00')
     expected_price: Optional[Decimal] = Decimal('0.00')
@@ -156,4 +201,129 @@ class EventUpdateSchema(Schema):
     
 class EventEngagementSchema(Schema):
     total_likes: int
-    total_bookmarks: int
\ No newline at end of file
+    total_bookmarks: int
+    
+class EventCursorPageSchema(Schema):
+    results: List[EventResponseSchema]
+    limit: int
+    next_cursor: Optional[str] = None
+
+class EventNormalizedPageSchema(Schema):
+    results: List[Dict]
+    organizers: Dict[int, OrganizerResponseSchema]
+    limit: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class EventFilterSchema(FilterSchema):
+    category: Optional[EventCategory] = None
+    is_free: Optional[bool] = None
+    is_online: Optional[bool] = None
+    visibility: Optional[EventVisibility] = None
+    dress_code: Optional[DressCode] = None
+    start_from: Optional[datetime] = Field(None, json_schema_extra={'q': 'start_date_event__gte'})
+    start_to: Optional[datetime] = Field(None, json_schema_extra={'q': 'start_date_event__lte'})
+    min_price: Optional[Decimal] = Field(None, json_schema_extra={'q': 'ticket_price__gte'})
+    max_price: Optional[Decimal] = Field(None, json_schema_extra={'q': 'ticket_price__lte'})
+    tag: Optional[str] = None
+
+    def filter_tag(self, value: Optional[str]) -> Q:
+        """
+        Match the events linked to the tag, through the indexed tag table.
+        """
+        return Q(normalized_tags__name=value.strip().lower()) if value else Q()
+
+class EventNearbySchema(EventResponseSchema):
+    distance_km: float
+
+class EventTrendingSchema(EventResponseSchema):
+    trending_score: float
+
+@lru_cache(maxsize=256)
+def projected_schema(base, names: tuple):
+    """
+    Build a schema with only the `names` fields of `base`, keeping their types.
+    """
+    return create_model(
+        f'{base.__name__}Fields',
+        __base__=Schema,
+        **{name: (base.model_fields[name].annotation, base.model_fields[name]) for name in names},
+    )
+
+class EventFieldSet:
+    """
+    Sparse fieldset of an event list, parsed from the `fields` query parameter.
+
+    Only the requested fields are serialized, and the event query only reads the
+    columns they need, so TEXT columns such as `detailed_description` are never
+    loaded for clients that only render event cards.
+    """
+    # Columns that the derived statuses, the engagement counts and the feed cursors are computed from.
+    BASE_COLUMNS = ('id', 'organizer', 'event_create_date', 'start_date_event', 'end_date_event',
+                    'end_date_register', 'max_attendee', 'ticket_price',
+                    'attendee_count', 'like_count', 'bookmark_count')
+
+    def __init__(self, base, names: tuple):
+        self.names = names
+        self.schema = projected_schema(base, names)
+        model_fields = {field.name for field in Event._meta.concrete_fields}
+        self.columns = tuple(dict.fromkeys([*self.BASE_COLUMNS, *(name for name in names if name in model_fields)]))
+
+    @classmethod
+    def parse(cls, fields: Optional[str], base=EventResponseSchema) -> Optional['EventFieldSet']:
+        """
+        Parse a comma-separated list of field names of `base`.
+
+        The `id` field is always included.
+
+        Args:
+            fields (str, optional): The requested fields, e.g. "event_name,start_date_event".
+            base (type, optional): The full schema the fields are taken from.
+
+        Returns:
+            EventFieldSet: The fieldset, or None when all fields were requested.
+
+        Raises:
+            ValueError: If a requested field does not exist.
+        """
+        if not fields:
+            return None
+        requested = {name.strip() for name in fields.split(',') if name.strip()}
+        unknown = sorted(requested - set(base.model_fields))
+        if unknown:
+            raise ValueError(f"Unknown event fields: {', '.join(unknown)}")
+        requested.add('id')
+        return cls(base, tuple(name for name in base.model_fields if name in requested))
+
+    def apply(self, events):
+        """
+        Restrict an event queryset to the columns of the fieldset.
+
+        The organizer is only joined when it is part of the fieldset.
+        """
+        events = events.only(*self.columns)
+        return events.select_related('organizer') if 'organizer' in self.names else events.select_related(None)
+
+class MapClusterSchema(Schema):
+    latitude: float
+    longitude: float
+    count: int
+    event_id: Optional[int] = None
+
+class EventCalendarSchema(Schema):
+    id: int
+    event_name: str
+    category: EventCategory
+    start_date_event: datetime
+    end_date_event: datetime
+    is_online: bool
+    status: str
+
+class TagFacetSchema(Schema):
+    name: str
+    count: int
+
+class EventSearchPageSchema(Schema):
+    results: List[EventResponseSchema]
+    limit: int
+    offset: int
+    next_offset: Optional[int] = None
\ No newline at end of file
@@ -9,6 +9,27 @@ class TicketSchema(Schema):
     status: Optional[str] = None
     
 
+class TicketIssueSchema(Schema):
+    emails: List[str]
+
+
+class IssuedTicketSchema(Schema):
+    id: int
+    ticket_number: str
+    email: str
+
+
+class TicketIssueResponseSchema(Schema):
+    tickets: List[IssuedTicketSchema]
+    skipped: List[str]
+
+
+class WaitlistResponseSchema(Schema):
+    event_id: int
+    position: int
+    joined_at: datetime
+
+
 class TicketResponseSchema(Schema):
     id: int
     ticket_number: str
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from api.views.modules import *
 from api.views.schemas.event_schema import *
+from api.trending import engagement_weight
 
 class BookmarkStrategy(ABC):
     """
@@ -58,9 +59,9 @@ class BookmarkShowStrategy(BookmarkStrategy):
         Returns:
             List[Dict]: A list containing event data with engagement and user engagement details.
         """
-        bookmarks = Bookmarks.objects.filter(attendee=self.user)
-        
-        events = [bookmark.event for bookmark in bookmarks]
+        events = (Event.objects.filter(bookmarks__attendee=self.user)
+                  .select_related('organizer')
+                  .order_by('bookmarks__bookmark_at', 'bookmarks__id'))
 
         # Add engagement and user_engaged properties
         event_data = []
@@ -76,9 +77,11 @@ class BookmarkShowStrategy(BookmarkStrategy):
             events (List[Event]): The events to add engagement data for.
             event_data (List[Dict]): The list of event data to add the engagement data to.
         """
+        events = list(events)
+        user_engagement = UserEngagementResolver(self.user, events)
         for event in events:
             engagement = EventResponseSchema.resolve_engagement(event)
-            user_engaged = EventResponseSchema.resolve_user_engagement(event, self.user)
+            user_engaged = user_engagement.resolve(event)
             EventResponseSchema.set_status_event(event)
             event_schema = EventResponseSchema.from_orm(event)
             event_schema.engagement = engagement
@@ -101,13 +104,17 @@ class BookmarkToggleStrategy(BookmarkStrategy):
         
         event = get_object_or_404(Event, id=event_id)
 
-        try:
-            bookmark = Bookmarks.objects.get(event=event, attendee=self.user)
-            bookmark.delete()
-            return Response({"message": "Bookmark removed successfully."}, status=200)
-        except Bookmarks.DoesNotExist:
-            Bookmarks.objects.create(event=event, attendee=self.user)
-            return Response({"message": "Bookmark added successfully."}, status=200)
+        with transaction.atomic():
+            try:
+                bookmark = Bookmarks.objects.get(event=event, attendee=self.user)
+                bookmark.delete()
+                Event.objects.adjust_counters(event.id, bookmark_count=-1,
+                                              trending_score=-engagement_weight('bookmark', bookmark.bookmark_at))
+                return Response({"message": "Bookmark removed successfully."}, status=200)
+            except Bookmarks.DoesNotExist:
+                Bookmarks.objects.create(event=event, attendee=self.user)
+                Event.objects.adjust_counters(event.id, bookmark_count=1, trending_score=engagement_weight('bookmark'))
+                return Response({"message": "Bookmark added successfully."}, status=200)
     
         
     
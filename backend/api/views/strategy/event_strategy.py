@@ -5,6 +5,22 @@ from api.views.schemas.other_schema import *
 from api.views.schemas.comment_schema import CommentResponseSchema
 from api.views.schemas.user_schema import UserResponseSchema
 from api.views.schemas.ticket_schema import TicketResponseSchema
+from api.search import search_event_ids
+from api.geo import cluster_tile, nearest
+from api.streaming import stream_json_array
+from api.recommendations import SIMILAR_EVENTS_LIMIT, USER_RECOMMENDATIONS_LIMIT
+from api.cache import (
+    MAX_MAP_ZOOM,
+    etag_matches,
+    event_versions,
+    feed_cache_key,
+    get_or_build,
+    invalidate_map_tiles,
+    likes_version,
+    make_etag,
+    map_tile,
+    map_tile_key,
+)
 
 
 class EventStrategy(ABC):
@@ -33,6 +49,14 @@ class EventStrategy(ABC):
             'create_event': EventCreateStrategy(request),
             'organizer_get_events': EventOrganizerStrategy(request),
             'list_event': EventListStrategy(request),
+            'search_event': EventSearchStrategy(request),
+            'nearby_event': EventNearbyStrategy(request),
+            'map_clusters': EventMapClusterStrategy(request),
+            'tag_facets': EventTagFacetStrategy(request),
+            'trending_event': EventTrendingStrategy(request),
+            'calendar_event': EventCalendarStrategy(request),
+            'similar_event': EventSimilarStrategy(request),
+            'recommended_event': EventRecommendedStrategy(request),
             'event_detail': EventDetailStrategy(request),
             'edit_event': EventEditStrategy(request),
             'upload_event_image': EventUploadImageStrategy(request),
@@ -83,6 +107,7 @@ class EventStrategy(ABC):
         except ClientError as e:
             return Response({'error': f"S3 upload failed"}, status=400)
         event.save()
+        invalidate_map_tiles((event.latitude, event.longitude))
         return EventResponseSchema.from_orm(event)
 
     def upload_s3(self, image, filename):
@@ -109,22 +134,63 @@ class EventStrategy(ABC):
                 ExtraArgs={'ContentType': image.content_type}
             )
     
-    def add_event(self, event_list: list, events : list):
+    def add_event(self, event_list: list, events : list, schema=EventResponseSchema):
         """
         Add event data to a list, including engagement information and user engagement status.
 
         Args:
             event_list (list): The list to which event data will be added.
             events (QuerySet): The events for which data will be added to the list.
+            schema (type, optional): The schema to serialize the events with, a projection
+                of EventResponseSchema when only some fields were requested.
         """
+        events = list(events)
+        user_engagement = UserEngagementResolver(self.user if 'user_engaged' in schema.model_fields else None, events)
         for event in events:
-                engagement = EventResponseSchema.resolve_engagement(event)
-                user_engaged = EventResponseSchema.resolve_user_engagement(event, self.user)
+                event.engagement = EventResponseSchema.resolve_engagement(event)
+                event.user_engaged = user_engagement.resolve(event)
                 EventResponseSchema.set_status_event(event)
-                event_data = EventResponseSchema.from_orm(event)
-                event_data.engagement = engagement
-                event_data.user_engaged = user_engaged
-                event_list.append(event_data)
+                event_list.append(schema.from_orm(event))
+
+    def serialize_events(self, events: list, schema=EventResponseSchema) -> list:
+        """
+        Serialize events with their engagement information, see `add_event`.
+        """
+        event_list = []
+        self.add_event(event_list, events, schema)
+        return event_list
+
+    def normalize_events(self, events: list, schema=EventResponseSchema) -> dict:
+        """
+        Serialize events with their organizers listed once instead of inside every event.
+
+        Each event references its organizer by `organizer_id`, and the organizers
+        are returned next to the events, keyed by ID.
+
+        Args:
+            events (list): The events to serialize, with their organizer selected.
+            schema (type, optional): The schema to serialize the events with.
+
+        Returns:
+            dict: The serialized `results` and their `organizers`.
+        """
+        events = list(events)
+        if 'organizer' not in schema.model_fields:
+            return {'results': self.serialize_events(events, schema), 'organizers': {}}
+
+        names = tuple(name for name in schema.model_fields if name != 'organizer')
+        event_list = self.serialize_events(events, projected_schema(EventResponseSchema, names))
+        organizers = {}
+        for event in events:
+            if event.organizer_id not in organizers:
+                organizers[event.organizer_id] = OrganizerResponseSchema.from_orm(event.organizer)
+        return {
+            'results': [
+                {**event_data.dict(), 'organizer_id': event.organizer_id}
+                for event, event_data in zip(events, event_list)
+            ],
+            'organizers': organizers,
+        }
                 
                 
     def autheticate_user(self):
@@ -147,6 +213,27 @@ class EventStrategy(ABC):
                     self.user = user
         else:
             self.user = self.request.user
+
+    def conditional_response(self, etag: Optional[str], build):
+        """
+        Answer with 304 Not Modified if the client's copy matches `etag`, or else
+        build the response and tag it.
+
+        Args:
+            etag (str, optional): The current ETag of the resource.
+            build (callable): Builds the full response.
+
+        Returns:
+            HttpResponse: The 304 response or the response returned by `build`.
+        """
+        if etag_matches(self.request, etag):
+            response = HttpResponseNotModified()
+        else:
+            response = build()
+        if etag and response.status_code in (200, 304):
+            response['ETag'] = etag
+        patch_vary_headers(response, ['Authorization'])
+        return response
         
     
     
@@ -179,9 +266,14 @@ class EventCreateStrategy(EventStrategy):
         if not event.is_valid_date():
             return Response({'error': 'Please enter valid date'}, status=400)
         if image:
-            return self.upload_image(image, event)
-        event.save()
-        return EventResponseSchema.from_orm(event)
+            response = self.upload_image(image, event)
+        else:
+            event.save()
+            invalidate_map_tiles((event.latitude, event.longitude))
+            response = EventResponseSchema.from_orm(event)
+        if event.pk:
+            event.sync_tags()
+        return response
     
 class EventOrganizerStrategy(EventStrategy):
     """
@@ -202,7 +294,9 @@ class EventOrganizerStrategy(EventStrategy):
         """
         try:
             organizer = Organizer.objects.get(user=self.user)
-            events = Event.objects.filter(organizer=organizer, event_create_date__lte=timezone.now()).order_by("-event_create_date")
+            events = (Event.objects.filter(organizer=organizer, event_create_date__lte=timezone.now())
+                      .select_related('organizer')
+                      .order_by("-event_create_date"))
             event_list = []
             self.add_event(event_list,events)
             logger.info(f"Organizer {organizer.organizer_name} retrieved their events.")
@@ -219,29 +313,607 @@ class EventListStrategy(EventStrategy):
     """
     Strategy for retrieving all public events.
     """
-    def execute(self):
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+    DEFAULT_SORT = 'newest'
+    # Sort key -> (ordering field, descending). Ties are broken on the id in the same direction.
+    SORT_KEYS = {
+        'newest': ('event_create_date', True),
+        'soonest': ('start_date_event', False),
+        'most_liked': ('like_count', True),
+        'cheapest': ('ticket_price', False),
+    }
+
+    @classmethod
+    def encode_cursor(cls, event: Event, sort: str = DEFAULT_SORT) -> str:
+        """
+        Encode the feed position of an event into an opaque cursor.
+
+        Args:
+            event (Event): The last event of the current page.
+            sort (str, optional): The sort key of the feed.
+
+        Returns:
+            str: URL-safe cursor pointing right after the given event.
+        """
+        field_name, _ = cls.SORT_KEYS[sort]
+        value = Event._meta.get_field(field_name).value_to_string(event)
+        return urlsafe_base64_encode(force_bytes(json.dumps([sort, value, event.id])))
+
+    @classmethod
+    def decode_cursor(cls, cursor: str, sort: str = DEFAULT_SORT):
+        """
+        Decode a cursor produced by `encode_cursor`.
+
+        Args:
+            cursor (str): The cursor sent by the client.
+            sort (str, optional): The sort key of the feed.
+
+        Returns:
+            tuple: The (sort value, id) position of the cursor.
+
+        Raises:
+            ValueError: If the cursor is malformed or was issued for another sort key.
+        """
+        try:
+            cursor_sort, value, event_id = json.loads(force_str(urlsafe_base64_decode(cursor)))
+            if cursor_sort != sort:
+                raise ValueError("Cursor sort mismatch")
+            field_name, _ = cls.SORT_KEYS[sort]
+            return Event._meta.get_field(field_name).to_python(value), int(event_id)
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError, ValidationError) as error:
+            raise ValueError("Invalid cursor") from error
+
+    def get_queryset(self, sort: str = DEFAULT_SORT):
+        """
+        Return the feed visible to the current user, ordered by its keyset (sort field, id).
+        """
+        field_name, descending = self.SORT_KEYS[sort]
+        prefix = '-' if descending else ''
+        return (Event.objects.filter(event_create_date__lte=timezone.now())
+                .visible_to(self.user)
+                .select_related('organizer')
+                .order_by(f"{prefix}{field_name}", f"{prefix}id"))
+
+    def get_page(self, cursor: Optional[str] = None, limit: Optional[int] = None, status: Optional[str] = None,
+                 filters: Optional[EventFilterSchema] = None, sort: Optional[str] = None,
+                 fieldset: Optional[EventFieldSet] = None):
+        """
+        Select the events of the requested feed page.
+
+        All filtering and ordering happens in the database.
+
+        Args:
+            cursor (str, optional): The `next_cursor` returned with the previous page.
+            limit (int, optional): The number of events per page.
+            status (str, optional): Only return events in this status ('UPCOMING', 'ONGOING' or 'COMPLETED').
+            filters (EventFilterSchema, optional): Category, price, date and other filters.
+            sort (str, optional): One of the SORT_KEYS, defaults to 'newest'.
+            fieldset (EventFieldSet, optional): Only read the columns of these fields.
+
+        Returns:
+            tuple: The events from the start of the page onwards and the page size,
+            which is None when the whole feed is requested.
+
+        Raises:
+            ValueError: If the cursor, the status or the sort key is invalid.
+        """
+        sort = sort or self.DEFAULT_SORT
+        if sort not in self.SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        events = self.get_queryset(sort)
+        if status:
+            events = events.with_status(status.upper())
+        if filters is not None:
+            events = filters.filter(events)
+        if fieldset is not None:
+            events = fieldset.apply(events)
+        if cursor is None and limit is None:
+            return events, None
+
+        limit = min(max(limit or self.DEFAULT_PAGE_SIZE, 1), self.MAX_PAGE_SIZE)
+        if cursor:
+            value, event_id = self.decode_cursor(cursor, sort)
+            field_name, descending = self.SORT_KEYS[sort]
+            after = 'lt' if descending else 'gt'
+            events = events.filter(
+                Q(**{f'{field_name}__{after}': value}) |
+                Q(**{field_name: value, f'id__{after}': event_id})
+            )
+        return events, limit
+
+    def get_etag(self, events, limit: Optional[int], fieldset: Optional[EventFieldSet] = None,
+                 normalize: bool = False) -> str:
+        """
+        Compute the ETag of a feed page from the version tags of its events.
+
+        Args:
+            events (QuerySet): The events from the start of the page onwards.
+            limit (int, optional): The page size, None for the whole feed.
+            fieldset (EventFieldSet, optional): The fields the page is rendered with.
+            normalize (bool, optional): Whether the page lists its organizers separately.
+
+        Returns:
+            str: The ETag of the page for the current user.
+        """
+        shape = (fieldset.names if fieldset is not None else None, normalize)
+        if limit is None:
+            return make_etag(self.user.id, shape, events.version_tags())
+        tags = events.version_tags(limit + 1)
+        return make_etag(self.user.id, shape, limit, tags[:limit], len(tags) > limit)
+
+    def execute(self, cursor: Optional[str] = None, limit: Optional[int] = None, status: Optional[str] = None,
+                filters: Optional[EventFilterSchema] = None, sort: Optional[str] = None, stream: bool = False,
+                fields: Optional[str] = None, normalize: bool = False):
         """
         Retrieve all public events for the homepage.
 
+        Filtering and sorting happen in the database, on the composite indexes of
+        `Event`. Every successful response carries an ETag derived from the events of the
+        page, and a request whose If-None-Match still matches gets a 304 without the
+        feed being serialized. Anonymous requests all see the same feed, so their
+        rendered responses are served from the shared cache and only rebuilt after
+        a write invalidated them.
+
+        With `stream` the whole feed is streamed from the database in chunks instead,
+        bypassing the cache and the ETag, so memory use does not grow with the feed.
+
         Args:
-            None
+            cursor (str, optional): The `next_cursor` returned with the previous page.
+            limit (int, optional): The number of events per page.
+            status (str, optional): Only return events in this status ('UPCOMING', 'ONGOING' or 'COMPLETED').
+            filters (EventFilterSchema, optional): Category, price, date and other filters.
+            sort (str, optional): 'newest' (default), 'soonest', 'most_liked' or 'cheapest'.
+            stream (bool, optional): Stream the whole feed, ignored when paginating.
+            fields (str, optional): Comma-separated EventResponseSchema fields to return, all by default.
+            normalize (bool, optional): List the organizers once next to the events, see `normalize_events`.
 
         Returns:
-            Response: List of all public events, ordered by event creation date in descending order.
+            HttpResponse: The rendered feed, see `build_feed`, or 304 Not Modified.
+        """
+        self.autheticate_user()
+        try:
+            fieldset = EventFieldSet.parse(fields)
+        except ValueError as error:
+            return Response({'error': str(error)}, status=400)
+
+        if stream and cursor is None and limit is None:
+            if normalize:
+                return Response({'error': 'A streamed feed cannot be normalized.'}, status=400)
+            try:
+                events, _ = self.get_page(status=status, filters=filters, sort=sort, fieldset=fieldset)
+            except ValueError as error:
+                return Response({'error': str(error)}, status=400)
+            schema = fieldset.schema if fieldset is not None else EventResponseSchema
+            logger.info("Streaming all public events for the homepage.")
+            return stream_json_array(events, lambda chunk: self.serialize_events(chunk, schema))
+
+        if self.user.is_authenticated:
+            try:
+                events, page_limit = self.get_page(cursor, limit, status, filters, sort)
+            except ValueError as error:
+                return Response({'error': str(error)}, status=400)
+            return self.conditional_response(
+                self.get_etag(events, page_limit, fieldset, normalize),
+                lambda: self.build_feed(cursor, limit, status, filters, sort, fieldset, normalize),
+            )
+
+        # Likes, bookmarks and registrations only change the counters of their event, so
+        # a page records the versions of the events it renders and is rebuilt when one
+        # of them changes. Like counts also order the 'most_liked' pages.
+        def build():
+            try:
+                events, page_limit = self.get_page(cursor, limit, status, filters, sort)
+                etag = self.get_etag(events, page_limit, fieldset, normalize)
+                versions = event_versions(events.values_list('id', flat=True)[:page_limit], create=True)
+            except ValueError:
+                etag, versions = None, {}
+            response = self.build_feed(cursor, limit, status, filters, sort, fieldset, normalize)
+            return (response.status_code, response.content, etag, versions), response.status_code == 200
+
+        def is_fresh(page):
+            versions = page[3]
+            return event_versions(versions) == versions
+
+        key = feed_cache_key(cursor=cursor, limit=limit, status=status, sort=sort, normalize=normalize,
+                             fields=fieldset.names if fieldset is not None else None,
+                             likes=likes_version() if sort == 'most_liked' else None,
+                             **(filters.dict() if filters is not None else {}))
+        status_code, content, etag, _ = get_or_build(key, build, is_fresh=is_fresh)
+        return self.conditional_response(
+            etag,
+            lambda: HttpResponse(content, status=status_code, content_type='application/json; charset=utf-8'),
+        )
+
+    def build_feed(self, cursor: Optional[str] = None, limit: Optional[int] = None, status: Optional[str] = None,
+                   filters: Optional[EventFilterSchema] = None, sort: Optional[str] = None,
+                   fieldset: Optional[EventFieldSet] = None, normalize: bool = False):
+        """
+        Build the public feed for the current user.
+
+        When either `cursor` or `limit` is given the feed is served one page at a
+        time, keyed on (event_create_date, id), so every page costs the same
+        regardless of how deep the client has scrolled.
+
+        Args:
+            cursor (str, optional): The `next_cursor` returned with the previous page.
+            limit (int, optional): The number of events per page.
+            status (str, optional): Only return events in this status ('UPCOMING', 'ONGOING' or 'COMPLETED').
+            filters (EventFilterSchema, optional): Category, price, date and other filters.
+            sort (str, optional): 'newest' (default), 'soonest', 'most_liked' or 'cheapest'.
+            fieldset (EventFieldSet, optional): Only read and render the fields of this fieldset.
+            normalize (bool, optional): Return the events as `results` with their `organizers`
+                listed once, see `normalize_events`.
+
+        Returns:
+            Response: List of all public events, ordered by event creation date in descending order,
+            or a page of events with its `next_cursor` when paginating.
             ErrorResponseSchema: Error message with status code 400 in case of other errors.
         """
-        events = Event.objects.filter(event_create_date__lte=timezone.now()).order_by("-event_create_date")
+        try:
+            events, limit = self.get_page(cursor, limit, status, filters, sort, fieldset)
+        except ValueError as error:
+            return Response({'error': str(error)}, status=400)
+        schema = fieldset.schema if fieldset is not None else EventResponseSchema
+
+        if limit is None:
+            logger.info("Retrieved all public events for the homepage.")
+            if normalize:
+                return Response(self.normalize_events(events, schema), status=200)
+            return Response(self.serialize_events(events, schema), status=200)
+
+        page = list(events[:limit + 1])
+        next_cursor = self.encode_cursor(page[limit - 1], sort or self.DEFAULT_SORT) if len(page) > limit else None
+        if normalize:
+            body = self.normalize_events(page[:limit], schema)
+        else:
+            body = {'results': self.serialize_events(page[:limit], schema)}
+
+        logger.info("Retrieved a page of %d public events for the homepage.", len(body['results']))
+        # A plain dict, since the results may be a projection of EventResponseSchema.
+        return Response({**body, 'limit': limit, 'next_cursor': next_cursor}, status=200)
+    
+    
+class EventSearchStrategy(EventStrategy):
+    """
+    Strategy for full-text search over the public events.
+    """
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+
+    def execute(self, q: str, limit: Optional[int] = None, offset: int = 0, fields: Optional[str] = None):
+        """
+        Search the public events by name, description, detailed description, tags
+        and organizer name, best match first.
+
+        Args:
+            q (str): The search query.
+            limit (int, optional): The number of events per page.
+            offset (int, optional): The number of matches to skip.
+            fields (str, optional): Comma-separated EventResponseSchema fields to return, all by default.
+
+        Returns:
+            Response: An EventSearchPageSchema with the matching events and the
+            `next_offset` of the following page, or an error with status code 400
+            if the query is empty or a field is unknown.
+        """
+        if not q or not q.strip():
+            return Response({'error': 'Search query is required.'}, status=400)
+        try:
+            fieldset = EventFieldSet.parse(fields)
+        except ValueError as error:
+            return Response({'error': str(error)}, status=400)
+        self.autheticate_user()
+        limit = min(max(limit or self.DEFAULT_PAGE_SIZE, 1), self.MAX_PAGE_SIZE)
+        offset = max(offset, 0)
+
+        event_ids = search_event_ids(q, limit + 1, offset, created_before=timezone.now())
+        has_more = len(event_ids) > limit
+        # Matches the user may not see are dropped, so a page can be shorter than `limit`.
+        events = Event.objects.visible_to(self.user).select_related('organizer')
+        if fieldset is not None:
+            events = fieldset.apply(events)
+        events = events.in_bulk(event_ids[:limit])
+        event_list = []
+        self.add_event(event_list, [events[event_id] for event_id in event_ids[:limit] if event_id in events],
+                       fieldset.schema if fieldset is not None else EventResponseSchema)
+
+        logger.info("Search for %r matched %d events.", q, len(event_list))
+        return Response({
+            'results': event_list,
+            'limit': limit,
+            'offset': offset,
+            'next_offset': offset + limit if has_more else None,
+        }, status=200)
+
+
+class EventNearbyStrategy(EventStrategy):
+    """
+    Strategy for retrieving the public events closest to a location.
+    """
+    DEFAULT_RADIUS_KM = 10.0
+    MAX_RADIUS_KM = 500.0
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+
+    def execute(self, lat: Optional[float] = None, lng: Optional[float] = None,
+                radius_km: Optional[float] = None, limit: Optional[int] = None, fields: Optional[str] = None):
+        """
+        Retrieve the public events within `radius_km` of a location, closest first.
+
+        When `lat` and `lng` are omitted, the location saved on the authenticated
+        user's profile is used.
+
+        Args:
+            lat (float, optional): Latitude of the location in degrees.
+            lng (float, optional): Longitude of the location in degrees.
+            radius_km (float, optional): Search radius in kilometers.
+            limit (int, optional): Maximum number of events to return.
+            fields (str, optional): Comma-separated EventResponseSchema fields to return, all by default.
+                The distance is always returned.
+
+        Returns:
+            Response: A list of EventNearbySchema, or an error with status code 400
+            if no valid location is available or a field is unknown.
+        """
+        try:
+            fieldset = EventFieldSet.parse(fields)
+        except ValueError as error:
+            return Response({'error': str(error)}, status=400)
+        self.autheticate_user()
+        if lat is None or lng is None:
+            if not self.user.is_authenticated or not (self.user.latitude or self.user.longitude):
+                return Response({'error': 'Provide lat and lng, or set a location on your profile.'}, status=400)
+            lat, lng = float(self.user.latitude), float(self.user.longitude)
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            return Response({'error': 'Invalid coordinates.'}, status=400)
+        radius_km = min(max(radius_km or self.DEFAULT_RADIUS_KM, 0.1), self.MAX_RADIUS_KM)
+        limit = min(max(limit or self.DEFAULT_LIMIT, 1), self.MAX_LIMIT)
+
+        events = Event.objects.filter(event_create_date__lte=timezone.now()).visible_to(self.user)
+        matches = nearest(events, lat, lng, radius_km, limit)
+        events = Event.objects.select_related('organizer')
+        if fieldset is not None:
+            events = fieldset.apply(events)
+        events = events.in_bulk([event_id for event_id, _ in matches])
+        # An event deleted since `nearest` is dropped.
+        matches = [(event_id, distance) for event_id, distance in matches if event_id in events]
         event_list = []
+        self.add_event(event_list, [events[event_id] for event_id, _ in matches],
+                       fieldset.schema if fieldset is not None else EventResponseSchema)
+
+        logger.info("Found %d events within %.1f km.", len(event_list), radius_km)
+        return Response([
+            {**event_data.dict(), 'distance_km': round(distance, 3)}
+            for event_data, (_, distance) in zip(event_list, matches)
+        ], status=200)
+
+
+class EventMapClusterStrategy(EventStrategy):
+    """
+    Strategy for aggregating the public events of a map viewport into clusters.
+    """
+    MAX_TILES = 64
+
+    def execute(self, bbox: str, zoom: int):
+        """
+        Retrieve the event clusters whose centroid lies inside `bbox`.
+
+        The clusters are computed and cached per map tile, so panning the map only
+        aggregates the tiles that are not cached yet. The tiles are shared by all
+        users, so they only contain the events that everyone can see.
+
+        Args:
+            bbox (str): The viewport as "west,south,east,north" in degrees. The
+                viewport crosses the antimeridian when west is greater than east.
+            zoom (int): The map zoom level, from 0 to MAX_MAP_ZOOM.
+
+        Returns:
+            Response: A list of MapClusterSchema, or an error with status code 400
+            if the viewport is invalid or covers too many tiles.
+        """
+        try:
+            west, south, east, north = (float(value) for value in bbox.split(','))
+        except ValueError:
+            return Response({'error': 'bbox must be "west,south,east,north".'}, status=400)
+        if not (-180 <= west <= 180 and -180 <= east <= 180 and -90 <= south <= north <= 90):
+            return Response({'error': 'Invalid bbox.'}, status=400)
+        zoom = min(max(zoom, 0), MAX_MAP_ZOOM)
+
+        tiles = 2 ** zoom
+        (x0, y0), (x1, y1) = map_tile(south, west, zoom), map_tile(north, east, zoom)
+        columns = list(range(x0, x1 + 1)) if west <= east else [*range(x0, tiles), *range(0, x1 + 1)]
+        rows = range(y0, y1 + 1)
+        if len(columns) * len(rows) > self.MAX_TILES:
+            return Response({'error': 'The bbox covers too many tiles, zoom in.'}, status=400)
+
+        events = Event.objects.filter(visible_to_everyone(), event_create_date__lte=timezone.now())
+        clusters = []
+        for x in columns:
+            for y in rows:
+                clusters += get_or_build(
+                    map_tile_key(zoom, x, y),
+                    lambda: (cluster_tile(events, zoom, x, y), True),
+                    timeout=settings.MAP_CLUSTER_CACHE_TIMEOUT,
+                )
+
+        in_longitude = (lambda lng: west <= lng <= east) if west <= east else (lambda lng: lng >= west or lng <= east)
+        return Response([
+            cluster for cluster in clusters
+            if south <= cluster['latitude'] <= north and in_longitude(cluster['longitude'])
+        ], status=200)
+
+
+class EventTagFacetStrategy(EventStrategy):
+    """
+    Strategy for counting the public events of every tag.
+    """
+    DEFAULT_LIMIT = 50
+    MAX_LIMIT = 200
+
+    def execute(self, limit: Optional[int] = None):
+        """
+        Retrieve the most used tags with their number of events visible to everyone.
+
+        The counts are cached with the event feed, so they are recomputed only
+        after an event or its tags changed. They are shared by all users, so they
+        only count the events that everyone can see.
+
+        Args:
+            limit (int, optional): Maximum number of tags to return.
+
+        Returns:
+            Response: A list of TagFacetSchema, most used tag first.
+        """
+        limit = min(max(limit or self.DEFAULT_LIMIT, 1), self.MAX_LIMIT)
+
+        def build():
+            facets = (Tag.objects
+                      .annotate(count=Count('events', filter=Q(events__event_create_date__lte=timezone.now())
+                                                     & visible_to_everyone('events__')))
+                      .filter(count__gt=0)
+                      .order_by('-count', 'name')
+                      .values('name', 'count')[:limit])
+            return list(facets), True
+
+        return Response(get_or_build(feed_cache_key(facets='tags', limit=limit), build), status=200)
+
+
+class EventTrendingStrategy(EventStrategy):
+    """
+    Strategy for retrieving the events with the most recent engagement.
+    """
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+
+    def execute(self, limit: Optional[int] = None):
+        """
+        Retrieve the visible events with the highest trending score.
+
+        The scores are maintained by the like, bookmark and ticket writes and the
+        periodic decay task, so this is a top-K scan of the trending index.
+
+        Args:
+            limit (int, optional): Maximum number of events to return.
+
+        Returns:
+            Response: A list of EventTrendingSchema, highest score first.
+        """
         self.autheticate_user()
+        limit = min(max(limit or self.DEFAULT_LIMIT, 1), self.MAX_LIMIT)
+        events = (Event.objects.filter(event_create_date__lte=timezone.now(), trending_score__gt=0)
+                  .visible_to(self.user)
+                  .select_related('organizer')
+                  .order_by('-trending_score', '-id')[:limit])
+        event_list = []
+        self.add_event(event_list, events, EventTrendingSchema)
+        return Response(event_list, status=200)
 
-        self.add_event(event_list,events)
 
-        # Conditionally add user-specific engagement data
+class EventCalendarStrategy(EventStrategy):
+    """
+    Strategy for retrieving the events taking place within a time window.
+    """
+    MAX_WINDOW = timedelta(days=366)
+    FIELDS = ('id', 'event_name', 'category', 'start_date_event', 'end_date_event', 'is_online')
+
+    def execute(self, start: datetime, end: datetime):
+        """
+        Retrieve the visible events that overlap the window, in calendar order.
+
+        The events are read in a single query through the (start_date_event,
+        end_date_event) index with only the columns a calendar shows. The status is
+        derived in SQL and never written back.
+
+        Args:
+            start (datetime): The start of the window.
+            end (datetime): The end of the window.
+
+        Returns:
+            Response: A list of EventCalendarSchema, or an error with status code 400
+            if the window is empty or longer than MAX_WINDOW.
+        """
+        start, end = (timezone.make_aware(value) if timezone.is_naive(value) else value for value in (start, end))
+        if end <= start:
+            return Response({'error': '"to" must be after "from".'}, status=400)
+        if end - start > self.MAX_WINDOW:
+            return Response({'error': f'The window cannot exceed {self.MAX_WINDOW.days} days.'}, status=400)
+        self.autheticate_user()
+        now = timezone.now()
+        events = list(Event.objects.filter(event_create_date__lte=now)
+                      .overlapping(start, end)
+                      .visible_to(self.user)
+                      .with_computed_status(now)
+                      .order_by('start_date_event', 'id')
+                      .values(*self.FIELDS, 'computed_status'))
+        for event in events:
+            event['status'] = event.pop('computed_status')
+        return Response(events, status=200)
+
+
+class EventSimilarStrategy(EventStrategy):
+    """
+    Strategy for retrieving the events liked, bookmarked or attended by the same users as an event.
+    """
+    DEFAULT_LIMIT = 10
 
-        logger.info("Retrieved all public events for the homepage.")
+    def execute(self, event_id: int, limit: Optional[int] = None):
+        """
+        Retrieve the visible upcoming events most similar to an event.
+
+        The similar events are computed offline by `api.recommendations`, so this
+        is a single read of the (event, -score) index.
+
+        Args:
+            event_id (int): The ID of the event.
+            limit (int, optional): Maximum number of events to return.
+
+        Returns:
+            Response: A list of EventResponseSchema, most similar first.
+        """
+        self.autheticate_user()
+        limit = min(max(limit or self.DEFAULT_LIMIT, 1), SIMILAR_EVENTS_LIMIT)
+        events = (Event.objects.filter(similar_to__event_id=event_id, end_date_event__gte=timezone.now())
+                  .visible_to(self.user)
+                  .select_related('organizer')
+                  .order_by('-similar_to__score')[:limit])
+        event_list = []
+        self.add_event(event_list, events)
         return Response(event_list, status=200)
-    
-    
+
+
+class EventRecommendedStrategy(EventStrategy):
+    """
+    Strategy for retrieving the events recommended to the authenticated user.
+    """
+    DEFAULT_LIMIT = 20
+
+    def execute(self, limit: Optional[int] = None):
+        """
+        Retrieve the visible upcoming events recommended to the user, best first.
+
+        The recommendations are computed offline by `api.recommendations`, so this
+        is a single read of the (user, -score) index. Users without recommendations
+        yet get the trending events.
+
+        Args:
+            limit (int, optional): Maximum number of events to return.
+
+        Returns:
+            Response: A list of EventResponseSchema, best recommendation first.
+        """
+        limit = min(max(limit or self.DEFAULT_LIMIT, 1), USER_RECOMMENDATIONS_LIMIT)
+        events = (Event.objects.filter(recommended_to__user=self.user, end_date_event__gte=timezone.now())
+                  .visible_to(self.user)
+                  .select_related('organizer')
+                  .order_by('-recommended_to__score')[:limit])
+        event_list = []
+        self.add_event(event_list, events)
+        if not event_list:
+            return EventTrendingStrategy(self.request).execute(limit)
+        return Response(event_list, status=200)
+
+
 class EventDetailStrategy(EventStrategy):
     """
     Strategy for retrieving details of a specific event.
@@ -259,7 +931,22 @@ class EventDetailStrategy(EventStrategy):
         """
         self.autheticate_user()
         logger.info("Fetching details for event ID: %d by user %s.", event_id, self.request.user.username)
-        event = get_object_or_404(Event, id=event_id)
+        tags = Event.objects.filter(id=event_id).version_tags()
+        if not tags:
+            raise Http404("No Event matches the given query.")
+        return self.conditional_response(make_etag(self.user.id, tags), lambda: self.build_detail(event_id))
+
+    def build_detail(self, event_id: int) -> Response:
+        """
+        Serialize the event details for the current user.
+
+        Args:
+            event_id (int): The ID of the event.
+
+        Returns:
+            Response: The event details along with engagement data and user-specific engagement status.
+        """
+        event = get_object_or_404(Event.objects.select_related('organizer'), id=event_id)
         engagement_data = EventResponseSchema.resolve_engagement(event)
         user_engaged = EventResponseSchema.resolve_user_engagement(event, self.user)
         EventResponseSchema.set_status_event(event)
@@ -267,7 +954,7 @@ class EventDetailStrategy(EventStrategy):
         event_data = EventResponseSchema.from_orm(event)
         event_data.engagement = engagement_data
         event_data.user_engaged = user_engaged
-        return event_data
+        return Response(event_data, status=200)
     
     
 class EventEditStrategy(EventStrategy):
@@ -298,10 +985,19 @@ class EventEditStrategy(EventStrategy):
                 return Response({'error': 'Event name is required.'}, status=400)
             
             
+            old_location = (event.latitude, event.longitude)
+            old_audience = (event.visibility, event.allowed_email_domains)
             update_fields = data.dict(exclude_unset = True)
             for field, value in update_fields.items():
                 setattr(event, field, value)
             event.save()
+            if 'tags' in update_fields:
+                event.sync_tags()
+            if (event.latitude, event.longitude) != old_location:
+                invalidate_map_tiles(old_location, (event.latitude, event.longitude))
+            elif (event.visibility, event.allowed_email_domains) != old_audience:
+                # The shared tiles only contain the events that everyone can see.
+                invalidate_map_tiles(old_location)
             event_data = EventUpdateSchema.from_orm(event)
             logger.info(f"Organizer {organizer.organizer_name} edited their event {event_id}.")
             return Response(event_data, status=200)
@@ -489,10 +1185,14 @@ class EventCommentStrategy(EventEngagement):
     
 class EventAllAttendee(EventEngagement):
     """Strategy to retrieve all attendees for an event."""
-    def execute(self):
+    def execute(self, stream: bool = False):
         """
         Execute the strategy to retrieve all attendees for the event.
 
+        Args:
+            stream (bool, optional): Stream the attendees from the database in chunks
+                instead of building the whole list in memory.
+
         Returns:
             Response: A response containing a list of serialized attendees for the event,
                 ordered by username in ascending order. If the user is not an organizer of the event,
@@ -503,7 +1203,10 @@ class EventAllAttendee(EventEngagement):
             if self.event.organizer != organizer:
                 logger.warning(f"User {self.user.username} tried to access attendee list but is not an organizer.")
                 return Response({'error': 'You are not allowed to access this event.'}, status=403)
-            tickets = Ticket.objects.filter(event=self.event).order_by('attendee__username')
+            tickets = Ticket.objects.filter(event=self.event).select_related('attendee').order_by('attendee__username')
+            if stream:
+                logger.info(f"Streaming attendee list for event {self.event.id}.")
+                return stream_json_array(tickets, lambda chunk: [UserResponseSchema.from_orm(ticket.attendee) for ticket in chunk])
             response_data = [UserResponseSchema.from_orm(ticket.attendee) for ticket in tickets]
             logger.info(f"Retrieved attendee list for event {self.event.id}.")
             return Response(response_data, status=200)
@@ -514,14 +1217,21 @@ class EventAllAttendee(EventEngagement):
         
 class EventAllTicket(EventEngagement):
     """Strategy to retrieve all tickets for an event."""
-    def execute(self):
+    def execute(self, stream: bool = False):
         """
         Execute the strategy to retrieve all tickets for the event.
 
+        Args:
+            stream (bool, optional): Stream the tickets from the database in chunks
+                instead of building the whole list in memory.
+
         Returns:
             Response: A response containing a list of serialized tickets for the event, ordered by ticket ID.
         """
-        tickets = Ticket.objects.filter(event=self.event).order_by('id')
+        tickets = Ticket.objects.filter(event=self.event).select_related('attendee').order_by('id')
+        if stream:
+            logger.info(f"Streaming ticket list for event {self.event.id}.")
+            return stream_json_array(tickets, lambda chunk: [TicketResponseSchema(**ticket.get_ticket_details()) for ticket in chunk])
         response_data = [TicketResponseSchema(
                             **ticket.get_ticket_details()
                         )
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from api.views.modules import *
 from api.views.schemas.event_schema import EventResponseSchema
+from api.trending import engagement_weight
 
 
 class LikeStrategy(ABC):
@@ -37,14 +38,23 @@ class LikeEventStrategy(LikeStrategy):
         user = request.user
         event = get_object_or_404(Event, id=event_id)
 
-        try:
-            like = Like.objects.get(event=event, user=user)
-            like.status = 'unlike' if like.status == 'like' else 'like'
-            like.save()
-            like.refresh_from_db()
-        except Like.DoesNotExist:
-            like = Like.objects.create(event=event, user=user, status='like')
-            like.refresh_from_db()
+        with transaction.atomic():
+            try:
+                like = Like.objects.get(event=event, user=user)
+                like.status = 'unlike' if like.status == 'like' else 'like'
+                if like.status == 'like':
+                    # A like counts in the trending score from the time it was last given.
+                    like.liked_at = timezone.now()
+                like.save()
+                like.refresh_from_db()
+            except Like.DoesNotExist:
+                like = Like.objects.create(event=event, user=user, status='like')
+                like.refresh_from_db()
+            if like.status == 'like':
+                Event.objects.adjust_counters(event.id, like_count=1, trending_score=engagement_weight('like'))
+            else:
+                Event.objects.adjust_counters(event.id, like_count=-1,
+                                              trending_score=-engagement_weight('like', like.liked_at))
         
         user_engaged = EventResponseSchema.resolve_user_engagement(event, user)
         return Response({"message": "Like toggled successfully.", "user_engaged": user_engaged}, status=200)
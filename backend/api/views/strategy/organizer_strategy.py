@@ -1,6 +1,7 @@
 from api.views.modules import *
 from api.views.schemas.organizer_schema import *
 from api.views.schemas.other_schema import FileUploadResponseSchema
+from api.cache import bump_map_version, invalidate_map_tiles
 
 
 logger = logging.getLogger(__name__)
@@ -117,6 +118,7 @@ class DeleteEventStrategy(OrganizerStrategy):
             event = get_object_or_404(Event, id=event_id, organizer=organizer)
             Ticket.send_event_cancellation_email(event.ticket_set.all())
             event.delete()
+            invalidate_map_tiles((event.latitude, event.longitude))
             logger.info(f"Organizer {organizer.organizer_name} deleted event {event_id}.")
             return Response({'success': f"Delete event ID {event_id} successfully"}, status=204)
         except Organizer.DoesNotExist:
@@ -189,6 +191,7 @@ class RevokeOrganizerStrategy(OrganizerStrategy):
         try:
             organizer = Organizer.objects.get(user=request.user)
             organizer.delete()
+            bump_map_version()
             logger.info(f"Organizer role revoked for user {request.user.id}.")
             return Response({'success': f'Organizer role revoked for user {request.user.id}.'}, status=200)
         
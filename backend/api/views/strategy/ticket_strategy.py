@@ -1,6 +1,12 @@
 from abc import ABC, abstractmethod
+from django.db.models.functions import Lower
 from api.views.modules import *
 from api.views.schemas.ticket_schema import *
+from api.cache import bump_event_version
+from api.trending import engagement_weight
+
+FULL_EVENT_MESSAGE = "This event has reached the maximum number of attendees. You can join the waitlist."
+MAX_ISSUED_TICKETS = 5000
 
 class TicketStrategy(ABC):
     """
@@ -23,6 +29,10 @@ class TicketStrategy(ABC):
             'register_ticket': TicketRegisterStrategy(),
             'cancel_ticket': TicketDeleteStrategy(),
             'sent_reminder': TicketSendReminderStrategy(),
+            'join_waitlist': TicketJoinWaitlistStrategy(),
+            'waitlist_position': TicketWaitlistPositionStrategy(),
+            'leave_waitlist': TicketLeaveWaitlistStrategy(),
+            'bulk_issue': TicketBulkIssueStrategy(),
         }
         return strategies.get(strategy_name)
     
@@ -109,7 +119,7 @@ class TicketRegisterStrategy(TicketStrategy):
     """
     Register for an event.
     """
-    def validate_event_registration(self, event, user):
+    def validate_event_registration(self, event, user, check_capacity: bool = True):
         """
         Validate that the given user can register for the given event.
 
@@ -118,19 +128,22 @@ class TicketRegisterStrategy(TicketStrategy):
         Args:
             event (Event): The event for which to validate registration.
             user (User): The user attempting to register for the event.
+            check_capacity (bool): Whether a full event is an error, False when joining the waitlist.
 
         Raises:
             ValidationError: If registration is not allowed for any reason.
             PermissionDenied: If the event is private and the user's email domain is not authorized to register for this event.
         """
-        if event.is_max_attendee():
-            raise ValidationError("This event has reached the maximum number of attendees.")
+        # The stored status is only refreshed by the beat task, so it is computed here.
+        registration_status = event.compute_registeration_status(timezone.now())
+        if check_capacity and registration_status == 'FULL':
+            raise ValidationError(FULL_EVENT_MESSAGE)
 
         if not event.can_register():
             raise ValidationError("Registration for this event is not allowed.")
 
-        if not event.is_registration_status_allowed():
-            raise ValidationError(f"Registration for this event is {event.status_registeration.lower()} now.")
+        if registration_status == 'CLOSED':
+            raise ValidationError("Registration for this event is closed now.")
 
         if event.visibility == 'PRIVATE' and not event.is_email_allowed(user.email):
             raise PermissionDenied("Your email domain is not authorized to register for this event.")
@@ -187,16 +200,20 @@ class TicketRegisterStrategy(TicketStrategy):
 
         try:
             ticket.clean()
-            ticket.save()
-            ticket.email_sent = True
-            
-            notification_manager = TicketNotificationManager(ticket)
-            notification_manager.send_registration_confirmation()
+            with transaction.atomic():
+                if not Event.objects.reserve_spot(event.id, trending_score=engagement_weight('ticket')):
+                    raise ValidationError(FULL_EVENT_MESSAGE)
+                ticket.save()
+                # The confirmation is sent by a worker once the ticket is committed,
+                # so the response does not wait for the mail server.
+                delay_on_commit(send_registration_confirmation_email, ticket.id)
             return Response(TicketResponseSchema(
                 **ticket.get_ticket_details()).dict(), status=201)
 
         except ValidationError as validation_error:
             return Response({'error': str(validation_error.messages[0])}, status=400)
+        except IntegrityError:
+            return Response({'error': "User has already registered for this event."}, status=400)
         except Exception as error:
             logger.error("Error during ticket registration: %s", str(error))
             return Response({'error': 'Internal server error'}, status=500)
@@ -232,7 +249,12 @@ class TicketDeleteStrategy(TicketStrategy):
                 logger.error("Failed to send cancellation email: %s", email_error)
                 return Response({'error': 'Failed to send cancellation email'}, status=500)
 
-            ticket.delete()
+            with transaction.atomic():
+                ticket.delete()
+                if ticket.status == 'ACTIVE':
+                    Event.objects.adjust_counters(ticket.event_id, attendee_count=-1,
+                                                  trending_score=-engagement_weight('ticket', ticket.register_date))
+                    WaitlistEntry.objects.promote_next(ticket.event_id)
             return Response({
                 "success": f"Ticket with ID {ticket_id} has been canceled."
             }, status=200)
@@ -247,6 +269,167 @@ class TicketDeleteStrategy(TicketStrategy):
             return Response({'error': 'Internal server error'}, status=500)
         
         
+class TicketBulkIssueStrategy(TicketStrategy):
+    """
+    Issue tickets of an event to many attendees at once.
+    """
+    def execute(self, request: HttpRequest, event_id: int, data: TicketIssueSchema) -> Response:
+        """
+        Issue comp or group tickets of an event, owned by the requesting organizer, to attendees given by email.
+
+        The spots of all the tickets are reserved with one conditional UPDATE, their
+        ticket numbers are allocated as one block, and the tickets are inserted with
+        batched INSERTs. Unknown emails, the organizer and attendees who already
+        have a ticket of the event are skipped. The confirmation emails are sent by
+        one worker task once the tickets are committed.
+
+        Args:
+            request (HttpRequest): The HTTP request object, containing user and request metadata.
+            event_id (int): The ID of the event.
+            data (TicketIssueSchema): The emails of the attendees.
+
+        Returns:
+            Response: The issued tickets and the skipped emails, or an error message.
+        """
+        try:
+            organizer = Organizer.objects.get(user=request.user)
+        except Organizer.DoesNotExist:
+            return Response({'error': 'User is not an organizer'}, status=403)
+        event = get_object_or_404(Event, id=event_id, organizer=organizer)
+
+        # Emails are compared in lowercase, as addresses are stored with the case users signed up with.
+        emails = list(dict.fromkeys(email.strip().lower() for email in data.emails if email.strip()))
+        if not emails:
+            return Response({'error': 'No emails given.'}, status=400)
+        if len(emails) > MAX_ISSUED_TICKETS:
+            return Response({'error': f"At most {MAX_ISSUED_TICKETS} tickets can be issued at once."}, status=400)
+
+        attendees = list(
+            AttendeeUser.objects.annotate(email_lower=Lower('email'))
+            .filter(email_lower__in=emails)
+            .exclude(id=organizer.user_id)
+            .exclude(ticket__event=event)
+            .order_by('id')
+        )
+        try:
+            with transaction.atomic():
+                if attendees:
+                    if not Event.objects.reserve_spot(event.id, count=len(attendees),
+                                                      trending_score=engagement_weight('ticket') * len(attendees)):
+                        raise ValidationError(f"This event does not have {len(attendees)} spots left.")
+                    tickets = Ticket.objects.bulk_issue(event, attendees)
+                    delay_on_commit(send_registration_confirmation_emails, [ticket.id for ticket in tickets])
+                    # Bulk inserts send no post_save signal, so the feed pages of the event are invalidated here.
+                    transaction.on_commit(partial(bump_event_version, event.id))
+                else:
+                    tickets = []
+        except ValidationError as validation_error:
+            return Response({'error': validation_error.messages[0]}, status=400)
+        except IntegrityError:
+            return Response({'error': "Some attendees registered for this event meanwhile, please retry."}, status=409)
+
+        issued = {attendee.email.lower() for attendee in attendees}
+        return Response(TicketIssueResponseSchema(
+            tickets=[
+                IssuedTicketSchema(id=ticket.id, ticket_number=ticket.ticket_number, email=ticket.attendee.email)
+                for ticket in tickets
+            ],
+            skipped=[email for email in emails if email not in issued],
+        ).dict(), status=201)
+
+
+class TicketJoinWaitlistStrategy(TicketRegisterStrategy):
+    """
+    Join the waitlist of a full event.
+    """
+    def execute(self, request: HttpRequest, event_id: int) -> Response:
+        """
+        Add the requesting user at the end of the waitlist of a full event.
+
+        The user must be allowed to register for the event. The head of the
+        waitlist gets a ticket as soon as a spot is freed.
+
+        Args:
+            request (HttpRequest): The request object containing the user making the request.
+            event_id (int): The ID of the event to wait for.
+
+        Returns:
+            Response: The waitlist entry with the user's place, or an error message.
+
+        Raises:
+            400: If the event has free spots, or the user cannot register or is already waiting.
+            403: If the event is private and the user's email domain is not authorized.
+        """
+        user = request.user
+        event = get_object_or_404(Event, id=event_id)
+        if not event.is_max_attendee():
+            return Response({'error': "This event still has free spots, register instead."}, status=400)
+
+        try:
+            self.validate_event_registration(event, user, check_capacity=False)
+        except ValidationError as validation_error:
+            return Response({'error': validation_error.messages[0]}, status=400)
+        except PermissionDenied as permission_error:
+            return Response({'error': str(permission_error)}, status=403)
+
+        ticket = Ticket(event=event, attendee=user)
+        if ticket.is_organizer_join_own_event(user):
+            return Response({'error': "Organizer cannot register for their own event."}, status=400)
+        if Ticket.objects.filter(event=event, attendee=user).exists():
+            return Response({'error': "User has already registered for this event."}, status=400)
+
+        try:
+            entry = WaitlistEntry.objects.join(event, user)
+        except IntegrityError:
+            return Response({'error': "You are already on the waitlist of this event."}, status=400)
+        logger.info("User %s joined the waitlist of event %d.", user.id, event_id)
+        return Response(WaitlistResponseSchema(
+            event_id=event_id, position=entry.rank(), joined_at=entry.joined_at).dict(), status=201)
+
+
+class TicketWaitlistPositionStrategy(TicketStrategy):
+    """
+    Get the place of the requesting user in the waitlist of an event.
+    """
+    def execute(self, request: HttpRequest, event_id: int) -> Response:
+        """
+        Get the waitlist entry of the requesting user with their current place.
+
+        Args:
+            request (HttpRequest): The request object containing the user making the request.
+            event_id (int): The ID of the event.
+
+        Returns:
+            Response: The waitlist entry, or an error with status code 404 if the user is not waiting.
+        """
+        entry = WaitlistEntry.objects.filter(event_id=event_id, attendee=request.user).first()
+        if entry is None:
+            return Response({'error': "You are not on the waitlist of this event."}, status=404)
+        return Response(WaitlistResponseSchema(
+            event_id=event_id, position=entry.rank(), joined_at=entry.joined_at).dict(), status=200)
+
+
+class TicketLeaveWaitlistStrategy(TicketStrategy):
+    """
+    Leave the waitlist of an event.
+    """
+    def execute(self, request: HttpRequest, event_id: int) -> Response:
+        """
+        Remove the requesting user from the waitlist of an event.
+
+        Args:
+            request (HttpRequest): The request object containing the user making the request.
+            event_id (int): The ID of the event.
+
+        Returns:
+            Response: A success message, or an error with status code 404 if the user is not waiting.
+        """
+        deleted, _ = WaitlistEntry.objects.filter(event_id=event_id, attendee=request.user).delete()
+        if not deleted:
+            return Response({'error': "You are not on the waitlist of this event."}, status=404)
+        return Response({'success': "You left the waitlist."}, status=200)
+
+
 class TicketSendReminderStrategy(TicketStrategy):
     """
     Send a reminder email to a specific ticket holder.
@@ -1,5 +1,8 @@
-from api.views.schemas.ticket_schema import TicketResponseSchema
+from api.views.schemas.ticket_schema import (
+    TicketIssueResponseSchema, TicketIssueSchema, TicketResponseSchema, WaitlistResponseSchema,
+)
 from api.views.schemas.other_schema import ErrorResponseSchema
+from api.idempotency import idempotent
 from .modules import *
 from .strategy.ticket_strategy import *
 
@@ -26,7 +29,7 @@ class TicketAPI:
         return strategy.execute(user_id)
             
 
-    @route.post('/event/{event_id}/register', response={201: TicketResponseSchema, 400: ErrorResponseSchema}, auth=JWTAuth())
+    @route.post('/event/{event_id}/register', response={201: TicketResponseSchema, 400: ErrorResponseSchema, 409: ErrorResponseSchema}, auth=JWTAuth())
     def register_for_event(self,request: HttpRequest, event_id: int):
         """
         Register a user for an event.
@@ -40,12 +43,84 @@ class TicketAPI:
 
         Raises:
             400: If event registration is not allowed or if the user is already registered for the event.
+            409: If a request with the same Idempotency-Key is still being processed.
+
+        A retry sent with the Idempotency-Key of a finished request gets the response
+        of that request again, without registering the user twice.
         """
 
         strategy : TicketStrategy = TicketStrategy.get_strategy('register_ticket')
-        return strategy.execute(request, event_id)
+        return idempotent(request, partial(strategy.execute, request, event_id))
         
 
+    @route.post('/event/{event_id}/issue', response={201: TicketIssueResponseSchema, 400: ErrorResponseSchema,
+                                                    403: ErrorResponseSchema, 409: ErrorResponseSchema}, auth=JWTAuth())
+    def issue_tickets(self, request: HttpRequest, event_id: int, data: TicketIssueSchema):
+        """
+        Issue tickets of an event to many attendees at once, for the organizer of the event.
+
+        Args:
+            request (HttpRequest): The HTTP request object, containing user and request metadata.
+            event_id (int): The ID of the event.
+            data (TicketIssueSchema): The emails of the attendees.
+
+        Returns:
+            TicketIssueResponseSchema: The issued tickets and the skipped emails.
+
+        Raises:
+            400: If too many emails are given or the event does not have enough spots left.
+            403: If the user is not an organizer.
+            404: If the event does not exist or belongs to another organizer.
+            409: If an attendee registered for the event during the issuance.
+        """
+        strategy : TicketStrategy = TicketStrategy.get_strategy('bulk_issue')
+        return strategy.execute(request, event_id, data)
+
+    @route.post('/event/{event_id}/waitlist', response={201: WaitlistResponseSchema, 400: ErrorResponseSchema, 403: ErrorResponseSchema}, auth=JWTAuth())
+    def join_waitlist(self, request: HttpRequest, event_id: int):
+        """
+        Join the waitlist of a full event.
+
+        Args:
+            request (HttpRequest): The HTTP request object, containing user and request metadata.
+            event_id (int): The ID of the event to wait for.
+
+        Returns:
+            WaitlistResponseSchema: The user's place in the waitlist.
+        """
+        strategy : TicketStrategy = TicketStrategy.get_strategy('join_waitlist')
+        return strategy.execute(request, event_id)
+
+    @route.get('/event/{event_id}/waitlist', response={200: WaitlistResponseSchema, 404: ErrorResponseSchema}, auth=JWTAuth())
+    def waitlist_position(self, request: HttpRequest, event_id: int):
+        """
+        Get the user's place in the waitlist of an event.
+
+        Args:
+            request (HttpRequest): The HTTP request object, containing user and request metadata.
+            event_id (int): The ID of the event.
+
+        Returns:
+            WaitlistResponseSchema: The user's place in the waitlist.
+        """
+        strategy : TicketStrategy = TicketStrategy.get_strategy('waitlist_position')
+        return strategy.execute(request, event_id)
+
+    @route.delete('/event/{event_id}/waitlist', auth=JWTAuth())
+    def leave_waitlist(self, request: HttpRequest, event_id: int):
+        """
+        Leave the waitlist of an event.
+
+        Args:
+            request (HttpRequest): The HTTP request object, containing user and request metadata.
+            event_id (int): The ID of the event.
+
+        Returns:
+            Response: A success message, or an error if the user is not waiting.
+        """
+        strategy : TicketStrategy = TicketStrategy.get_strategy('leave_waitlist')
+        return strategy.execute(request, event_id)
+
     @route.delete('/{ticket_id}/cancel', auth=JWTAuth())
     def cancel_ticket(self,request: HttpRequest, ticket_id: int):
         """
@@ -61,9 +136,12 @@ class TicketAPI:
         Raises:
             404: If the ticket does not exist or the user does not have permission to cancel it.
             500: If there is an error during the cancellation process.
+
+        A retry sent with the Idempotency-Key of a finished request gets the response
+        of that request again.
         """
         strategy : TicketStrategy = TicketStrategy.get_strategy('cancel_ticket')
-        return strategy.execute(request, ticket_id)
+        return idempotent(request, partial(strategy.execute, request, ticket_id))
         
     @route.get('/{ticket_id}', response=TicketResponseSchema, auth=JWTAuth())
     def ticket_detail(self,request: HttpRequest, ticket_id: int):
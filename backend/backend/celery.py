@@ -7,3 +7,51 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 app = Celery('backend')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
+
+
+@app.task
+def advance_event_lifecycle():
+    """
+    Move events through their lifecycle once their transition times have passed.
+
+    UPCOMING -> ONGOING -> COMPLETED follows the event dates, and registration
+    moves between OPEN, CLOSED and FULL following the registration end date and
+    the number of attendees. Each transition is a single bulk UPDATE. Read
+    endpoints compute the statuses on the fly and never write them back, this
+    task is the only place where they are stored.
+    """
+    from api.models import Event
+    return Event.objects.sync_statuses()
+
+
+@app.task
+def decay_trending_scores():
+    """
+    Decay the trending score of every event by the time elapsed since the previous run.
+
+    Engagement writes add their full weight to the score, so this periodic bulk
+    UPDATE is what makes older likes, bookmarks and registrations count less.
+    """
+    from api.models import Event
+    return Event.objects.decay_trending_scores()
+
+
+@app.task
+def refresh_recommendations(full=False):
+    """
+    Recompute the similar events and user recommendations.
+
+    The hourly run only refreshes the events and users with new engagements, and
+    the nightly full run also accounts for removed likes, bookmarks and tickets.
+    """
+    from api.recommendations import refresh_recommendations
+    return refresh_recommendations(full=full)
+
+
+@app.task
+def purge_idempotency_records():
+    """
+    Delete the stored responses of Idempotency-Keys that can no longer be replayed.
+    """
+    from api.models import IdempotencyRecord
+    return IdempotencyRecord.objects.purge()
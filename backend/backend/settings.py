@@ -270,14 +270,64 @@ ACCOUNT_UNIQUE_EMAIL = True
 LOGIN_REDIRECT_URL = '/' 
 
 
-CELERY_BROKER_URL = 'redis://localhost:6379/0' 
-CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
+REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/0')
+# Without CACHE_URL every process keeps its own cache, so feed versions, cached pages and
+# rebuild locks are not shared between workers. Deployments with several workers should
+# point it at a shared Redis, for example the Celery broker at REDIS_URL.
+CACHE_URL = '' if "test" in sys.argv else config('CACHE_URL', default='')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_URL,
+    } if CACHE_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+# Anonymous event feed pages are cached for this many seconds; writes invalidate them earlier.
+EVENT_FEED_CACHE_TIMEOUT = config('EVENT_FEED_CACHE_TIMEOUT', default=60, cast=int)
+EVENT_FEED_CACHE_LOCK_TIMEOUT = 10
+# Map clusters are invalidated per tile when events move, so they can be kept longer.
+MAP_CLUSTER_CACHE_TIMEOUT = config('MAP_CLUSTER_CACHE_TIMEOUT', default=3600, cast=int)
+# Rows fetched and serialized at a time by the streaming list endpoints.
+STREAMING_CHUNK_SIZE = config('STREAMING_CHUNK_SIZE', default=1000, cast=int)
+# Responses of requests sent with an Idempotency-Key are replayed to retries for this many seconds.
+IDEMPOTENCY_KEY_TIMEOUT = config('IDEMPOTENCY_KEY_TIMEOUT', default=24 * 3600, cast=int)
+# A key whose first request did not finish within this many seconds can be claimed by a retry.
+IDEMPOTENCY_LOCK_TIMEOUT = 30
+# Key of the permutation that scrambles ticket numbers. Changing it after tickets were issued can repeat numbers.
+TICKET_NUMBER_KEY = config('TICKET_NUMBER_KEY', default='ticket-number')
+# Likes, bookmarks and registrations count half as much in the trending score after this many hours.
+TRENDING_HALF_LIFE_HOURS = config('TRENDING_HALF_LIFE_HOURS', default=24, cast=float)
+
+CELERY_BROKER_URL = REDIS_URL
+CELERY_RESULT_BACKEND = REDIS_URL
 
 CELERY_BEAT_SCHEDULE = {
     'send-daily-reminders': {
         'task': 'utils.send_reminder_emails',
         'schedule': crontab(hour=9, minute=0), 
     },
+    'advance-event-lifecycle': {
+        'task': 'backend.celery.advance_event_lifecycle',
+        'schedule': crontab(),
+    },
+    'decay-trending-scores': {
+        'task': 'backend.celery.decay_trending_scores',
+        'schedule': crontab(minute='*/10'),
+    },
+    'refresh-recommendations': {
+        'task': 'backend.celery.refresh_recommendations',
+        'schedule': crontab(minute=15),
+    },
+    'rebuild-recommendations': {
+        'task': 'backend.celery.refresh_recommendations',
+        'schedule': crontab(hour=3, minute=45),
+        'kwargs': {'full': True},
+    },
+    'purge-idempotency-records': {
+        'task': 'backend.celery.purge_idempotency_records',
+        'schedule': crontab(minute=30),
+    },
 }
 
 
@@ -0,0 +1,16 @@
+"""
+Settings of the benchmark commands, which run against a scratch database.
+
+The database is given by BENCH_DATABASE_URL, a SQLite file under /tmp by default,
+so a benchmark never writes to the database the application is configured with:
+
+    DJANGO_SETTINGS_MODULE=backend.settings_bench python manage.py migrate
+    DJANGO_SETTINGS_MODULE=backend.settings_bench python manage.py bench_ticket_registration --yes
+"""
+import dj_database_url
+from decouple import config
+from backend.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': dj_database_url.parse(config('BENCH_DATABASE_URL', default='sqlite:////tmp/bench.sqlite3?timeout=60')),
+}